@@ -86,7 +86,7 @@ class ControllerActorCritic(Controller):
         new_state, reward, episode_done = self.agent.step(action)
         new_action_choice = np.random.choice(self.env.NUM_ACTIONS, p=softmax_probs)
         new_action = self.env.action_space[new_action_choice]
-        gradient = self.agent.compute_gradient(state, action)
+        gradient = self.agent.compute_gradient(state, action, softmax_probs)
         self.agent.update_weights(gradient, state, action, reward, new_state, new_action)
         self.total_reward += reward
         self.episode_steps += 1
@@ -53,9 +53,16 @@ class ControllerDDPGBipedalWalker(Controller):
             config.read("config.txt")
             self.agent.GAMMA = config["ddpg-bipedal-walker"].getfloat("gamma")
             self.agent.TAU = config["ddpg-bipedal-walker"].getfloat("tau")
+            self.agent.TARGET_UPDATE_STEPS = config["ddpg-bipedal-walker"].getint("target_update_steps")
+            self.agent.POLICY_DELAY = config["ddpg-bipedal-walker"].getint("policy_delay")
             self.agent.ALPHA_ACTOR = config["ddpg-bipedal-walker"].getfloat("alpha_actor")
             self.agent.ALPHA_CRITIC = config["ddpg-bipedal-walker"].getfloat("alpha_critic")
             self.agent.BATCH_SIZE = config["ddpg-bipedal-walker"].getint("batch_size")
+            self.agent.TRAIN_FREQ = config["ddpg-bipedal-walker"].getint("train_freq")
+            self.agent.GRADIENT_STEPS = config["ddpg-bipedal-walker"].getint("gradient_steps")
+            self.agent.LEARNING_STARTS = config["ddpg-bipedal-walker"].getint("learning_starts")
+            self.agent.REPLAY_SIZE = config["ddpg-bipedal-walker"].getint("replay_buffer_size")
+            self.agent.REPLAY_DIRECTORY = config["ddpg-bipedal-walker"].get("replay_buffer_directory") or None
             self.epsilon = config["ddpg-bipedal-walker"].getfloat("epsilon")
             self.epsilon_decay = config["ddpg-bipedal-walker"].getfloat("epsilon_decay_amount")
             self.FINAL_EPSILON = config["ddpg-bipedal-walker"].getfloat("final_epsilon")
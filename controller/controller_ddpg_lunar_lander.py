@@ -53,9 +53,16 @@ class ControllerDDPGLunarLander(Controller):
             config.read("config.txt")
             self.agent.GAMMA = config["ddpg-lunar-lander"].getfloat("gamma")
             self.agent.TAU = config["ddpg-lunar-lander"].getfloat("tau")
+            self.agent.TARGET_UPDATE_STEPS = config["ddpg-lunar-lander"].getint("target_update_steps")
+            self.agent.POLICY_DELAY = config["ddpg-lunar-lander"].getint("policy_delay")
             self.agent.ALPHA_ACTOR = config["ddpg-lunar-lander"].getfloat("alpha_actor")
             self.agent.ALPHA_CRITIC = config["ddpg-lunar-lander"].getfloat("alpha_critic")
             self.agent.BATCH_SIZE = config["ddpg-lunar-lander"].getint("batch_size")
+            self.agent.TRAIN_FREQ = config["ddpg-lunar-lander"].getint("train_freq")
+            self.agent.GRADIENT_STEPS = config["ddpg-lunar-lander"].getint("gradient_steps")
+            self.agent.LEARNING_STARTS = config["ddpg-lunar-lander"].getint("learning_starts")
+            self.agent.REPLAY_SIZE = config["ddpg-lunar-lander"].getint("replay_buffer_size")
+            self.agent.REPLAY_DIRECTORY = config["ddpg-lunar-lander"].get("replay_buffer_directory") or None
             self.epsilon = config["ddpg-lunar-lander"].getfloat("epsilon")
             self.epsilon_decay = config["ddpg-lunar-lander"].getfloat("epsilon_decay_amount")
             self.FINAL_EPSILON = config["ddpg-lunar-lander"].getfloat("final_epsilon")
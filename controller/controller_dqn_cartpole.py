@@ -1,4 +1,6 @@
 from controller.controller import Controller
+from model.environment_vectorised import VectorisedEnvironment, SubprocessVectorisedEnvironment
+from model.trajectory_recorder import RecordingEnvironment
 from tkinter import messagebox
 import matplotlib.pyplot as plt
 import numpy
@@ -38,6 +40,10 @@ class ControllerDQNCartPole(Controller):
         self.epsilon_decay = False
         self.no_of_episodes = episodes
         self.sync_target_net_episodes = 1000
+        self.num_envs = 1
+        self.subprocess_envs = False
+        self.vector_env = None
+        self.episode_rewards = None
 
         self.episode_counter = 0
         self.total_reward = 0
@@ -55,11 +61,19 @@ class ControllerDQNCartPole(Controller):
             self.agent.GAMMA = config["deep-q-network-cartpole"].getfloat("gamma")
             self.agent.ALPHA = config["deep-q-network-cartpole"].getfloat("alpha")
             self.agent.BATCH_SIZE = config["deep-q-network-cartpole"].getint("batch_size")
+            self.agent.TRAIN_FREQ = config["deep-q-network-cartpole"].getint("train_freq")
+            self.agent.GRADIENT_STEPS = config["deep-q-network-cartpole"].getint("gradient_steps")
+            self.agent.LEARNING_STARTS = config["deep-q-network-cartpole"].getint("learning_starts")
+            self.agent.prioritised_replay = config["deep-q-network-cartpole"].getboolean("prioritised_replay")
+            self.agent.PRIORITY_ALPHA = config["deep-q-network-cartpole"].getfloat("priority_alpha")
+            self.agent.PRIORITY_BETA = config["deep-q-network-cartpole"].getfloat("priority_beta")
             self.EPSILON = config["deep-q-network-cartpole"].getfloat("epsilon")
             self.epsilon = self.EPSILON
             self.epsilon_decay = config["deep-q-network-cartpole"].getboolean("epsilon_decay")
             self.no_of_episodes = config["deep-q-network-cartpole"].getint("episodes")
             self.sync_target_net_episodes = config["deep-q-network-cartpole"].getint("sync_target_net_episodes")
+            self.num_envs = config["deep-q-network-cartpole"].getint("num_envs")
+            self.subprocess_envs = config["deep-q-network-cartpole"].getboolean("subprocess_envs")
 
     def start(self):
         """
@@ -68,6 +82,10 @@ class ControllerDQNCartPole(Controller):
         """
 
         self.read_config_file()
+        if self.num_envs > 1 and not self.loaded_best_model and isinstance(self.env, RecordingEnvironment):
+            raise ValueError("Transitions cannot be recorded with num_envs greater than 1, since the vectorised "
+                             "environments step their own copies of CartPole. Set num_envs to 1 in config.txt "
+                             "to record them.")
         if self.canvas_after_variable is not None:
             self.gui.animation.canvas.after_cancel(self.canvas_after_variable)
         self.episode_counter = 0
@@ -79,7 +97,15 @@ class ControllerDQNCartPole(Controller):
         self.gui.add_to_listbox("DEEP Q-NETWORK FOR CARTPOLE")
         self.gui.add_to_listbox("Running episodes.")
         self.start_time = time.time()
-        self.run_episode()
+        if self.num_envs > 1 and not self.loaded_best_model:
+            if self.vector_env is not None:
+                self.vector_env.close()
+            vectorised_environment = SubprocessVectorisedEnvironment if self.subprocess_envs else VectorisedEnvironment
+            self.vector_env = vectorised_environment(type(self.env), self.num_envs)
+            self.episode_rewards = numpy.zeros(self.num_envs)
+            self.run_vectorised_episode()
+        else:
+            self.run_episode()
 
     def run_episode(self):
         """
@@ -98,38 +124,78 @@ class ControllerDQNCartPole(Controller):
         self.gui.animation.update()
 
         if episode_done:
-            self.episode_counter += 1
             self.env.restart_environment()
-            if self.loaded_best_model:
-                self.gui.update_episode_labels(self.episode_counter, 0, 0)
-            else:
-                self.gui.update_episode_labels(self.episode_counter, self.epsilon, self.agent.ALPHA)
-            self.epsilon = self.EPSILON ** self.episode_counter if self.epsilon_decay else self.EPSILON
-            if self.episode_counter % 100 == 0:
-                self.gui.add_to_listbox("(" + str(self.episode_counter - 99) + "-" + str(
-                    self.episode_counter) + ") Average reward: {0:.2f}".format(self.total_reward / 100))
-                self.total_reward_history.append(self.total_reward)
-                self.total_reward = 0
-            if not self.loaded_best_model and self.episode_counter % self.sync_target_net_episodes == 0:
-                self.agent.target_net.load_state_dict(self.agent.net.state_dict())
+            self.end_episode()
 
         if self.episode_counter < self.no_of_episodes:
             if self.timescale == 0:
                 self.gui.root.update_idletasks()
             self.canvas_after_variable = self.gui.animation.canvas.after(self.timescale, self.run_episode)
         else:
-            self.end_time = time.time()
-            self.gui.add_to_listbox("Finished {0} episodes. ({1:.2f} secs)".format(self.no_of_episodes, float(
-                self.end_time - self.start_time)))
-            self.gui.add_to_listbox(
-                "Best average reward: {0:.2f}".format(numpy.amax(numpy.array(self.total_reward_history) / 100)))
-            self.gui.root.update()
-            plt.plot(list(range(1, int((self.no_of_episodes / 100) + 1))), numpy.array(self.total_reward_history) / 100)
-            plt.title("Result")
-            plt.xlabel("Episode Batch (100 episodes)")
-            plt.ylabel("Average Reward")
-            plt.ylim(self.env.MIN_REWARD, self.env.MAX_REWARD)
-            plt.show()
+            self.finish_episodes()
+
+    def run_vectorised_episode(self):
+        """
+        Steps every copy of the vectorised environment once, learning via Deep Q-Network with a single batched
+        forward pass. The environment is not animated. This method will continually call itself until the
+        desired number of episodes have been completed across all of the copies.
+        """
+
+        rewards, dones = self.agent.vectorised_step(self.vector_env, self.epsilon)
+        self.episode_rewards += rewards
+        for i in numpy.flatnonzero(dones):
+            self.total_reward += self.episode_rewards[i]
+            self.episode_rewards[i] = 0
+            if self.episode_counter < self.no_of_episodes:
+                self.end_episode()
+
+        if self.episode_counter < self.no_of_episodes:
+            if self.timescale == 0:
+                self.gui.root.update_idletasks()
+            self.canvas_after_variable = self.gui.animation.canvas.after(self.timescale, self.run_vectorised_episode)
+        else:
+            self.vector_env.close()
+            self.vector_env = None
+            self.finish_episodes()
+
+    def end_episode(self):
+        """
+        Updates the episode counter, labels and epsilon at the end of an episode. The average reward is displayed
+        every 100 episodes, and the target network is synced every sync_target_net_episodes episodes.
+        """
+
+        self.episode_counter += 1
+        if self.loaded_best_model:
+            self.gui.update_episode_labels(self.episode_counter, 0, 0)
+        else:
+            self.gui.update_episode_labels(self.episode_counter, self.epsilon, self.agent.ALPHA)
+        self.epsilon = self.EPSILON ** self.episode_counter if self.epsilon_decay else self.EPSILON
+        if self.episode_counter % 100 == 0:
+            self.gui.add_to_listbox("(" + str(self.episode_counter - 99) + "-" + str(
+                self.episode_counter) + ") Average reward: {0:.2f}".format(self.total_reward / 100))
+            self.total_reward_history.append(self.total_reward)
+            self.total_reward = 0
+        if not self.loaded_best_model and self.episode_counter % self.sync_target_net_episodes == 0:
+            self.agent.target_net.load_state_dict(self.agent.net.state_dict())
+
+    def finish_episodes(self):
+        """
+        Displays the reward statistics once all of the episodes have been completed, and plots the average
+        reward of every 100 episodes.
+        """
+
+        self.end_time = time.time()
+        self.gui.add_to_listbox("Finished {0} episodes. ({1:.2f} secs)".format(self.no_of_episodes, float(
+            self.end_time - self.start_time)))
+        self.gui.add_to_listbox(
+            "Best average reward: {0:.2f}".format(numpy.amax(numpy.array(self.total_reward_history) / 100)))
+        self.gui.root.update()
+        plt.plot(list(range(1, int((self.no_of_episodes / 100) + 1))), numpy.array(self.total_reward_history) / 100)
+        plt.title("Result")
+        plt.xlabel("Episode Batch (100 episodes)")
+        plt.ylabel("Average Reward")
+        plt.ylim(self.env.MIN_REWARD, self.env.MAX_REWARD)
+        plt.show()
 
     def update_timescale(self, var):
         """
@@ -1,10 +1,14 @@
 from controller.controller import Controller
+from model.actor_learner import ActorLearner
+from model.trajectory_recorder import RecordingEnvironment
 from tkinter import messagebox
 import matplotlib.pyplot as plt
 import numpy
+import random
 import time
 import configparser
 import os.path
+import shutil
 import torch
 
 
@@ -38,6 +42,13 @@ class ControllerDQNPong(Controller):
         self.FINAL_EPSILON = 0
         self.no_of_episodes = episodes
         self.sync_target_net_frames = 1000
+        self.num_actors = 0
+        self.actor_sync_frames = 1000
+        self.actor_learner = None
+        self.checkpoint_frames = 0
+        self.checkpoint_directory = "neural_network_models/pong_checkpoint"
+        self.resume_from_checkpoint = False
+        self.checkpoint_frame = 0
 
         self.frame_counter = 0
         self.episode_counter = 0
@@ -56,11 +67,23 @@ class ControllerDQNPong(Controller):
             self.agent.GAMMA = config["deep-q-network-pong"].getfloat("gamma")
             self.agent.ALPHA = config["deep-q-network-pong"].getfloat("alpha")
             self.agent.BATCH_SIZE = config["deep-q-network-pong"].getint("batch_size")
+            self.agent.TRAIN_FREQ = config["deep-q-network-pong"].getint("train_freq")
+            self.agent.GRADIENT_STEPS = config["deep-q-network-pong"].getint("gradient_steps")
+            self.agent.LEARNING_STARTS = config["deep-q-network-pong"].getint("learning_starts")
+            self.agent.prioritised_replay = config["deep-q-network-pong"].getboolean("prioritised_replay")
+            self.agent.PRIORITY_ALPHA = config["deep-q-network-pong"].getfloat("priority_alpha")
+            self.agent.PRIORITY_BETA = config["deep-q-network-pong"].getfloat("priority_beta")
+            self.agent.REPLAY_SIZE = config["deep-q-network-pong"].getint("replay_buffer_size")
             self.epsilon = config["deep-q-network-pong"].getfloat("epsilon")
             self.epsilon_decay = config["deep-q-network-pong"].getfloat("epsilon_decay_amount")
             self.FINAL_EPSILON = config["deep-q-network-pong"].getfloat("final_epsilon")
             self.no_of_episodes = config["deep-q-network-pong"].getint("episodes")
             self.sync_target_net_frames = config["deep-q-network-pong"].getint("sync_target_net_frames")
+            self.num_actors = config["deep-q-network-pong"].getint("num_actors")
+            self.actor_sync_frames = config["deep-q-network-pong"].getint("actor_sync_frames")
+            self.checkpoint_frames = config["deep-q-network-pong"].getint("checkpoint_frames")
+            self.checkpoint_directory = config["deep-q-network-pong"].get("checkpoint_directory")
+            self.resume_from_checkpoint = config["deep-q-network-pong"].getboolean("resume_from_checkpoint")
 
     def start(self):
         """
@@ -69,19 +92,32 @@ class ControllerDQNPong(Controller):
         """
 
         self.read_config_file()
+        if self.num_actors > 0 and not self.loaded_best_model and isinstance(self.env, RecordingEnvironment):
+            raise ValueError("Transitions cannot be recorded with num_actors greater than 0, since the actor "
+                             "processes step their own copies of Pong. Set num_actors to 0 in config.txt to "
+                             "record them.")
         if self.canvas_after_variable is not None:
             self.gui.animation.canvas.after_cancel(self.canvas_after_variable)
         self.episode_counter = 0
         self.frame_counter = 0
         self.total_reward = 0
         self.total_reward_history = []
+        self.checkpoint_frame = 0
         self.stop_and_reset()
         self.gui.update_episode_labels(self.episode_counter, self.epsilon, self.agent.ALPHA, None, self.frame_counter)
         self.gui.add_to_listbox("=============================================")
         self.gui.add_to_listbox("DEEP Q-NETWORK FOR PONG")
         self.gui.add_to_listbox("Running episodes.")
+        if self.resume_from_checkpoint and not self.loaded_best_model:
+            self.load_checkpoint()
+            self.env.restart_environment()
         self.start_time = time.time()
-        self.run_episode()
+        if self.num_actors > 0 and not self.loaded_best_model:
+            self.actor_learner = ActorLearner(self.agent, type(self.env), self.num_actors, self.epsilon,
+                                              self.epsilon_decay, self.FINAL_EPSILON, self.actor_sync_frames)
+            self.run_async_episode()
+        else:
+            self.run_episode()
 
     def run_episode(self):
         """
@@ -107,13 +143,10 @@ class ControllerDQNPong(Controller):
         self.epsilon = max(self.FINAL_EPSILON, self.epsilon - self.epsilon_decay)
 
         if episode_done:
-            self.episode_counter += 1
+            self.end_episode()
+            if not self.loaded_best_model:
+                self.save_checkpoint_if_due()
             self.env.restart_environment()
-            if self.episode_counter % 100 == 0:
-                self.gui.add_to_listbox("(" + str(self.episode_counter - 99) + "-" + str(
-                    self.episode_counter) + ") Average reward: {0:.2f}".format(self.total_reward / 100))
-                self.total_reward_history.append(self.total_reward)
-                self.total_reward = 0
 
         if not self.loaded_best_model and self.frame_counter % self.sync_target_net_frames == 0:
             self.agent.target_net.load_state_dict(self.agent.net.state_dict())
@@ -123,18 +156,168 @@ class ControllerDQNPong(Controller):
                 self.gui.root.update_idletasks()
             self.canvas_after_variable = self.gui.animation.canvas.after(self.timescale, self.run_episode)
         else:
-            self.end_time = time.time()
-            self.gui.add_to_listbox("Finished {0} episodes. ({1:.2f} secs)".format(self.no_of_episodes, float(
-                self.end_time - self.start_time)))
-            self.gui.add_to_listbox(
-                "Best average reward: {0:.2f}".format(numpy.amax(numpy.array(self.total_reward_history) / 100)))
-            self.gui.root.update()
-            plt.plot(list(range(1, int((self.no_of_episodes / 100) + 1))), numpy.array(self.total_reward_history) / 100)
-            plt.title("Result")
-            plt.xlabel("Episode Batch (100 episodes)")
-            plt.ylabel("Average Reward")
-            plt.ylim(self.env.MIN_REWARD, self.env.MAX_REWARD)
-            plt.show()
+            self.finish_episodes()
+
+    def run_async_episode(self):
+        """
+        Collects the transitions sent by the actor processes, then performs the backwards passes due. The actors
+        step their own copies of the environment, so it is not animated. The agent's weights are published to
+        the actors every actor_sync_frames frames. This method will continually call itself until the desired
+        number of episodes have been completed across all of the actors.
+        """
+
+        episode_rewards, frames = self.actor_learner.collect()
+        self.agent.learn(frames)
+        previous_frame_counter = self.frame_counter
+        self.frame_counter += frames
+        self.epsilon = max(self.FINAL_EPSILON, self.epsilon - self.epsilon_decay * frames)
+        self.gui.update_episode_labels(self.episode_counter, self.epsilon, self.agent.ALPHA, None, self.frame_counter)
+        for episode_reward in episode_rewards:
+            if self.episode_counter < self.no_of_episodes:
+                self.total_reward += episode_reward
+                self.end_episode()
+        if episode_rewards:
+            self.save_checkpoint_if_due()
+
+        if self.frame_counter // self.sync_target_net_frames > previous_frame_counter // self.sync_target_net_frames:
+            self.agent.target_net.load_state_dict(self.agent.net.state_dict())
+        if self.frame_counter // self.actor_sync_frames > previous_frame_counter // self.actor_sync_frames:
+            self.actor_learner.publish_weights()
+
+        if self.episode_counter < self.no_of_episodes:
+            if self.timescale == 0:
+                self.gui.root.update_idletasks()
+            self.canvas_after_variable = self.gui.animation.canvas.after(self.timescale, self.run_async_episode)
+        else:
+            self.actor_learner.close()
+            self.actor_learner = None
+            self.finish_episodes()
+
+    def end_episode(self):
+        """
+        Updates the episode counter at the end of an episode, and displays the average reward every 100 episodes.
+        """
+
+        self.episode_counter += 1
+        if self.episode_counter % 100 == 0:
+            self.gui.add_to_listbox("(" + str(self.episode_counter - 99) + "-" + str(
+                self.episode_counter) + ") Average reward: {0:.2f}".format(self.total_reward / 100))
+            self.total_reward_history.append(self.total_reward)
+            self.total_reward = 0
+
+    def save_checkpoint_if_due(self):
+        """
+        Saves a checkpoint at the end of an episode once checkpoint_frames frames have passed since the last one.
+        If checkpoint_frames is 0, no checkpoints are saved.
+        """
+
+        if self.checkpoint_frames > 0 and self.frame_counter - self.checkpoint_frame >= self.checkpoint_frames:
+            self.save_checkpoint()
+
+    def save_checkpoint(self):
+        """
+        Saves the agent's training state, along with the episode and frame counters, epsilon, the reward history
+        and the random number generator states, to the checkpoint directory. Checkpoints are saved at the end of
+        an episode, before the environment is restarted, so a resumed run starts a new episode with the totals of
+        the completed ones. The random number generators of Python, NumPy, PyTorch and the gym action space are all
+        saved, so a resumed run explores as the uninterrupted run would have.
+
+        Every file of the checkpoint is written to a new directory, which then replaces the checkpoint directory,
+        so a crash while saving never leaves a directory holding files from two checkpoints. The previous
+        checkpoint is kept with the suffix .old until the new one is in place.
+        """
+
+        checkpoint_directory = os.path.normpath(self.checkpoint_directory)
+        new_directory = checkpoint_directory + ".new"
+        old_directory = checkpoint_directory + ".old"
+        shutil.rmtree(new_directory, ignore_errors=True)
+        os.makedirs(new_directory)
+        self.agent.save_checkpoint(new_directory)
+        torch.save({"episode_counter": self.episode_counter, "frame_counter": self.frame_counter,
+                    "epsilon": self.epsilon, "total_reward": self.total_reward,
+                    "total_reward_history": self.total_reward_history, "torch_rng": torch.get_rng_state(),
+                    "numpy_rng": self._random_state_to_checkpoint(numpy.random.get_state()),
+                    "action_space_rng": self._random_state_to_checkpoint(
+                        self.env.gym_env.action_space.np_random.get_state()),
+                    "python_rng": random.getstate()}, os.path.join(new_directory, "controller.pth"))
+        if os.path.exists(checkpoint_directory):
+            shutil.rmtree(old_directory, ignore_errors=True)
+            os.rename(checkpoint_directory, old_directory)
+        os.rename(new_directory, checkpoint_directory)
+        shutil.rmtree(old_directory, ignore_errors=True)
+        self.checkpoint_frame = self.frame_counter
+        self.gui.add_to_listbox("Saved checkpoint at episode {0}, frame {1}.".format(self.episode_counter,
+                                                                                    self.frame_counter))
+
+    def load_checkpoint(self):
+        """
+        Restores the training state saved by save_checkpoint, if a checkpoint exists in the checkpoint directory,
+        so the run continues from the episode it was saved at. If saving crashed after the previous checkpoint was
+        moved aside, the previous checkpoint is loaded instead.
+        """
+
+        checkpoint_directory = os.path.normpath(self.checkpoint_directory)
+        if not os.path.exists(checkpoint_directory):
+            checkpoint_directory += ".old"
+        controller_path = os.path.join(checkpoint_directory, "controller.pth")
+        if not os.path.exists(controller_path):
+            self.gui.add_to_listbox("No checkpoint found in " + self.checkpoint_directory + ", starting afresh.")
+            return
+        self.agent.load_checkpoint(checkpoint_directory)
+        checkpoint = torch.load(controller_path, weights_only=True)
+        self.episode_counter = checkpoint["episode_counter"]
+        self.frame_counter = checkpoint["frame_counter"]
+        self.checkpoint_frame = self.frame_counter
+        self.epsilon = checkpoint["epsilon"]
+        self.total_reward = checkpoint["total_reward"]
+        self.total_reward_history = checkpoint["total_reward_history"]
+        numpy.random.set_state(self._random_state_from_checkpoint(checkpoint["numpy_rng"]))
+        self.env.gym_env.action_space.np_random.set_state(
+            self._random_state_from_checkpoint(checkpoint["action_space_rng"]))
+        random.setstate(checkpoint["python_rng"])
+        torch.set_rng_state(checkpoint["torch_rng"])
+        self.gui.add_to_listbox("Resumed from checkpoint at episode {0}, frame {1}.".format(self.episode_counter,
+                                                                                          self.frame_counter))
+
+    def _random_state_to_checkpoint(self, random_state):
+        """
+        Converts the state of a NumPy MT19937 random number generator into types torch.load can restore with
+        weights_only, by storing its keys as a tensor.
+
+        @param random_state: the state returned by get_state()
+        @return: tuple of the keys tensor, position, whether a Gaussian is cached and the cached Gaussian
+        """
+
+        _, keys, position, has_gauss, cached_gaussian = random_state
+        return torch.from_numpy(keys.astype(numpy.int64)), position, has_gauss, cached_gaussian
+
+    def _random_state_from_checkpoint(self, checkpoint_state):
+        """
+        @param checkpoint_state: the random number generator state saved by _random_state_to_checkpoint
+        @return: the state to pass to set_state()
+        """
+
+        keys, position, has_gauss, cached_gaussian = checkpoint_state
+        return "MT19937", keys.numpy().astype(numpy.uint32), position, has_gauss, cached_gaussian
+
+    def finish_episodes(self):
+        """
+        Displays the reward statistics once all of the episodes have been completed, and plots the average
+        reward of every 100 episodes.
+        """
+
+        self.end_time = time.time()
+        self.gui.add_to_listbox("Finished {0} episodes. ({1:.2f} secs)".format(self.no_of_episodes, float(
+            self.end_time - self.start_time)))
+        self.gui.add_to_listbox(
+            "Best average reward: {0:.2f}".format(numpy.amax(numpy.array(self.total_reward_history) / 100)))
+        self.gui.root.update()
+        plt.plot(list(range(1, int((self.no_of_episodes / 100) + 1))), numpy.array(self.total_reward_history) / 100)
+        plt.title("Result")
+        plt.xlabel("Episode Batch (100 episodes)")
+        plt.ylabel("Average Reward")
+        plt.ylim(self.env.MIN_REWARD, self.env.MAX_REWARD)
+        plt.show()
 
     def update_timescale(self, var):
         """
@@ -189,6 +372,9 @@ class ControllerDQNPong(Controller):
         The Agent and Environment objects have their respective reset methods called, ready for another run.
         """
 
+        if self.actor_learner is not None:
+            self.actor_learner.close()
+            self.actor_learner = None
         if not self.loaded_best_model:
             self.agent.restart_matrices()
         self.env.restart_environment()
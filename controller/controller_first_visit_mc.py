@@ -55,6 +55,7 @@ class ControllerFirstVisitMC(Controller):
             self.epsilon = self.EPSILON
             self.epsilon_decay = config["monte-carlo"].getboolean("epsilon_decay")
             self.no_of_episodes = config["monte-carlo"].getint("episodes")
+            self.agent.use_array_Q = config["monte-carlo"].getboolean("array_Q_table")
 
     def start(self):
         """
@@ -57,6 +57,7 @@ class ControllerQLearning(Controller):
             self.no_of_episodes = config["temporal-difference"].getint("episodes")
             self.agent.MIN_INIT_Q = config["temporal-difference"].getfloat("min_initial_Q")
             self.agent.MAX_INIT_Q = config["temporal-difference"].getfloat("max_initial_Q")
+            self.agent.use_array_Q = config["temporal-difference"].getboolean("array_Q_table")
 
     def start(self):
         """
@@ -87,7 +87,7 @@ class ControllerREINFORCE(Controller):
         action_choice = np.random.choice(self.env.NUM_ACTIONS, p=softmax_probs)
         action = self.env.action_space[action_choice]
         new_state, reward, episode_done = self.agent.step(action)
-        gradient = self.agent.compute_gradient(state, action)
+        gradient = self.agent.compute_gradient(state, action, softmax_probs)
         self.gradients.append(gradient)
         self.rewards.append(reward)
         self.total_reward += reward
@@ -51,6 +51,7 @@ class ControllerValueIter(Controller):
             self.agent.GAMMA = config["dynamic-programming"].getfloat("gamma")
             self.no_of_greedy_episodes = config["dynamic-programming"].getint("greedy_episodes")
             self.no_of_exploration_episodes = config["dynamic-programming"].getint("exploration_episodes")
+            self.agent.planning_mode = config["dynamic-programming"].get("value_iteration_mode")
 
     def start(self):
         """
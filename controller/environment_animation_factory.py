@@ -21,58 +21,53 @@ class EnvironmentAnimationFactory:
     based on the environment selected on the GUI.
     """
 
-    def create_environment_and_animation(environment, root):
+    def create_environment(environment):
+        grid_world_algorithms = ["Value Iteration", "Policy Iteration", "First-visit Monte Carlo Control",
+                                 "Q-Learning", "SARSA", "REINFORCE", "Actor-Critic"]
         if environment == "Frozen Lake 4x4":
-            env = FrozenLake(False, grid_size=4)
-            animation = AnimationFrozenLake(root, env.GRID_MAP, update_animation=True)
-            algorithms = ["Value Iteration", "Policy Iteration", "First-visit Monte Carlo Control", "Q-Learning",
-                          "SARSA", "REINFORCE", "Actor-Critic"]
-            return env, animation, algorithms
+            return FrozenLake(False, grid_size=4), grid_world_algorithms
         if environment == "Frozen Lake 4x4 - Slippery":
-            env = FrozenLake(True, grid_size=4)
-            animation = AnimationFrozenLake(root, env.GRID_MAP, update_animation=True)
-            algorithms = ["Value Iteration", "Policy Iteration", "First-visit Monte Carlo Control", "Q-Learning",
-                          "SARSA", "REINFORCE", "Actor-Critic"]
-            return env, animation, algorithms
+            return FrozenLake(True, grid_size=4), grid_world_algorithms
         if environment == "Frozen Lake 8x8":
-            env = FrozenLake(False, grid_size=8)
-            animation = AnimationFrozenLake8x8(root, env.GRID_MAP, update_animation=True)
-            algorithms = ["Value Iteration", "Policy Iteration", "First-visit Monte Carlo Control", "Q-Learning",
-                          "SARSA", "REINFORCE", "Actor-Critic"]
-            return env, animation, algorithms
+            return FrozenLake(False, grid_size=8), grid_world_algorithms
         if environment == "Frozen Lake 8x8 - Slippery":
-            env = FrozenLake(True, grid_size=8)
+            return FrozenLake(True, grid_size=8), grid_world_algorithms
+        if environment == "Cliff Walking":
+            return CliffWalking(), ["Q-Learning", "SARSA"]
+        if environment == "Taxi Driver":
+            return TaxiDriver(), ["Value Iteration", "Policy Iteration", "Q-Learning", "SARSA"]
+        if environment == "CartPole":
+            return CartPole(), ["Deep Q-Network for CartPole"]
+        if environment == "Pong":
+            return Pong(), ["Deep Q-Network for Pong"]
+        if environment == "Lunar Lander":
+            return LunarLander(), ["DDPG for Lunar Lander"]
+        if environment == "Bipedal Walker":
+            return BipedalWalker(), ["DDPG for Bipedal Walker"]
+
+    def create_environment_and_animation(environment, root):
+        env, algorithms = EnvironmentAnimationFactory.create_environment(environment)
+        if environment in ["Frozen Lake 4x4", "Frozen Lake 4x4 - Slippery"]:
+            animation = AnimationFrozenLake(root, env.GRID_MAP, update_animation=True)
+            return env, animation, algorithms
+        if environment in ["Frozen Lake 8x8", "Frozen Lake 8x8 - Slippery"]:
             animation = AnimationFrozenLake8x8(root, env.GRID_MAP, update_animation=True)
-            algorithms = ["Value Iteration", "Policy Iteration", "First-visit Monte Carlo Control", "Q-Learning",
-                          "SARSA", "REINFORCE", "Actor-Critic"]
             return env, animation, algorithms
         if environment == "Cliff Walking":
-            env = CliffWalking()
             animation = AnimationCliffWalking(root, env.GRID_MAP, update_animation=True)
-            algorithms = ["Q-Learning", "SARSA"]
             return env, animation, algorithms
         if environment == "Taxi Driver":
-            env = TaxiDriver()
             animation = AnimationTaxiDriver(root, env, update_animation=True)
-            algorithms = ["Value Iteration", "Policy Iteration", "Q-Learning", "SARSA"]
             return env, animation, algorithms
         if environment == "CartPole":
-            env = CartPole()
             animation = AnimationCartPole(root, env, update_animation=True)
-            algorithms = ["Deep Q-Network for CartPole"]
             return env, animation, algorithms
         if environment == "Pong":
-            env = Pong()
             animation = AnimationPong(root, env, update_animation=True)
-            algorithms = ["Deep Q-Network for Pong"]
             return env, animation, algorithms
         if environment == "Lunar Lander":
-            env = LunarLander()
             animation = AnimationLunarLander(root, env, update_animation=True)
-            algorithms = ["DDPG for Lunar Lander"]
             return env, animation, algorithms
         if environment == "Bipedal Walker":
-            env = BipedalWalker()
             animation = AnimationBipedalWalker(root, env, update_animation=True)
-            algorithms = ["DDPG for Bipedal Walker"]
-            return env, animation, algorithms
\ No newline at end of file
+            return env, animation, algorithms
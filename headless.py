@@ -0,0 +1,71 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from controller.environment_animation_factory import EnvironmentAnimationFactory
+from controller.controller_agent_factory import ControllerAgentFactory
+from view.headless_gui import HeadlessGUI, HeadlessRoot
+from model.trajectory_recorder import TrajectoryRecorder, RecordingEnvironment
+import argparse
+
+
+class HeadlessDriver:
+    """
+    Driver class for running the program without a display. Connects up the controller, agent and environment
+    instances with a headless GUI, then runs the selected algorithm as fast as possible with no animation.
+    Statistical information is printed to standard output rather than shown in the listbox.
+
+    If a record directory is given, every transition of the environment is recorded there for offline training.
+    """
+
+    def __init__(self, environment, algorithm=None, load_best_model=False, plot_file=None, record_directory=None):
+        self.root = HeadlessRoot()
+        self.gui = HeadlessGUI(self.root)
+        self.gui.selected_environment.set(environment)
+        environment_and_algorithms = EnvironmentAnimationFactory.create_environment(environment)
+        if environment_and_algorithms is None:
+            raise ValueError("Unknown environment '{0}'.".format(environment))
+        self.env, algorithms = environment_and_algorithms
+        if algorithm is None:
+            algorithm = algorithms[0]
+        if algorithm not in algorithms:
+            raise ValueError("Algorithm '{0}' is not available for {1}. Choose from: {2}".format(
+                algorithm, environment, ", ".join(algorithms)))
+        self.gui.selected_algorithm.set(algorithm)
+        self.recorder = None
+        if record_directory is not None:
+            self.recorder = TrajectoryRecorder(record_directory)
+            self.env = RecordingEnvironment(self.env, self.recorder)
+        self.controller, self.agent = ControllerAgentFactory.create_controller_and_agent(algorithm, self.env,
+                                                                                        self.gui)
+        if load_best_model:
+            self.gui.load_best_model.set(1)
+        self.plot_file = plot_file
+
+    def run(self):
+        """
+        Starts the controller and runs every scheduled step in a tight loop until all episodes have finished.
+        If a plot file was given, the graph of average rewards is saved to it.
+        """
+
+        self.controller.start()
+        self.root.mainloop()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.plot_file is not None and plt.get_fignums():
+            plt.savefig(self.plot_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs a learning algorithm without the GUI, using the parameters "
+                                                 "in config.txt.")
+    parser.add_argument("environment", help="environment name, e.g. \"Frozen Lake 4x4\" or \"Taxi Driver\"")
+    parser.add_argument("algorithm", nargs="?", default=None,
+                        help="algorithm name, e.g. \"Q-Learning\" (defaults to the first available algorithm)")
+    parser.add_argument("--load-best-model", action="store_true",
+                        help="test the saved best model parameters (deep learning algorithms only)")
+    parser.add_argument("--plot", default=None, metavar="FILE",
+                        help="save the graph of average rewards to the given image file")
+    parser.add_argument("--record", default=None, metavar="DIRECTORY",
+                        help="record every transition of the environment to .npz shards in the given directory")
+    args = parser.parse_args()
+    HeadlessDriver(args.environment, args.algorithm, args.load_best_model, args.plot, args.record).run()
@@ -68,4 +68,5 @@ class MainDriver:
 
 
 # Runs the program.
-MainDriver()
\ No newline at end of file
+if __name__ == "__main__":
+    MainDriver()
\ No newline at end of file
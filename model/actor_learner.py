@@ -0,0 +1,139 @@
+import copy
+import queue
+import numpy as np
+import torch
+import torch.multiprocessing as multiprocessing
+
+
+def _run_actor(make_env, shared_net, transition_queue, stop_event, epsilon, epsilon_decay, final_epsilon,
+               sync_frames, chunk_size):
+    """
+    Runs in an actor subprocess, stepping its own copy of the environment with an epsilon greedy policy from a
+    local copy of the shared network, until told to stop. The consecutive transitions of an episode are sent to
+    the learner in chunks, as the first origin state followed by the actions, rewards, new states and dones,
+    along with the total reward of the episode if the chunk finishes it.
+
+    @param make_env: the environment class, or another picklable callable which creates the environment
+    @param shared_net: the network in shared memory which the learner publishes its weights to
+    @param transition_queue: the queue which the chunks of transitions are sent to the learner through
+    @param stop_event: the event which tells the actor to stop
+    @param epsilon: the starting probability of taking a random action
+    @param epsilon_decay: the amount deducted from epsilon after every frame of this actor
+    @param final_epsilon: the lowest value that epsilon will be reduced to
+    @param sync_frames: the number of frames between copying the shared network's weights
+    @param chunk_size: the largest number of transitions sent in a single chunk
+    """
+
+    torch.set_num_threads(1)
+    rng = np.random.default_rng()
+    env = make_env()
+    net = copy.deepcopy(shared_net)
+    frames = 0
+    episode_reward = 0.0
+    first_state, actions, rewards, new_states, dones = None, [], [], [], []
+    while not stop_event.is_set():
+        if frames % sync_frames == 0:
+            net.load_state_dict(shared_net.state_dict())
+        if rng.random() < epsilon:
+            action = env.random_action()
+        else:
+            with torch.no_grad():
+                state_t = torch.from_numpy(np.asarray([env.current_state]))
+                action = net(state_t).argmax(dim=1).item()
+        origin_state, reward, new_state, episode_done = env.execute_action(action)
+        frames += 1
+        epsilon = max(final_epsilon, epsilon - epsilon_decay)
+        episode_reward += reward
+
+        if first_state is None:
+            first_state = origin_state
+        actions.append(action)
+        rewards.append(reward)
+        new_states.append(new_state)
+        dones.append(episode_done)
+        if episode_done or len(actions) == chunk_size:
+            transition_queue.put((first_state, np.array(actions), np.array(rewards, dtype=np.float32),
+                                  np.stack(new_states), np.array(dones), episode_reward if episode_done else None))
+            first_state, actions, rewards, new_states, dones = None, [], [], [], []
+        if episode_done:
+            env.restart_environment()
+            episode_reward = 0.0
+
+
+class ActorLearner:
+    """
+    Asynchronous training for a Deep Q-Network agent, which separates acting from learning. Each of the actor
+    subprocesses steps its own copy of the environment, choosing actions with a local copy of the agent's
+    network, and sends its transitions to the learner through a bounded queue. The learner, which runs in the
+    controller's process, appends the transitions to the agent's replay buffer and performs the backwards
+    passes, so stepping the environments and gradient descent overlap and every core can be used.
+
+    The learner publishes the weights of the agent's network to a copy in shared memory, which the actors load
+    from periodically. The weights are copied without a lock, so an actor may occasionally load a mix of two
+    consecutive versions, which only affects the actions it chooses.
+
+    The transitions of an episode are sent in chunks of consecutive transitions, so a FrameReplayBuffer still
+    stores each frame of an episode once, except at the start of each chunk.
+    """
+
+    def __init__(self, agent, make_env, num_actors, epsilon=1.0, epsilon_decay=0.0, final_epsilon=0.0,
+                 sync_frames=1000, chunk_size=32, queue_size=16):
+        self.agent = agent
+        self.NUM_ACTORS = num_actors
+        self.shared_net = copy.deepcopy(agent.net)
+        self.shared_net.share_memory()
+        self.transition_queue = multiprocessing.Queue(queue_size)
+        self.stop_event = multiprocessing.Event()
+        self.actors = []
+        for _ in range(num_actors):
+            actor = multiprocessing.Process(target=_run_actor, daemon=True, args=(
+                make_env, self.shared_net, self.transition_queue, self.stop_event, epsilon,
+                epsilon_decay * num_actors, final_epsilon, max(sync_frames // num_actors, 1), chunk_size))
+            actor.start()
+            self.actors.append(actor)
+
+    def collect(self, max_chunks=16):
+        """
+        Appends the transitions already sent by the actors to the agent's replay buffer, without waiting for
+        more to arrive.
+
+        @param max_chunks: the largest number of chunks of transitions to collect
+        @return: list of the total rewards of the episodes which have finished, and the number of frames collected
+        """
+
+        episode_rewards = []
+        frames = 0
+        for _ in range(max_chunks):
+            try:
+                state, actions, rewards, new_states, dones, episode_reward = self.transition_queue.get_nowait()
+            except queue.Empty:
+                break
+            for action, reward, new_state, done in zip(actions, rewards, new_states, dones):
+                self.agent.replay_buffer.append(state, action, reward, new_state, done)
+                state = new_state
+            frames += len(actions)
+            if episode_reward is not None:
+                episode_rewards.append(episode_reward)
+        return episode_rewards, frames
+
+    def publish_weights(self):
+        """
+        Copies the weights of the agent's network to the shared network, ready for the actors to load.
+        """
+
+        self.shared_net.load_state_dict(self.agent.net.state_dict())
+
+    def close(self):
+        """
+        Tells the actors to stop, and empties the queue until they have all finished, so none are left blocked
+        on a full queue.
+        """
+
+        self.stop_event.set()
+        while any(actor.is_alive() for actor in self.actors):
+            try:
+                self.transition_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for actor in self.actors:
+            actor.join()
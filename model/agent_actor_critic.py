@@ -1,4 +1,5 @@
 from model.agent import Agent
+from model.softmax_policy import softmax_probabilities
 import numpy as np
 
 
@@ -6,6 +7,9 @@ class AgentActorCritic(Agent):
     """
     This Agent class implements the Actor-Critic algorithm, to solve the problem of the given environment. 
     The algorithm learns on the fly without any need for knowledge of the environment dynamics.
+
+    Both the actor's softmax policy and the critic's Q-values use the feature vectors precomputed in the
+    environment's feature tensor.
     """
 
     def __init__(self, env, gamma=1.0, alpha=0.1, beta=0.1):
@@ -44,14 +48,7 @@ class AgentActorCritic(Agent):
         @return: the softmax probabilities
         """
 
-        probs = np.array([])
-        for action in self.env.action_space:
-            feature_vector = self.env.get_feature_vector(state, action)
-            p = feature_vector.dot(self.theta)
-            probs = np.append(probs, p)
-        e = np.exp(probs)
-        softmax_probs = e / np.sum(e)
-        return softmax_probs
+        return softmax_probabilities(self.env.feature_tensor[self.env.encode_state(state)], self.theta)
 
     def Q(self, state, action):
         """
@@ -62,25 +59,24 @@ class AgentActorCritic(Agent):
         @return: the calculated Q-value
         """
 
-        feature_vector = self.env.get_feature_vector(state, action)
+        feature_vector = self.env.feature_tensor[self.env.encode_state(state), self.env.action_ids[action]]
         Q_value = feature_vector.dot(self.w)
         return Q_value
 
-    def compute_gradient(self, state, action):
+    def compute_gradient(self, state, action, softmax_probs=None):
         """
         Computes the gradient for the log of the policy of the given state and action.
 
         @param state: the given state
         @param action: the given action
+        @param softmax_probs: the softmax probabilities of the state, if already calculated by policy()
         @return: the computed gradient
         """
 
-        feature_vector = self.env.get_feature_vector(state, action)
-        probs = self.policy(state)
-        sum = np.zeros(len(feature_vector))
-        for i in range(len(probs)):
-            sum += probs[i] * self.env.get_feature_vector(state, self.env.action_space[i])
-        gradient = feature_vector - sum
+        feature_vectors = self.env.feature_tensor[self.env.encode_state(state)]
+        if softmax_probs is None:
+            softmax_probs = softmax_probabilities(feature_vectors, self.theta)
+        gradient = feature_vectors[self.env.action_ids[action]] - softmax_probs @ feature_vectors
         return gradient
 
     def update_weights(self, gradient, state, action, reward, new_state, new_action):
@@ -98,7 +94,7 @@ class AgentActorCritic(Agent):
 
         self.theta += self.ALPHA * gradient * self.Q(state, action)
         delta = reward + self.GAMMA * self.Q(new_state, new_action) - self.Q(state, action)
-        self.w += self.BETA * delta * self.env.get_feature_vector(state, action)
+        self.w += self.BETA * delta * self.env.feature_tensor[self.env.encode_state(state), self.env.action_ids[action]]
 
     def get_all_softmax_probabilities(self):
         """
@@ -107,8 +103,5 @@ class AgentActorCritic(Agent):
         @return: mapping of state to action softmax probabilities
         """
 
-        all_probs = {}
-        for state in self.env.state_space:
-            probs = self.policy(state)
-            all_probs[state] = probs
-        return all_probs
+        all_probs = softmax_probabilities(self.env.feature_tensor, self.theta)
+        return dict(zip(self.env.state_space, all_probs))
@@ -0,0 +1,255 @@
+from model.agent import Agent
+from model.replay_buffer import ReplayBuffer
+from model.network_parameters import flatten_parameters
+import torch
+import numpy as np
+import torch.nn as nn
+
+
+class Actor(nn.Module):
+    """
+    This class defines the actor neural network model for the DDPG algorithm.
+    """
+
+    def __init__(self, input_shape, output_shape, hidden_sizes):
+        super(Actor, self).__init__()
+
+        self.net = nn.Sequential(
+            nn.Linear(input_shape, hidden_sizes[0]),
+            nn.ReLU(),
+            nn.Linear(hidden_sizes[0], hidden_sizes[1]),
+            nn.ReLU(),
+            nn.Linear(hidden_sizes[1], output_shape),
+            nn.Tanh()
+        )
+
+    def forward(self, state):
+        return self.net(state)
+
+
+class Critic(nn.Module):
+    """
+    This class defines the critic neural network model for the DDPG algorithm.
+    """
+
+    def __init__(self, input_shape, hidden_sizes):
+        super(Critic, self).__init__()
+
+        self.net = nn.Sequential(
+            nn.Linear(input_shape, hidden_sizes[0]),
+            nn.ReLU(),
+            nn.Linear(hidden_sizes[0], hidden_sizes[1]),
+            nn.ReLU(),
+            nn.Linear(hidden_sizes[1], 1)
+        )
+
+    def forward(self, state, action):
+        x = torch.cat([state, action], 1)
+        return self.net(x)
+
+
+class OUNoise:
+    """
+    Code taken and modified from:
+    https://github.com/tobiassteidle/Reinforcement-Learning/blob/master/OpenAI/LunarLander-v2/ddpg_agent.py
+
+    This class implements the Ornstein–Uhlenbeck process, which is used for exploration in the
+    DDPG algorithm.
+    """
+
+    def __init__(self, action_dim):
+        self.mu = 0
+        self.theta = 0.1
+        self.sigma = 0.2
+        self.action_dim = action_dim
+        self.reset()
+
+    def reset(self):
+        self.state = np.ones(self.action_dim) * self.mu
+
+    def get_noise(self):
+        x = self.state
+        dx = self.theta * (self.mu - x) + self.sigma * np.random.randn(self.action_dim)
+        self.state = x + dx
+        return self.state
+
+
+class AgentDDPG(Agent):
+    """
+    This Agent class implements the Deep Deterministic Policy Gradient algorithm, shared by the agents for the
+    Lunar Lander and Bipedal Walker environments, which only differ in the sizes of their hidden layers and their
+    default hyperparameters. This is a deep learning algorithm which uses neural networks from the PyTorch package.
+
+    Each backwards pass updates the critic first. The actor is then updated through the new critic, with the
+    critic's parameters frozen so no gradients are calculated for them. If POLICY_DELAY is greater than 1, the
+    actor is only updated every POLICY_DELAY backwards passes, as in TD3.
+
+    The replay buffer holds REPLAY_SIZE transitions. If REPLAY_DIRECTORY is set, it is kept in memory-mapped files
+    in that directory rather than in memory, and the transitions stored there by an earlier run are reused.
+    """
+
+    def __init__(self, env, hidden_sizes, gamma, alpha_actor, alpha_critic, tau, batch_size, train_freq=1,
+                 gradient_steps=1, learning_starts=0, target_update_steps=1, policy_delay=1, replay_size=1000000,
+                 replay_directory=None):
+        self.GAMMA = gamma
+        self.ALPHA_ACTOR = alpha_actor
+        self.ALPHA_CRITIC = alpha_critic
+        self.TAU = tau
+        self.TARGET_UPDATE_STEPS = target_update_steps
+        self.POLICY_DELAY = policy_delay
+        self.BATCH_SIZE = batch_size
+        self.TRAIN_FREQ = train_freq
+        self.GRADIENT_STEPS = gradient_steps
+        self.LEARNING_STARTS = learning_starts
+        self.REPLAY_SIZE = replay_size
+        self.REPLAY_DIRECTORY = replay_directory
+        self.HIDDEN_SIZES = hidden_sizes
+        self.env = env
+        self.critic_loss_function = nn.MSELoss()
+        self.ounoise = OUNoise(self.env.gym_env.action_space.shape[0])
+        self.state_array = np.zeros((1, *self.env.gym_env.observation_space.shape), dtype=np.float32)
+        self.state_t = torch.from_numpy(self.state_array)
+        self.restart_matrices()
+
+    def restart_matrices(self):
+        """
+        Resets the neural networks and replay buffer.
+        """
+
+        num_obs = self.env.gym_env.observation_space.shape[0]
+        num_acts = self.env.gym_env.action_space.shape[0]
+        self.actor = Actor(num_obs, num_acts, self.HIDDEN_SIZES)
+        self.actor_target = Actor(num_obs, num_acts, self.HIDDEN_SIZES)
+        self.actor_target.load_state_dict(self.actor.state_dict())
+        self.critic = Critic(num_obs + num_acts, self.HIDDEN_SIZES)
+        self.critic_target = Critic(num_obs + num_acts, self.HIDDEN_SIZES)
+        self.critic_target.load_state_dict(self.critic.state_dict())
+        self.parameter_vector = flatten_parameters(self.actor, self.critic)
+        self.target_parameter_vector = flatten_parameters(self.actor_target, self.critic_target)
+        self.actor_optimiser = torch.optim.Adam(self.actor.parameters(), lr=self.ALPHA_ACTOR)
+        self.critic_optimiser = torch.optim.Adam(self.critic.parameters(), lr=self.ALPHA_CRITIC)
+        self.replay_buffer = ReplayBuffer(self.REPLAY_SIZE, (num_obs,), (num_acts,), np.float32, self.REPLAY_DIRECTORY)
+        self.step_counter = 0
+        self.backwards_pass_counter = 0
+
+    def step(self, epsilon):
+        """
+        Uses the agent's actor neural network to choose the best action, then executes it in the environment,
+        appending the transition information to the replay buffer.
+
+        @return: the resulting new state, reward received, and whether the episode has finished.
+        """
+
+        action = self._best_action()
+        noise = epsilon * self.ounoise.get_noise()
+        action = np.clip(action + noise, -1.0, 1.0)
+
+        origin_state, reward, new_state, episode_done = self.env.execute_action(action)
+
+        self.replay_buffer.append(origin_state, action, reward, new_state, episode_done)
+
+        self._train()
+
+        return new_state, reward, episode_done
+
+    def test_step(self):
+        """
+        Uses the agent's actor neural network to choose the best action, then executes it in the environment.
+        Does not perform backwards pass to update network parameters.
+
+        @return: the resulting new state, reward received, and whether the episode has finished.
+        """
+
+        action = self._best_action()
+
+        origin_state, reward, new_state, episode_done = self.env.execute_action(action)
+
+        return new_state, reward, episode_done
+
+    def _best_action(self):
+        """
+        Chooses the actor's action in the current state. The state is copied into a preallocated input tensor, and
+        the forward pass is run without building an autograd graph.
+
+        @return: the chosen action
+        """
+
+        np.copyto(self.state_array[0], self.env.current_state)
+        with torch.no_grad():
+            return self.actor(self.state_t)[0].numpy()
+
+    def _train(self, steps=1):
+        """
+        Counts the given number of environment steps, then performs GRADIENT_STEPS backwards passes for every
+        TRAIN_FREQ steps, once more than LEARNING_STARTS steps have been taken and the replay buffer holds more than
+        a batch of transitions.
+
+        @param steps: the number of environment steps taken since the last call
+        """
+
+        previous_step_counter = self.step_counter
+        self.step_counter += steps
+        if self.step_counter > self.LEARNING_STARTS and len(self.replay_buffer) > self.BATCH_SIZE:
+            train_events = self.step_counter // self.TRAIN_FREQ - previous_step_counter // self.TRAIN_FREQ
+            for _ in range(self.GRADIENT_STEPS * train_events):
+                self._backwards_pass()
+
+    def _backwards_pass(self):
+        """
+        Code taken and modified from:
+        https://github.com/PacktPublishing/Deep-Reinforcement-Learning-Hands-On/blob/master/Chapter06/02_dqn_pong.py
+
+        Code for soft-update of target networks modified from:
+        https://github.com/tobiassteidle/Reinforcement-Learning/blob/master/OpenAI/LunarLander-v2/ddpg_agent.py
+
+        Samples a batch of transitions from the replay buffer, and performs stochastic gradient descent
+        to update the weights of the agent's critic and, every POLICY_DELAY backwards passes, its actor. The
+        target Q values are calculated without building a graph.
+        """
+
+        states, actions, rewards, new_states, dones = self.replay_buffer.sample(self.BATCH_SIZE)
+        states_t = torch.from_numpy(states)
+        actions_t = torch.from_numpy(actions)
+        rewards_t = torch.from_numpy(rewards).unsqueeze(-1)
+        new_states_t = torch.from_numpy(new_states)
+        not_dones_t = torch.from_numpy(~dones).float().unsqueeze(-1)
+
+        with torch.no_grad():
+            next_q_vals = self.critic_target(new_states_t, self.actor_target(new_states_t))
+            target_q_vals = rewards_t + self.GAMMA * not_dones_t * next_q_vals
+        critic_loss = self.critic_loss_function(self.critic(states_t, actions_t), target_q_vals)
+
+        self.critic_optimiser.zero_grad()
+        critic_loss.backward()
+        self.critic_optimiser.step()
+
+        self.backwards_pass_counter += 1
+        if self.backwards_pass_counter % self.POLICY_DELAY == 0:
+            self._update_actor(states_t)
+        if self.backwards_pass_counter % self.TARGET_UPDATE_STEPS == 0:
+            self._soft_update()
+
+    def _update_actor(self, states_t):
+        """
+        Performs stochastic gradient descent on the actor, to maximise the critic's Q values of the actor's
+        actions. The critic's parameters are frozen while the actor's loss is backpropagated through it.
+
+        @param states_t: the batch of states sampled from the replay buffer
+        """
+
+        self.critic.requires_grad_(False)
+        actor_loss = -self.critic(states_t, self.actor(states_t)).mean()
+        self.actor_optimiser.zero_grad()
+        actor_loss.backward()
+        self.actor_optimiser.step()
+        self.critic.requires_grad_(True)
+
+    def _soft_update(self):
+        """
+        Moves the parameters of both target networks towards those of the actor and critic networks with a single
+        in-place interpolation of their flattened parameter vectors. When the target networks are only updated every
+        TARGET_UPDATE_STEPS backwards passes, tau is compounded so they follow at the same overall rate.
+        """
+
+        tau = 1.0 - (1.0 - self.TAU) ** self.TARGET_UPDATE_STEPS
+        self.target_parameter_vector.lerp_(self.parameter_vector, tau)
@@ -1,6 +1,6 @@
 from model.agent import Agent
+from model.replay_buffer import ReplayBuffer, PrioritisedReplayBuffer
 import torch
-import collections
 import numpy as np
 import torch.nn as nn
 
@@ -9,14 +9,27 @@ class AgentDQNCartPole(Agent):
     """
     This Agent class implements the Deep Q-Networks algorithm, to solve the problem of the given environment.
     This is a deep learning algorithm which uses neural networks from the PyTorch package.
+
+    If prioritised_replay is set, transitions are replayed in proportion to their TD errors, and the loss is
+    weighted by importance-sampling weights to correct for it.
     """
 
-    def __init__(self, env, gamma=1.0, alpha=0.1, batch_size=8):
+    def __init__(self, env, gamma=1.0, alpha=0.1, batch_size=8, prioritised_replay=False,
+                 train_freq=1, gradient_steps=1, learning_starts=0):
         self.GAMMA = gamma
         self.ALPHA = alpha
         self.BATCH_SIZE = batch_size
+        self.TRAIN_FREQ = train_freq
+        self.GRADIENT_STEPS = gradient_steps
+        self.LEARNING_STARTS = learning_starts
+        self.step_counter = 0
+        self.prioritised_replay = prioritised_replay
+        self.PRIORITY_ALPHA = 0.6
+        self.PRIORITY_BETA = 0.4
         self.HIDDEN_NEURONS = 128
         self.env = env
+        self.state_array = np.zeros((1, *self.env.gym_env.observation_space.shape), dtype=np.float32)
+        self.state_t = torch.from_numpy(self.state_array)
         self.net = nn.Sequential(
             nn.Linear(self.env.gym_env.observation_space.shape[0], self.HIDDEN_NEURONS),
             nn.ReLU(),
@@ -30,7 +43,7 @@ class AgentDQNCartPole(Agent):
         )
         self.loss_function = nn.MSELoss()
         self.optimiser = torch.optim.Adam(self.net.parameters(), lr=self.ALPHA)
-        self.replay_buffer = collections.deque(maxlen=1000)
+        self.replay_buffer = self._create_replay_buffer()
 
     def restart_matrices(self):
         """
@@ -49,7 +62,8 @@ class AgentDQNCartPole(Agent):
             nn.Linear(self.HIDDEN_NEURONS, self.env.gym_env.action_space.n)
         )
         self.optimiser = torch.optim.Adam(self.net.parameters(), lr=self.ALPHA)
-        self.replay_buffer = collections.deque(maxlen=1000)
+        self.replay_buffer = self._create_replay_buffer()
+        self.step_counter = 0
 
     def step(self):
         """
@@ -59,17 +73,13 @@ class AgentDQNCartPole(Agent):
         @return: the resulting new state, reward received, and whether the episode has finished.
         """
 
-        state_t = torch.FloatTensor([self.env.current_state])
-        q_vals_t = self.net(state_t)
-        _, action_t = torch.max(q_vals_t, dim=1)
-        action = action_t.item()
+        action = self._best_action()
 
         origin_state, reward, new_state, episode_done = self.env.execute_action(action)
 
-        self.replay_buffer.append((origin_state, action, reward, new_state, episode_done))
+        self.replay_buffer.append(origin_state, action, reward, new_state, episode_done)
 
-        if len(self.replay_buffer) > self.BATCH_SIZE:
-            self._backwards_pass()
+        self._train()
 
         return new_state, reward, episode_done
 
@@ -85,13 +95,40 @@ class AgentDQNCartPole(Agent):
 
         origin_state, reward, new_state, episode_done = self.env.execute_action(action)
 
-        self.replay_buffer.append((origin_state, action, reward, new_state, episode_done))
+        self.replay_buffer.append(origin_state, action, reward, new_state, episode_done)
 
-        if len(self.replay_buffer) > self.BATCH_SIZE:
-            self._backwards_pass()
+        self._train()
 
         return new_state, reward, episode_done
 
+    def vectorised_step(self, vector_env, epsilon):
+        """
+        Chooses actions for every copy of a vectorised environment with a single forward pass of the agent's
+        neural network, taking a random action in each copy with probability epsilon. The random actions are sampled
+        locally, only for the copies which explore, rather than asking every copy of the environment for one. The
+        actions are executed, and each copy's transition is appended to the replay buffer before the backwards
+        passes.
+
+        @param vector_env: the vectorised copies of the environment
+        @param epsilon: the probability of taking a random action in each copy
+        @return: arrays of the rewards received and whether each episode has finished
+        """
+
+        states_t = torch.from_numpy(np.asarray(vector_env.current_state, dtype=np.float32))
+        with torch.no_grad():
+            actions = self.net(states_t).argmax(dim=1).numpy()
+        random_actions = np.random.random(len(actions)) < epsilon
+        actions[random_actions] = np.random.randint(self.env.gym_env.action_space.n, size=random_actions.sum())
+
+        origin_states, rewards, new_states, dones = vector_env.execute_action(actions)
+
+        for transition in zip(origin_states, actions, rewards, new_states, dones):
+            self.replay_buffer.append(*transition)
+
+        self._train(len(actions))
+
+        return rewards, dones
+
     def test_step(self):
         """
         Uses the agent's neural network to choose the best action, then executes it in the environment.
@@ -100,31 +137,60 @@ class AgentDQNCartPole(Agent):
         @return: the resulting new state, reward received, and whether the episode has finished.
         """
 
-        state_t = torch.FloatTensor([self.env.current_state])
-        q_vals_t = self.net(state_t)
-        _, action_t = torch.max(q_vals_t, dim=1)
-        action = action_t.item()
+        action = self._best_action()
 
         _, reward, new_state, episode_done = self.env.execute_action(action)
 
         return new_state, reward, episode_done
 
+    def _best_action(self):
+        """
+        Chooses the action with the highest Q value in the current state. The state is copied into a preallocated
+        input tensor, and the forward pass is run without building an autograd graph.
+
+        @return: the chosen action
+        """
+
+        np.copyto(self.state_array[0], self.env.current_state)
+        with torch.no_grad():
+            return self.net(self.state_t).argmax(dim=1).item()
+
+    def _train(self, steps=1):
+        """
+        Counts the given number of environment steps, then performs GRADIENT_STEPS backwards passes for every
+        TRAIN_FREQ steps, once more than LEARNING_STARTS steps have been taken and the replay buffer holds more than
+        a batch of transitions.
+
+        @param steps: the number of environment steps taken since the last call
+        """
+
+        previous_step_counter = self.step_counter
+        self.step_counter += steps
+        if self.step_counter > self.LEARNING_STARTS and len(self.replay_buffer) > self.BATCH_SIZE:
+            train_events = self.step_counter // self.TRAIN_FREQ - previous_step_counter // self.TRAIN_FREQ
+            for _ in range(self.GRADIENT_STEPS * train_events):
+                self._backwards_pass()
+
     def _backwards_pass(self):
         """
         Code taken and modified from:
         https://github.com/PacktPublishing/Deep-Reinforcement-Learning-Hands-On/blob/master/Chapter06/02_dqn_pong.py
 
         Samples a batch of transitions from the replay buffer, and performs stochastic gradient descent
-        to update the weights of the agent's neural network.
+        to update the weights of the agent's neural network. With prioritised replay, the squared TD errors
+        are weighted by their importance-sampling weights, and the priorities of the batch are updated.
         """
 
-        samples = np.random.choice(len(self.replay_buffer), self.BATCH_SIZE, replace=False)
-        states, actions, rewards, new_states, dones = zip(*[self.replay_buffer[sample] for sample in samples])
-        states_t = torch.FloatTensor(np.array(states))
-        actions_t = torch.tensor(np.array(actions))
-        rewards_t = torch.FloatTensor(np.array(rewards))
-        new_states_t = torch.FloatTensor(np.array(new_states))
-        dones = torch.ByteTensor(np.array(dones, dtype=np.uint8))
+        if self.prioritised_replay:
+            states, actions, rewards, new_states, dones, samples, weights = self.replay_buffer.sample(
+                self.BATCH_SIZE, self.PRIORITY_BETA)
+        else:
+            states, actions, rewards, new_states, dones = self.replay_buffer.sample(self.BATCH_SIZE)
+        states_t = torch.from_numpy(states)
+        actions_t = torch.from_numpy(actions)
+        rewards_t = torch.from_numpy(rewards)
+        new_states_t = torch.from_numpy(new_states)
+        dones = torch.from_numpy(dones)
 
         self.optimiser.zero_grad()
 
@@ -133,6 +199,24 @@ class AgentDQNCartPole(Agent):
         new_state_vals[dones] = 0
         expected_q_vals = rewards_t + self.GAMMA * new_state_vals
 
-        loss = self.loss_function(q_vals, expected_q_vals)
+        if self.prioritised_replay:
+            td_errors = expected_q_vals - q_vals
+            loss = (torch.from_numpy(weights) * td_errors ** 2).mean()
+            self.replay_buffer.update_priorities(samples, td_errors.detach().numpy())
+        else:
+            loss = self.loss_function(q_vals, expected_q_vals)
         loss.backward()
         self.optimiser.step()
+
+    def _create_replay_buffer(self):
+        """
+        Creates an empty replay buffer, which is wrapped for prioritised experience replay if prioritised_replay
+        is set.
+
+        @return: the new replay buffer
+        """
+
+        replay_buffer = ReplayBuffer(1000, self.env.gym_env.observation_space.shape)
+        if self.prioritised_replay:
+            replay_buffer = PrioritisedReplayBuffer(replay_buffer, self.PRIORITY_ALPHA)
+        return replay_buffer
@@ -1,8 +1,9 @@
 from model.agent import Agent
+from model.replay_buffer import FrameReplayBuffer, PrioritisedReplayBuffer
 import torch
-import collections
 import numpy as np
 import torch.nn as nn
+import os.path
 
 
 class PongModel(nn.Module):
@@ -44,9 +45,11 @@ class PongModel(nn.Module):
 
     def forward(self, x):
         """
-        Defines the forward pass function for this model.
+        Defines the forward pass function for this model. The input stacks of frames have pixel values between
+        0 and 255, and are scaled to floats between 0 and 1 here, so they can be stored and passed in as uint8.
         """
 
+        x = x.float() / 255.0
         conv_out = self.conv(x).view(x.size()[0], -1)
         return self.fc(conv_out)
 
@@ -55,18 +58,33 @@ class AgentDQNPong(Agent):
     """
     This Agent class implements the Deep Q-Networks algorithm, to solve the problem of the given environment.
     This is a deep learning algorithm which uses neural networks from the PyTorch package.
+
+    The replay buffer stores each Pong frame once as a uint8 image, rather than every stack of frames as floats,
+    so a buffer of REPLAY_SIZE transitions needs around 7 KB per transition. If prioritised_replay is set,
+    transitions with larger TD errors are replayed more often.
     """
 
-    def __init__(self, env, gamma=0.99, alpha=0.0001, batch_size=32):
+    def __init__(self, env, gamma=0.99, alpha=0.0001, batch_size=32, replay_size=10000, prioritised_replay=False,
+                 train_freq=1, gradient_steps=1, learning_starts=0):
         self.GAMMA = gamma
         self.ALPHA = alpha
         self.BATCH_SIZE = batch_size
+        self.TRAIN_FREQ = train_freq
+        self.GRADIENT_STEPS = gradient_steps
+        self.LEARNING_STARTS = learning_starts
+        self.step_counter = 0
+        self.REPLAY_SIZE = replay_size
+        self.prioritised_replay = prioritised_replay
+        self.PRIORITY_ALPHA = 0.6
+        self.PRIORITY_BETA = 0.4
         self.env = env
+        self.state_array = np.zeros((1, *self.env.gym_env.observation_space.shape), dtype=np.uint8)
+        self.state_t = torch.from_numpy(self.state_array)
         self.net = PongModel(self.env.gym_env.observation_space.shape, self.env.gym_env.action_space.n)
         self.target_net = PongModel(self.env.gym_env.observation_space.shape, self.env.gym_env.action_space.n)
         self.loss_function = nn.MSELoss()
         self.optimiser = torch.optim.Adam(self.net.parameters(), lr=self.ALPHA)
-        self.replay_buffer = collections.deque(maxlen=10000)
+        self.replay_buffer = self._create_replay_buffer()
 
     def restart_matrices(self):
         """
@@ -76,7 +94,8 @@ class AgentDQNPong(Agent):
         self.net = PongModel(self.env.gym_env.observation_space.shape, self.env.gym_env.action_space.n)
         self.target_net = PongModel(self.env.gym_env.observation_space.shape, self.env.gym_env.action_space.n)
         self.optimiser = torch.optim.Adam(self.net.parameters(), lr=self.ALPHA)
-        self.replay_buffer = collections.deque(maxlen=10000)
+        self.replay_buffer = self._create_replay_buffer()
+        self.step_counter = 0
 
     def step(self):
         """
@@ -86,17 +105,13 @@ class AgentDQNPong(Agent):
         @return: the resulting new state, reward received, and whether the episode has finished.
         """
 
-        state_t = torch.FloatTensor([self.env.current_state])
-        q_vals_t = self.net(state_t)
-        _, action_t = torch.max(q_vals_t, dim=1)
-        action = action_t.item()
+        action = self._best_action()
 
         origin_state, reward, new_state, episode_done = self.env.execute_action(action)
 
-        self.replay_buffer.append((origin_state, action, reward, new_state, episode_done))
+        self.replay_buffer.append(origin_state, action, reward, new_state, episode_done)
 
-        if len(self.replay_buffer) > self.BATCH_SIZE:
-            self._backwards_pass()
+        self._train()
 
         return new_state, reward, episode_done
 
@@ -112,10 +127,9 @@ class AgentDQNPong(Agent):
 
         origin_state, reward, new_state, episode_done = self.env.execute_action(action)
 
-        self.replay_buffer.append((origin_state, action, reward, new_state, episode_done))
+        self.replay_buffer.append(origin_state, action, reward, new_state, episode_done)
 
-        if len(self.replay_buffer) > self.BATCH_SIZE:
-            self._backwards_pass()
+        self._train()
 
         return new_state, reward, episode_done
 
@@ -127,31 +141,105 @@ class AgentDQNPong(Agent):
         @return: the resulting new state, reward received, and whether the episode has finished.
         """
 
-        state_t = torch.FloatTensor([self.env.current_state])
-        q_vals_t = self.net(state_t)
-        _, action_t = torch.max(q_vals_t, dim=1)
-        action = action_t.item()
+        action = self._best_action()
 
         _, reward, new_state, episode_done = self.env.execute_action(action)
 
         return new_state, reward, episode_done
 
+    def learn(self, steps):
+        """
+        Performs the backwards passes due for the given number of environment steps. Used when the transitions
+        are collected by separate actor processes rather than by the agent's own steps.
+
+        @param steps: the number of environment steps collected since the last call
+        """
+
+        self._train(steps)
+
+    def save_checkpoint(self, directory):
+        """
+        Saves the agent's networks, optimiser state and step counter to agent.pth in the given directory, and its
+        replay buffer to replay_buffer.npz. The files are written in place, so the caller should save into a new
+        directory and swap it in, as the controller does, to keep the previous checkpoint intact through a crash.
+
+        @param directory: the existing directory to save the checkpoint files to
+        """
+
+        torch.save({"net": self.net.state_dict(), "target_net": self.target_net.state_dict(),
+                    "optimiser": self.optimiser.state_dict(), "step_counter": self.step_counter,
+                    "replay_size": self.REPLAY_SIZE, "prioritised_replay": self.prioritised_replay},
+                   os.path.join(directory, "agent.pth"))
+        with open(os.path.join(directory, "replay_buffer.npz"), "wb") as buffer_file:
+            np.savez(buffer_file, **self.replay_buffer.state_dict())
+
+    def load_checkpoint(self, directory):
+        """
+        Restores the agent's networks, optimiser state, step counter and replay buffer from the checkpoint files
+        saved by save_checkpoint, so training continues exactly where it stopped without refilling the buffer.
+
+        @param directory: the directory containing the checkpoint files
+        """
+
+        checkpoint = torch.load(os.path.join(directory, "agent.pth"), weights_only=True)
+        self.net.load_state_dict(checkpoint["net"])
+        self.target_net.load_state_dict(checkpoint["target_net"])
+        self.optimiser.load_state_dict(checkpoint["optimiser"])
+        self.step_counter = checkpoint["step_counter"]
+        self.REPLAY_SIZE = checkpoint["replay_size"]
+        self.prioritised_replay = checkpoint["prioritised_replay"]
+        self.replay_buffer = self._create_replay_buffer()
+        with np.load(os.path.join(directory, "replay_buffer.npz")) as buffer_state:
+            self.replay_buffer.load_state_dict(buffer_state)
+
+    def _best_action(self):
+        """
+        Chooses the action with the highest Q value in the current state. The state is copied into a preallocated
+        input tensor, and the forward pass is run without building an autograd graph.
+
+        @return: the chosen action
+        """
+
+        np.copyto(self.state_array[0], self.env.current_state)
+        with torch.no_grad():
+            return self.net(self.state_t).argmax(dim=1).item()
+
+    def _train(self, steps=1):
+        """
+        Counts the given number of environment steps, then performs GRADIENT_STEPS backwards passes for every
+        TRAIN_FREQ steps, once more than LEARNING_STARTS steps have been taken and the replay buffer holds more than
+        a batch of transitions.
+
+        @param steps: the number of environment steps taken since the last call
+        """
+
+        previous_step_counter = self.step_counter
+        self.step_counter += steps
+        if self.step_counter > self.LEARNING_STARTS and len(self.replay_buffer) > self.BATCH_SIZE:
+            train_events = self.step_counter // self.TRAIN_FREQ - previous_step_counter // self.TRAIN_FREQ
+            for _ in range(self.GRADIENT_STEPS * train_events):
+                self._backwards_pass()
+
     def _backwards_pass(self):
         """
         Code taken and modified from:
         https://github.com/PacktPublishing/Deep-Reinforcement-Learning-Hands-On/blob/master/Chapter06/02_dqn_pong.py
 
         Samples a batch of transitions from the replay buffer, and performs stochastic gradient descent
-        to update the weights of the agent's neural network.
+        to update the weights of the agent's neural network. With prioritised replay, the squared TD errors
+        are weighted by their importance-sampling weights, and the priorities of the batch are updated.
         """
 
-        samples = np.random.choice(len(self.replay_buffer), self.BATCH_SIZE, replace=False)
-        states, actions, rewards, new_states, dones = zip(*[self.replay_buffer[sample] for sample in samples])
-        states_t = torch.FloatTensor(np.array(states))
-        actions_t = torch.tensor(np.array(actions))
-        rewards_t = torch.FloatTensor(np.array(rewards))
-        new_states_t = torch.FloatTensor(np.array(new_states))
-        dones = torch.ByteTensor(np.array(dones, dtype=np.uint8))
+        if self.prioritised_replay:
+            states, actions, rewards, new_states, dones, samples, weights = self.replay_buffer.sample(
+                self.BATCH_SIZE, self.PRIORITY_BETA)
+        else:
+            states, actions, rewards, new_states, dones = self.replay_buffer.sample(self.BATCH_SIZE)
+        states_t = torch.from_numpy(states)
+        actions_t = torch.from_numpy(actions)
+        rewards_t = torch.from_numpy(rewards)
+        new_states_t = torch.from_numpy(new_states)
+        dones = torch.from_numpy(dones)
 
         self.optimiser.zero_grad()
 
@@ -160,6 +248,24 @@ class AgentDQNPong(Agent):
         new_state_vals[dones] = 0
         expected_q_vals = rewards_t + self.GAMMA * new_state_vals
 
-        loss = self.loss_function(q_vals, expected_q_vals)
+        if self.prioritised_replay:
+            td_errors = expected_q_vals - q_vals
+            loss = (torch.from_numpy(weights) * td_errors ** 2).mean()
+            self.replay_buffer.update_priorities(samples, td_errors.detach().numpy())
+        else:
+            loss = self.loss_function(q_vals, expected_q_vals)
         loss.backward()
         self.optimiser.step()
+
+    def _create_replay_buffer(self):
+        """
+        Creates an empty replay buffer, which is wrapped for prioritised experience replay if prioritised_replay
+        is set.
+
+        @return: the new replay buffer
+        """
+
+        replay_buffer = FrameReplayBuffer(self.REPLAY_SIZE, self.env.gym_env.observation_space.shape)
+        if self.prioritised_replay:
+            replay_buffer = PrioritisedReplayBuffer(replay_buffer, self.PRIORITY_ALPHA)
+        return replay_buffer
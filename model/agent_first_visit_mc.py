@@ -1,4 +1,5 @@
 from model.agent import Agent
+from model.q_table import QTable
 import collections
 
 
@@ -7,28 +8,33 @@ class AgentFirstVisitMC(Agent):
     This Agent class implements the First-visit Monte Carlo Control algorithm, to solve the problem
     of the given environment. This algorithm does not use exploring starts as we are assuming the
     controller for this agent will use an epsilon-greedy policy, thus guranteeing exploration.
+
+    Rather than storing every return seen, the agent keeps a count of the first visits to each state-action
+    pair, so the value of action can be updated as a running mean of the returns.
     """
 
-    def __init__(self, env):
+    def __init__(self, env, use_array_Q=False):
         self.env = env
-        self.Q = {}
+        self.use_array_Q = use_array_Q
+        self.Q = QTable(self.env.state_space, self.env.action_space) if self.use_array_Q else {}
         for state in self.env.state_space:
             for action in self.env.action_space:
                 self.Q[(state, action)] = 0
         self.policy = {state: self._best_action(state) for state in self.env.state_space}
-        self.returns = collections.defaultdict(lambda: [])
+        self.visit_counts = collections.defaultdict(int)
 
     def restart_matrices(self):
         """
-        Resets the various matrices used by the agent back to their default values.
+        Resets the various matrices used by the agent back to their default values. If use_array_Q is set,
+        the Q-values are stored in a dense NumPy backed QTable rather than a dictionary.
         """
 
-        self.Q = {}
+        self.Q = QTable(self.env.state_space, self.env.action_space) if self.use_array_Q else {}
         for state in self.env.state_space:
             for action in self.env.action_space:
                 self.Q[(state, action)] = 0
         self.policy = {state: self._best_action(state) for state in self.env.state_space}
-        self.returns = collections.defaultdict(lambda: [])
+        self.visit_counts = collections.defaultdict(int)
 
     def step(self, action):
         """
@@ -53,33 +59,33 @@ class AgentFirstVisitMC(Agent):
         @param episode_sequence: the sequence of state-action-rewards for the episode
         """
 
+        first_visits = self._first_visits(episode_sequence)
         G = 0
         for t in range(len(episode_sequence) - 1, -1, -1):
             G += episode_sequence[t]["reward"]
             state_t = episode_sequence[t]["state"]
             action_t = episode_sequence[t]["action"]
-            if not self._appears_in_sequence(state_t, action_t, episode_sequence[0:t]):
-                self.returns[(state_t, action_t)].append(G)
-                self.Q[(state_t, action_t)] = sum(self.returns[(state_t, action_t)]) / len(
-                    self.returns[(state_t, action_t)])
+            if first_visits[(state_t, action_t)] == t:
+                visit_count = self.visit_counts[(state_t, action_t)] = self.visit_counts[(state_t, action_t)] + 1
+                if self.use_array_Q:
+                    self.Q.update(state_t, action_t, G, 1 / visit_count)
+                else:
+                    self.Q[(state_t, action_t)] += (G - self.Q[(state_t, action_t)]) / visit_count
                 self.policy[state_t] = self._best_action(state_t)
 
-    def _appears_in_sequence(self, state, action, episode_sequence):
+    def _first_visits(self, episode_sequence):
         """
-        Utility method used by update_policy() to determine whether a state-action pair have
-        already appeared in the episode sequence seen so far.
+        Utility method used by update_policy() to find the time step at which each state-action pair
+        first appears in the episode sequence, in a single pass through the sequence.
 
-        @param state: the state of the state-action pair
-        @param action: the action of the state-action pair
         @param episode_sequence: a sequence of state-action-rewards
-        @return: true or false whether the state-action pair already exists in the given sequence
+        @return: dictionary of each state-action pair in the sequence to the time step of its first visit
         """
 
-        pair_appears_in_sequence = False
-        for obs in episode_sequence:
-            if obs["state"] == state and obs["action"] == action:
-                pair_appears_in_sequence = True
-        return pair_appears_in_sequence
+        first_visits = {}
+        for t, obs in enumerate(episode_sequence):
+            first_visits.setdefault((obs["state"], obs["action"]), t)
+        return first_visits
 
     def _best_action(self, state):
         """
@@ -89,6 +95,8 @@ class AgentFirstVisitMC(Agent):
         @return: action with the highest value of action for the given state
         """
 
+        if self.use_array_Q:
+            return self.Q.best_action(state)
         best_action, best_value = None, None
         for action in self.env.action_space:
             value_of_action = self.Q[(state, action)]
@@ -1,5 +1,6 @@
 from model.agent import Agent
-import collections
+from model.empirical_model import EmpiricalModel
+import numpy as np
 
 
 class AgentPolicyIter(Agent):
@@ -8,34 +9,38 @@ class AgentPolicyIter(Agent):
     Following from Maxim Lapan's book, we assume the agent is not given the environment dynamics like rewards
     and transition probabilities, and instead keeps its own history of transitions and rewards received through
     exploration, in order to estimate the actual dynamics.
+
+    The evaluation_mode selects how a policy is evaluated: "sweep" loops over every state in Python until the
+    values of state converge, "linear_solve" compiles the transition counts and rewards into NumPy arrays and
+    solves the Bellman equations for the policy exactly, and "vectorised" iterates on the same arrays, which
+    suits larger state spaces.
     """
 
-    def __init__(self, env, gamma=1.0):
+    def __init__(self, env, gamma=1.0, evaluation_mode="sweep"):
         self.env = env
-        self.rewards = collections.defaultdict(float)
+        self.evaluation_mode = evaluation_mode
+        self.model = EmpiricalModel(self.env)
+        self.transitions_counter = self.model.transitions_counter
+        self.rewards = self.model.rewards
         self.values_of_state = {state: 0.0 for state in self.env.state_space}
         self.policy = {state: self.env.random_action() for state in self.env.state_space}
-        self.transitions_counter = {}
         self.GAMMA = gamma
 
     def evaluate_policy(self):
         """
-        Performs the policy evaluation stage of Policy Iteration. Automatically calls the improve_policy() method once
-        the value of states have changed by a very small amount during evaluation iterations.
+        Performs the policy evaluation stage of Policy Iteration, followed by the policy improvement stage. This is
+        repeated until the policy no longer changes.
         """
 
-        epsilon = 0.001
-        delta = 0
-        for state in self.env.state_space:
-            old_val = self.values_of_state[state]
-            new_val = old_val
-            if (state, self.policy[state]) in self.transitions_counter:
-                new_val = self.values_of_state[state] = self._calculate_value_of_action(state, self.policy[state])
-            delta = max(delta, abs(old_val - new_val))
-        if delta > epsilon:
-            self.evaluate_policy()
-        else:
-            self.improve_policy()
+        compiled_model = self.model.compile() if self.evaluation_mode != "sweep" else None
+        policy_stable = False
+        while not policy_stable:
+            if compiled_model is None:
+                self._evaluate_policy_sweep()
+                policy_stable = self._improve_policy_sweep()
+            else:
+                self._evaluate_policy_vectorised(*compiled_model)
+                policy_stable = self._improve_policy_vectorised(*compiled_model)
 
     def improve_policy(self):
         """
@@ -44,11 +49,10 @@ class AgentPolicyIter(Agent):
         called again.
         """
 
-        policy_stable = True
-        for state in self.env.state_space:
-            old_policy_action = self.policy[state]
-            new_policy_action = self.policy[state] = self._best_action(state)
-            policy_stable = False if not policy_stable or old_policy_action != new_policy_action else True
+        if self.evaluation_mode == "sweep":
+            policy_stable = self._improve_policy_sweep()
+        else:
+            policy_stable = self._improve_policy_vectorised(*self.model.compile())
         if not policy_stable:
             self.evaluate_policy()
 
@@ -57,10 +61,11 @@ class AgentPolicyIter(Agent):
         Resets the various matrices used by the agent back to their default values.
         """
 
-        self.rewards = collections.defaultdict(float)
+        self.model = EmpiricalModel(self.env)
+        self.transitions_counter = self.model.transitions_counter
+        self.rewards = self.model.rewards
         self.values_of_state = {state: 0.0 for state in self.env.state_space}
         self.policy = {state: self.env.random_action() for state in self.env.state_space}
-        self.transitions_counter = {}
 
     def random_step(self):
         """
@@ -73,8 +78,7 @@ class AgentPolicyIter(Agent):
         action_chosen = self.env.random_action()
         new_state, reward, episode_done = self.env.execute_action(action_chosen)
 
-        self._increment_transitions_counter(origin_state, action_chosen, new_state)
-        self.rewards[(origin_state, action_chosen, new_state)] = reward
+        self._increment_transitions_counter(origin_state, action_chosen, new_state, reward)
 
         return new_state, reward, episode_done
 
@@ -90,8 +94,7 @@ class AgentPolicyIter(Agent):
         action_chosen = self.policy[origin_state]
         new_state, reward, episode_done = self.env.execute_action(action_chosen)
 
-        self._increment_transitions_counter(origin_state, action_chosen, new_state)
-        self.rewards[(origin_state, action_chosen, new_state)] = reward
+        self._increment_transitions_counter(origin_state, action_chosen, new_state, reward)
 
         return new_state, reward, episode_done
 
@@ -104,13 +107,7 @@ class AgentPolicyIter(Agent):
         @return: the calculated value of action
         """
 
-        transition_counts = self.transitions_counter[(state, action)]
-        total_counts = sum(transition_counts.values())
-        value_of_action = 0.0
-        for new_state, counter in transition_counts.items():
-            reward = self.rewards[(state, action, new_state)]
-            value_of_action += (counter / total_counts) * (reward + self.GAMMA * self.values_of_state[new_state])
-        return value_of_action
+        return self.model.value_of_action(state, action, self.values_of_state, self.GAMMA)
 
     def _best_action(self, state):
         """
@@ -129,20 +126,106 @@ class AgentPolicyIter(Agent):
                     best_action = action
         return best_action
 
-    def _increment_transitions_counter(self, state, action, new_state):
+    def _evaluate_policy_sweep(self):
+        """
+        Updates the value of each state using the current policy, until the values of state have changed by a very
+        small amount.
+        """
+
+        epsilon = 0.001
+        delta = epsilon + 1
+        while delta > epsilon:
+            delta = 0
+            for state in self.env.state_space:
+                old_val = self.values_of_state[state]
+                new_val = old_val
+                if (state, self.policy[state]) in self.transitions_counter:
+                    new_val = self.values_of_state[state] = self._calculate_value_of_action(state, self.policy[state])
+                delta = max(delta, abs(old_val - new_val))
+
+    def _improve_policy_sweep(self):
         """
-        Updates the transition counter with the information passed to the method. Initialises a new counter if the
-        state/action, or new state has never been seen before.
+        Sets the policy of each state to its best action.
+
+        @return: true or false whether the policy is unchanged
+        """
+
+        policy_stable = True
+        for state in self.env.state_space:
+            old_policy_action = self.policy[state]
+            new_policy_action = self.policy[state] = self._best_action(state)
+            policy_stable = False if not policy_stable or old_policy_action != new_policy_action else True
+        return policy_stable
+
+    def _evaluate_policy_vectorised(self, probabilities, expected_rewards, explored):
+        """
+        Evaluates the current policy using the compiled transition probabilities and expected rewards. States
+        whose policy action has not been explored keep their current value. In "linear_solve" mode the linear
+        system (I - gamma * P) v = r is solved exactly, otherwise the values are updated for every state at once
+        until they change by a very small amount.
+
+        @param probabilities: the transition probabilities with shape (states, actions, new states)
+        @param expected_rewards: the expected reward of each state and action
+        @param explored: mask of which state and action pairs have been explored
+        """
+
+        state_ids = np.arange(self.env.NUM_STATES)
+        policy_ids = np.array([self.env.action_ids[self.policy[state]] for state in self.env.state_space])
+        evaluated = explored[state_ids, policy_ids]
+        policy_probabilities = probabilities[state_ids, policy_ids] * evaluated[:, np.newaxis]
+        values = np.array([self.values_of_state[state] for state in self.env.state_space])
+        policy_rewards = np.where(evaluated, expected_rewards[state_ids, policy_ids], values)
+
+        solved = False
+        if self.evaluation_mode == "linear_solve":
+            try:
+                values = np.linalg.solve(np.eye(self.env.NUM_STATES) - self.GAMMA * policy_probabilities,
+                                         policy_rewards)
+                solved = True
+            except np.linalg.LinAlgError:
+                pass
+        if not solved:
+            epsilon = 0.001
+            delta = epsilon + 1
+            while delta > epsilon:
+                new_values = policy_rewards + self.GAMMA * (policy_probabilities @ values)
+                delta = np.abs(new_values - values).max()
+                values = new_values
+        self.values_of_state = dict(zip(self.env.state_space, values.tolist()))
+
+    def _improve_policy_vectorised(self, probabilities, expected_rewards, explored):
+        """
+        Sets the policy of each state with at least one explored action to its best action, using the compiled
+        transition probabilities and expected rewards. The policy action is only replaced if the best action is
+        better by more than a very small amount, so the policy cannot keep switching between tied actions.
+
+        @param probabilities: the transition probabilities with shape (states, actions, new states)
+        @param expected_rewards: the expected reward of each state and action
+        @param explored: mask of which state and action pairs have been explored
+        @return: true or false whether the policy is unchanged
+        """
+
+        epsilon = 1e-9
+        state_ids = np.arange(self.env.NUM_STATES)
+        policy_ids = np.array([self.env.action_ids[self.policy[state]] for state in self.env.state_space])
+        values = np.array([self.values_of_state[state] for state in self.env.state_space])
+        values_of_action = np.where(explored, expected_rewards + self.GAMMA * (probabilities @ values), -np.inf)
+        best_actions = values_of_action.argmax(axis=1)
+        improved = values_of_action[state_ids, best_actions] > values_of_action[state_ids, policy_ids] + epsilon
+        for state_id in np.flatnonzero(improved):
+            self.policy[self.env.decode_state(state_id)] = self.env.action_space[best_actions[state_id]]
+        return not improved.any()
+
+    def _increment_transitions_counter(self, state, action, new_state, reward):
+        """
+        Updates the empirical model with the information passed to the method. The transition counts and mean
+        reward of the transition are updated incrementally, and the state/action is marked as changed so only its
+        row of the model is recalculated before the next planning phase.
 
-        @param state: the given orign state
+        @param state: the given origin state
         @param action: the action selected
         @param new_state: the new state after performing the action
+        @param reward: the reward received
         """
 
-        if (state, action) in self.transitions_counter:
-            if new_state in self.transitions_counter[(state, action)]:
-                self.transitions_counter[(state, action)][new_state] += 1
-            else:
-                self.transitions_counter[(state, action)][new_state] = 1
-        else:
-            self.transitions_counter[(state, action)] = {new_state: 1}
+        self.model.add_transition(state, action, new_state, reward)
@@ -1,4 +1,5 @@
 from model.agent import Agent
+from model.q_table import QTable
 import random
 
 
@@ -8,21 +9,23 @@ class AgentQLearning(Agent):
     The algorithm learns on the fly without any need for knowledge of the environment dynamics.
     """
 
-    def __init__(self, env, gamma=1.0, alpha=0.1, min_init_Q=0, max_init_Q=0):
+    def __init__(self, env, gamma=1.0, alpha=0.1, min_init_Q=0, max_init_Q=0, use_array_Q=False):
         self.GAMMA = gamma
         self.alpha = alpha
         self.MIN_INIT_Q = min_init_Q
         self.MAX_INIT_Q = max_init_Q
+        self.use_array_Q = use_array_Q
         self.env = env
         self.Q = {}
         self.policy = {}
 
     def restart_matrices(self):
         """
-        Resets the various matrices used by the agent back to their default values.
+        Resets the various matrices used by the agent back to their default values. If use_array_Q is set,
+        the Q-values are stored in a dense NumPy backed QTable rather than a dictionary.
         """
 
-        self.Q = {}
+        self.Q = QTable(self.env.state_space, self.env.action_space) if self.use_array_Q else {}
         for state in self.env.state_space:
             for action in self.env.action_space:
                 self.Q[(state, action)] = random.uniform(self.MIN_INIT_Q, self.MAX_INIT_Q)
@@ -60,6 +63,10 @@ class AgentQLearning(Agent):
         @param reward: the reward received
         """
 
+        if self.use_array_Q:
+            self.Q.update(origin_state, action, reward + self.GAMMA * self.Q.best_value(new_state), self.alpha)
+            self.policy[origin_state] = self.Q.best_action(origin_state)
+            return
         best_action = self._best_action(new_state)
         self.Q[(origin_state, action)] += self.alpha * (reward + self.GAMMA * self.Q[(new_state, best_action)]
                                                         - self.Q[(origin_state, action)])
@@ -73,6 +80,8 @@ class AgentQLearning(Agent):
         @return: action with the highest value of action for the given state
         """
 
+        if self.use_array_Q:
+            return self.Q.best_action(state)
         best_action, best_value = None, None
         for action in self.env.action_space:
             value_of_action = self.Q[(state, action)]
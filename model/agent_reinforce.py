@@ -1,4 +1,5 @@
 from model.agent import Agent
+from model.softmax_policy import softmax_probabilities
 import numpy as np
 
 
@@ -6,6 +7,9 @@ class AgentREINFORCE(Agent):
     """
     This Agent class implements the REINFORCE algorithm, to solve the problem of the given environment. 
     The algorithm learns on the fly without any need for knowledge of the environment dynamics.
+
+    The feature vectors are read from the environment's precomputed feature tensor, so the softmax
+    probabilities and gradients are calculated for every action at once.
     """
 
     def __init__(self, env, gamma=1.0, alpha=0.1):
@@ -41,43 +45,41 @@ class AgentREINFORCE(Agent):
         @return: the softmax probabilities
         """
 
-        probs = np.array([])
-        for action in self.env.action_space:
-            feature_vector = self.env.get_feature_vector(state, action)
-            p = feature_vector.dot(self.theta)
-            probs = np.append(probs, p)
-        e = np.exp(probs)
-        softmax_probs = e / np.sum(e)
-        return softmax_probs
+        return softmax_probabilities(self.env.feature_tensor[self.env.encode_state(state)], self.theta)
 
-    def compute_gradient(self, state, action):
+    def compute_gradient(self, state, action, softmax_probs=None):
         """
         Computes the gradient for the log of the policy of the given state and action.
 
         @param state: the given state
         @param action: the given action
+        @param softmax_probs: the softmax probabilities of the state, if already calculated by policy()
         @return: the computed gradient
         """
 
-        feature_vector = self.env.get_feature_vector(state, action)
-        probs = self.policy(state)
-        sum = np.zeros(len(feature_vector))
-        for i in range(len(probs)):
-            sum += probs[i] * self.env.get_feature_vector(state, self.env.action_space[i])
-        gradient = feature_vector - sum
+        feature_vectors = self.env.feature_tensor[self.env.encode_state(state)]
+        if softmax_probs is None:
+            softmax_probs = softmax_probabilities(feature_vectors, self.theta)
+        gradient = feature_vectors[self.env.action_ids[action]] - softmax_probs @ feature_vectors
         return gradient
 
     def update_weights(self, gradients, rewards):
         """
         Updates the theta weights using the provided list of gradients and rewards received
-        during the episode.
+        during the episode. The discounted return from each step is calculated in a single pass
+        backwards through the rewards, then the gradients are weighted by their returns in one
+        matrix product.
 
         @param gradients: list of calculated gradients
         @param rewards list of rewards received
         """
 
-        for i in range(len(gradients)):
-            self.theta += self.ALPHA * gradients[i] * sum([r * (self.GAMMA ** t) for t, r in enumerate(rewards[i:])])
+        returns = np.zeros(len(rewards))
+        G = 0.0
+        for t in range(len(rewards) - 1, -1, -1):
+            G = rewards[t] + self.GAMMA * G
+            returns[t] = G
+        self.theta += self.ALPHA * (returns @ np.asarray(gradients, dtype=float))
 
     def get_all_softmax_probabilities(self):
         """
@@ -86,8 +88,5 @@ class AgentREINFORCE(Agent):
         @return: mapping of state to action softmax probabilities
         """
 
-        all_probs = {}
-        for state in self.env.state_space:
-            probs = self.policy(state)
-            all_probs[state] = probs
-        return all_probs
+        all_probs = softmax_probabilities(self.env.feature_tensor, self.theta)
+        return dict(zip(self.env.state_space, all_probs))
@@ -1,5 +1,7 @@
 from model.agent import Agent
-import collections
+from model.empirical_model import EmpiricalModel
+import numpy as np
+import heapq
 
 
 class AgentValueIter(Agent):
@@ -8,14 +10,21 @@ class AgentValueIter(Agent):
     Following from Maxim Lapan's book, we assume the agent is not given the environment dynamics like rewards
     and transition probabilities, and instead keeps its own history of transitions and rewards received through
     exploration, in order to estimate the actual dynamics.
+
+    The planning_mode selects how the values of state are updated: "sweep" loops over every state and action
+    in Python, "vectorised" compiles the transition counts and rewards into NumPy arrays and performs the
+    Bellman update for every state at once, and "prioritised" uses prioritised sweeping to propagate only the
+    changes introduced by the latest experience, which suits large state spaces.
     """
 
-    def __init__(self, env, gamma=1.0):
+    def __init__(self, env, gamma=1.0, planning_mode="sweep"):
         self.env = env
-        self.rewards = collections.defaultdict(float)
+        self.planning_mode = planning_mode
+        self.model = EmpiricalModel(self.env)
+        self.transitions_counter = self.model.transitions_counter
+        self.rewards = self.model.rewards
         self.values_of_state = {state: 0.0 for state in self.env.state_space}
         self.policy = {state: self.env.random_action() for state in self.env.state_space}
-        self.transitions_counter = {}
         self.GAMMA = gamma
 
     def update_values(self):
@@ -24,35 +33,32 @@ class AgentValueIter(Agent):
         the value of states have changed by a very small amount during update iterations.
         """
 
+        if self.planning_mode == "vectorised":
+            self._update_values_vectorised()
+            return
+        if self.planning_mode == "prioritised":
+            self._update_values_prioritised()
+            return
         epsilon = 0.001
-        delta = 0
-        for state in self.env.state_space:
-            old_val = self.values_of_state[state]
-            calculated_values = []
-            for action in self.env.action_space:
-                if (state, action) in self.transitions_counter:
-                    calculated_values.append(self._calculate_value_of_action(state, action))
-            new_val = self.values_of_state[state] = max(calculated_values) if len(calculated_values) > 0 else 0.0
-            delta = max(delta, abs(old_val - new_val))
-        if delta > epsilon:
-            self.update_values()
-        else:
-            self.update_policy()
-
-    def update_policy(self):
+        delta = epsilon + 1
+        while delta > epsilon:
+            delta = 0
+            for state in self.env.state_space:
+                old_val = self.values_of_state[state]
+                new_val = self.values_of_state[state] = self._calculate_value_of_state(state)
+                delta = max(delta, abs(old_val - new_val))
+        self.update_policy()
+
+    def update_policy(self, states=None):
         """
         A greedy policy method, that uses the values of states to calculate the value of each action at each state,
         to output the best action as the policy for each state.
+
+        @param states: the states to update the policy of, defaults to every state
         """
 
-        for state in self.env.state_space:
-            best_action, best_value = None, None
-            for action in self.env.action_space:
-                if (state, action) in self.transitions_counter:
-                    value_of_action = self._calculate_value_of_action(state, action)
-                    if best_value is None or best_value < value_of_action:
-                        best_value = value_of_action
-                        best_action = action
+        for state in self.env.state_space if states is None else states:
+            best_action = self.model.best_action(state, self.values_of_state, self.GAMMA)
             if best_action is not None:
                 self.policy[state] = best_action
 
@@ -61,10 +67,11 @@ class AgentValueIter(Agent):
         Resets the various matrices used by the agent back to their default values.
         """
 
-        self.rewards = collections.defaultdict(float)
+        self.model = EmpiricalModel(self.env)
+        self.transitions_counter = self.model.transitions_counter
+        self.rewards = self.model.rewards
         self.values_of_state = {state: 0.0 for state in self.env.state_space}
         self.policy = {state: self.env.random_action() for state in self.env.state_space}
-        self.transitions_counter = {}
 
     def random_step(self):
         """
@@ -77,8 +84,7 @@ class AgentValueIter(Agent):
         action_chosen = self.env.random_action()
         new_state, reward, episode_done = self.env.execute_action(action_chosen)
 
-        self._increment_transitions_counter(origin_state, action_chosen, new_state)
-        self.rewards[(origin_state, action_chosen, new_state)] = reward
+        self._increment_transitions_counter(origin_state, action_chosen, new_state, reward)
 
         return new_state, reward, episode_done
 
@@ -94,8 +100,7 @@ class AgentValueIter(Agent):
         action_chosen = self.policy[origin_state]
         new_state, reward, episode_done = self.env.execute_action(action_chosen)
 
-        self._increment_transitions_counter(origin_state, action_chosen, new_state)
-        self.rewards[(origin_state, action_chosen, new_state)] = reward
+        self._increment_transitions_counter(origin_state, action_chosen, new_state, reward)
 
         return new_state, reward, episode_done
 
@@ -108,28 +113,127 @@ class AgentValueIter(Agent):
         @return: the calculated value of action
         """
 
-        transition_counts = self.transitions_counter[(state, action)]
-        total_counts = sum(transition_counts.values())
-        value_of_action = 0.0
-        for new_state, counter in transition_counts.items():
-            reward = self.rewards[(state, action, new_state)]
-            value_of_action += (counter / total_counts) * (reward + self.GAMMA * self.values_of_state[new_state])
-        return value_of_action
+        return self.model.value_of_action(state, action, self.values_of_state, self.GAMMA)
+
+    def _calculate_value_of_state(self, state):
+        """
+        Calculates the value of the given state as the highest value of action of its explored actions.
+
+        @param state: the given state
+        @return: the calculated value of state, or 0 if no action has been explored from the state
+        """
+
+        return self.model.value_of_state(state, self.values_of_state, self.GAMMA)
+
+    def _update_values_prioritised(self):
+        """
+        Prioritised sweeping version of update_values() and update_policy(). The states which have had new
+        transitions since the last update are queued by the size of their Bellman error. The state with the largest
+        error is updated first, and its predecessors are then queued by their own Bellman errors, until no error is
+        larger than a very small amount. Only the policies of states whose values of action may have changed are
+        updated. The backups use the sparse outcome lists and predecessor index of the empirical model, so the cost
+        depends on the states reached by the changes rather than the size of the map.
+
+        If most of the explored states have new transitions, such as after the first exploration episodes, queueing
+        them gains nothing, so the explored states are swept instead, skipping every state never visited.
+        """
+
+        updated_states = self.model.pop_updated_states()
+        if 2 * len(updated_states) > len(self.model.predecessors):
+            self._sweep_explored_states()
+            return
+        queue = []
+        backups = {}
+        policy_states = set(updated_states)
+        for state in updated_states:
+            self._queue_state(state, queue, backups)
+        while queue:
+            priority, _, state = heapq.heappop(queue)
+            new_value, queued_priority = backups.get(state, (None, None))
+            if queued_priority != -priority:
+                continue
+            del backups[state]
+            self.values_of_state[state] = new_value
+            for predecessor in self.model.predecessors[state]:
+                policy_states.add(predecessor)
+                self._queue_state(predecessor, queue, backups)
+        self.update_policy(policy_states)
+
+    def _queue_state(self, state, queue, backups):
+        """
+        Calculates the new value of the given state, and adds it to the priority queue used by prioritised sweeping
+        if its Bellman error is larger than a very small amount and larger than the priority it is already queued
+        with. The new value is kept with the queued state, and is recalculated whenever one of its successors
+        changes, so it is still current when the state is popped. Older entries for the state are left in the queue
+        and skipped when popped.
+
+        @param state: the state to be queued
+        @param queue: heap of (negative priority, state id, state) entries
+        @param backups: mapping of each queued state to its new value and current priority
+        """
+
+        epsilon = 0.001
+        new_value = self._calculate_value_of_state(state)
+        priority = abs(new_value - self.values_of_state[state])
+        queued_priority = backups[state][1] if state in backups else 0.0
+        if priority > epsilon and priority > queued_priority:
+            backups[state] = (new_value, priority)
+            heapq.heappush(queue, (-priority, self.env.encode_state(state), state))
+        elif state in backups:
+            backups[state] = (new_value, queued_priority)
+
+    def _sweep_explored_states(self):
+        """
+        Updates the values of every state which has an explored action, or has been reached by one, until they
+        change by a very small amount, then updates the policies of the states with explored actions.
+        """
 
-    def _increment_transitions_counter(self, state, action, new_state):
+        explored_states = [state for state in self.env.state_space if state in self.model.predecessors
+                           or self.model.get_successors(state)]
+        epsilon = 0.001
+        delta = epsilon + 1
+        while delta > epsilon:
+            delta = 0
+            for state in explored_states:
+                old_val = self.values_of_state[state]
+                new_val = self.values_of_state[state] = self._calculate_value_of_state(state)
+                delta = max(delta, abs(old_val - new_val))
+        self.update_policy(explored_states)
+
+    def _update_values_vectorised(self):
+        """
+        Vectorised version of update_values() and update_policy(). The transition counts and rewards are compiled
+        into arrays once, then the values of every state are updated together until they change by a very small
+        amount. Finally the policy is set to the best action of every state which has been explored.
+        """
+
+        epsilon = 0.001
+        probabilities, expected_rewards, explored = self.model.compile()
+        any_explored = explored.any(axis=1)
+        values = np.array([self.values_of_state[state] for state in self.env.state_space])
+        delta = epsilon + 1
+        while delta > epsilon:
+            values_of_action = np.where(explored, expected_rewards + self.GAMMA * (probabilities @ values), -np.inf)
+            new_values = np.where(any_explored, values_of_action.max(axis=1), 0.0)
+            delta = np.abs(new_values - values).max()
+            values = new_values
+
+        values_of_action = np.where(explored, expected_rewards + self.GAMMA * (probabilities @ values), -np.inf)
+        best_actions = values_of_action.argmax(axis=1)
+        self.values_of_state = dict(zip(self.env.state_space, values.tolist()))
+        for state_id in np.flatnonzero(any_explored):
+            self.policy[self.env.decode_state(state_id)] = self.env.action_space[best_actions[state_id]]
+
+    def _increment_transitions_counter(self, state, action, new_state, reward):
         """
-        Updates the transition counter with the information passed to the method. Initialises a new counter if the
-        state/action, or new state has never been seen before.
+        Updates the empirical model with the information passed to the method. The transition counts and mean
+        reward of the transition are updated incrementally, and the state/action is marked as changed so only its
+        row of the model is recalculated before the next planning phase.
 
         @param state: the given origin state
         @param action: the action selected
         @param new_state: the new state after performing the action
+        @param reward: the reward received
         """
 
-        if (state, action) in self.transitions_counter:
-            if new_state in self.transitions_counter[(state, action)]:
-                self.transitions_counter[(state, action)][new_state] += 1
-            else:
-                self.transitions_counter[(state, action)][new_state] = 1
-        else:
-            self.transitions_counter[(state, action)] = {new_state: 1}
+        self.model.add_transition(state, action, new_state, reward)
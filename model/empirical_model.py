@@ -0,0 +1,171 @@
+import collections
+import numpy as np
+
+
+class EmpiricalModel:
+    """
+    Estimate of an environment's dynamics, built from the transitions experienced by an agent rather than being
+    given the true transition probabilities and rewards. Used by the Value Iteration and Policy Iteration agents.
+
+    Every statistic is maintained incrementally as transitions are added, in dictionaries holding only the
+    transitions which have been experienced: the transition counts and their totals, and the mean reward of each
+    transition. The normalised transition probabilities and the expected reward of each state and action are only
+    cached in dense arrays, indexed by the integer ids of the states and actions, once compile() is first called
+    by a planner which needs them. After that, only the rows which have changed since the last call to compile()
+    are recalculated.
+
+    The model also indexes the predecessors of every state, caches a sparse list of the outcomes of each state's
+    explored actions, and records which states have had new transitions added, so a planner can propagate changes
+    backwards from only the states affected by new experience without touching any dense arrays.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.transitions_counter = {}
+        self.total_counts = {}
+        self.rewards = collections.defaultdict(float)
+        self.probabilities = None
+        self.expected_rewards = None
+        self.explored = None
+        self.changed = set()
+        self.successors = {}
+        self.predecessors = collections.defaultdict(set)
+        self.updated_states = set()
+
+    def add_transition(self, state, action, new_state, reward):
+        """
+        Updates the transition counts and mean reward with a single transition experienced by the agent.
+
+        @param state: the origin state
+        @param action: the action selected
+        @param new_state: the new state after performing the action
+        @param reward: the reward received
+        """
+
+        transition_counts = self.transitions_counter.setdefault((state, action), {})
+        counter = transition_counts[new_state] = transition_counts.get(new_state, 0) + 1
+        self.total_counts[(state, action)] = self.total_counts.get((state, action), 0) + 1
+        mean_reward = self.rewards[(state, action, new_state)]
+        mean_reward = self.rewards[(state, action, new_state)] = mean_reward + (reward - mean_reward) / counter
+        self.predecessors[new_state].add(state)
+        self.updated_states.add(state)
+        self.successors.pop(state, None)
+        if self.probabilities is not None:
+            self.changed.add((state, action))
+
+    def value_of_action(self, state, action, values_of_state, gamma):
+        """
+        Uses the Bellman equation to calculate the value of action for the given state and action.
+
+        @param state: the given origin state
+        @param action: the action selected
+        @param values_of_state: mapping of each state to its current value
+        @param gamma: the discount factor
+        @return: the calculated value of action
+        """
+
+        transition_counts = self.transitions_counter[(state, action)]
+        total_counts = self.total_counts[(state, action)]
+        value_of_action = 0.0
+        for new_state, counter in transition_counts.items():
+            reward = self.rewards[(state, action, new_state)]
+            value_of_action += (counter / total_counts) * (reward + gamma * values_of_state[new_state])
+        return value_of_action
+
+    def value_of_state(self, state, values_of_state, gamma):
+        """
+        Calculates the value of the given state as the highest value of action of its explored actions, from the
+        state's sparse list of outcomes.
+
+        @param state: the given state
+        @param values_of_state: mapping of each state to its current value
+        @param gamma: the discount factor
+        @return: the calculated value of state, or 0 if no action has been explored from the state
+        """
+
+        best_value = None
+        for _, outcomes in self.get_successors(state):
+            value_of_action = 0.0
+            for new_state, probability, reward in outcomes:
+                value_of_action += probability * (reward + gamma * values_of_state[new_state])
+            if best_value is None or best_value < value_of_action:
+                best_value = value_of_action
+        return 0.0 if best_value is None else best_value
+
+    def best_action(self, state, values_of_state, gamma):
+        """
+        @param state: the given state
+        @param values_of_state: mapping of each state to its current value
+        @param gamma: the discount factor
+        @return: the first explored action with the highest value of action, or None if no action has been
+        explored from the state
+        """
+
+        best_action, best_value = None, None
+        for action, outcomes in self.get_successors(state):
+            value_of_action = 0.0
+            for new_state, probability, reward in outcomes:
+                value_of_action += probability * (reward + gamma * values_of_state[new_state])
+            if best_value is None or best_value < value_of_action:
+                best_action, best_value = action, value_of_action
+        return best_action
+
+    def get_successors(self, state):
+        """
+        Gets the outcomes of every explored action of a state, which are cached until the state has a new
+        transition added.
+
+        @param state: the given state
+        @return: list of (action, outcomes) pairs in the order of the action space, where outcomes is a list of
+        (new state, probability, mean reward) tuples
+        """
+
+        successors = self.successors.get(state)
+        if successors is None:
+            successors = self.successors[state] = []
+            for action in self.env.action_space:
+                transition_counts = self.transitions_counter.get((state, action))
+                if transition_counts is not None:
+                    total_counts = self.total_counts[(state, action)]
+                    successors.append((action, [(new_state, counter / total_counts,
+                                                 self.rewards[(state, action, new_state)])
+                                                for new_state, counter in transition_counts.items()]))
+        return successors
+
+    def compile(self):
+        """
+        Recalculates the transition probabilities and expected rewards of the state and action pairs which have
+        changed since the last call. The dense arrays are allocated by the first call, and filled from every
+        transition experienced so far.
+
+        @return: the transition probabilities with shape (states, actions, new states), the expected reward of
+        each state and action, and a mask of which state and action pairs have been explored
+        """
+
+        if self.probabilities is None:
+            self.probabilities = np.zeros((self.env.NUM_STATES, self.env.NUM_ACTIONS, self.env.NUM_STATES))
+            self.expected_rewards = np.zeros((self.env.NUM_STATES, self.env.NUM_ACTIONS))
+            self.explored = np.zeros((self.env.NUM_STATES, self.env.NUM_ACTIONS), dtype=bool)
+            self.changed = set(self.transitions_counter)
+        for state, action in self.changed:
+            state_id = self.env.encode_state(state)
+            action_id = self.env.action_ids[action]
+            total_counts = self.total_counts[(state, action)]
+            probabilities = self.probabilities[state_id, action_id]
+            probabilities[:] = 0.0
+            expected_reward = 0.0
+            for new_state, counter in self.transitions_counter[(state, action)].items():
+                probability = probabilities[self.env.encode_state(new_state)] = counter / total_counts
+                expected_reward += probability * self.rewards[(state, action, new_state)]
+            self.expected_rewards[state_id, action_id] = expected_reward
+            self.explored[state_id, action_id] = True
+        self.changed = set()
+        return self.probabilities, self.expected_rewards, self.explored
+
+    def pop_updated_states(self):
+        """
+        @return: the states which have had transitions added since the last call
+        """
+
+        updated_states, self.updated_states = self.updated_states, set()
+        return updated_states
@@ -22,6 +22,7 @@ class CliffWalking(Environment):
                          "FFFFF"
                          ]
         self.action_space = ["Left", "Up", "Right", "Down"]
+        self.action_ids = {action: i for i, action in enumerate(self.action_space)}
         self.NUM_ACTIONS = 4
         self.state_space = []
         self.NUM_STATE_FEATURES = 2
@@ -33,6 +34,8 @@ class CliffWalking(Environment):
                     self.current_state = (row, col)
                 if self.GRID_MAP[row][col] == "G":
                     self.goal_state = (row, col)
+        self.NUM_STATES = len(self.state_space)
+        self._build_transition_table()
 
     def execute_action(self, action):
         """
@@ -43,23 +46,58 @@ class CliffWalking(Environment):
         @return: the observation to the agent, including the new state and reward
         """
 
+        _, reward, episode_done = self.execute_action_id(self.action_ids[action])
+        return self.current_state, reward, episode_done
+
+    def execute_action_id(self, action_id):
+        """
+        Integer encoded version of execute_action(), which takes the id of the action and returns the id of the
+        new state. The current state is still updated, so both versions can be used interchangeably.
+
+        @param action_id: the id of the action chosen by the agent
+        @return: the observation to the agent, including the id of the new state and reward
+        """
+
         row, col = self.current_state
+        new_state_id = self.transition_table[row * self.GRID_COLUMNS + col][action_id]
+        self.current_state = self.state_space[new_state_id]
+        return new_state_id, self.state_rewards[new_state_id], self.terminal_states[new_state_id]
 
-        if action == "Up" and not row == 0:
-            self.current_state = (row - 1, col)
-        elif action == "Left" and not col == 0:
-            self.current_state = (row, col - 1)
-        elif action == "Right" and not col == 4:
-            self.current_state = (row, col + 1)
-        elif action == "Down" and not row == 2:
-            self.current_state = (row + 1, col)
+    def encode_state(self, state):
+        """
+        @param state: the given (row, col) state
+        @return: the integer id of the state, which is its index in the state space
+        """
 
-        reward = -1
-        if self._hole_detected():
-            reward = -100
-        episode_done = True if self.current_state == self.goal_state or self._hole_detected() else False
+        row, col = state
+        return row * self.GRID_COLUMNS + col
 
-        return self.current_state, reward, episode_done
+    def decode_state(self, state_id):
+        """
+        @param state_id: the integer id of a state
+        @return: the (row, col) state with the given id
+        """
+
+        return self.state_space[state_id]
+
+    def get_outcomes(self, state_id, action_id):
+        """
+        Gets the outcome of taking an action from a state, without changing the current state.
+
+        @param state_id: the id of the origin state
+        @param action_id: the id of the action chosen by the agent
+        @return: list of the equally likely (new state id, reward, episode done) outcomes
+        """
+
+        new_state_id = self.transition_table[state_id][action_id]
+        return [(new_state_id, self.state_rewards[new_state_id], self.terminal_states[new_state_id])]
+
+    def get_start_state_ids(self):
+        """
+        @return: list of the ids of the equally likely start states
+        """
+
+        return [self.encode_state(self.start_state)]
 
     def random_action(self):
         """
@@ -77,12 +115,19 @@ class CliffWalking(Environment):
 
         self.current_state = self.start_state
 
-    def _hole_detected(self):
+    def _build_transition_table(self):
         """
-        Detects whether the agent has fallen off the cliff edge
-
-        @return: true or false whether the agent is over the cliff edge
+        Precomputes the id of the state reached by each movement action from each state, as well as the reward
+        for entering each state and whether it terminates the episode.
         """
 
-        row, col = self.current_state
-        return self.GRID_MAP[row][col] == "H"
+        self.transition_table = []
+        self.state_rewards = []
+        self.terminal_states = []
+        for row, col in self.state_space:
+            new_states = [(row, max(col - 1, 0)), (max(row - 1, 0), col),
+                          (row, min(col + 1, self.GRID_COLUMNS - 1)), (min(row + 1, self.GRID_ROWS - 1), col)]
+            self.transition_table.append([self.encode_state(new_state) for new_state in new_states])
+            tile = self.GRID_MAP[row][col]
+            self.state_rewards.append(-100 if tile == "H" else -1)
+            self.terminal_states.append(tile == "G" or tile == "H")
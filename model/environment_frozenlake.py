@@ -11,18 +11,19 @@ class FrozenLake(Environment):
 
     This frozen lake can also be made slippery, which changes the environment from
     deterministic to stochastic, where each movement action has an equal chance to
-    move in one of three directions.
+    move in one of three directions. A custom map of any size can also be given, as a
+    list of rows of "S", "F", "H" and "G" tiles.
     """
 
-    def __init__(self, is_slippery, grid_size=4):
+    def __init__(self, is_slippery, grid_size=4, grid_map=None):
         self.name = "Frozen Lake"
         self.is_slippery = is_slippery
         self.MAX_REWARD = 200
         self.MIN_REWARD = -150
         self.REWARD_THRESHOLD = 70 if grid_size == 8 else 140
         self.MAX_EPISODE_STEPS = 200
-        self.GRID_ROWS = grid_size
-        self.GRID_COLUMNS = grid_size
+        self.GRID_ROWS = grid_size if grid_map is None else len(grid_map)
+        self.GRID_COLUMNS = grid_size if grid_map is None else len(grid_map[0])
         map_4x4 = ["SFFF",
                    "FHFH",
                    "FFFH",
@@ -37,8 +38,9 @@ class FrozenLake(Environment):
                    "FHFFHFHF",
                    "FFFHFFFG"
                    ]
-        self.GRID_MAP = map_4x4 if self.GRID_ROWS == 4 else map_8x8
+        self.GRID_MAP = grid_map if grid_map is not None else map_4x4 if self.GRID_ROWS == 4 else map_8x8
         self.action_space = ["Left", "Up", "Right", "Down"]
+        self.action_ids = {action: i for i, action in enumerate(self.action_space)}
         self.NUM_ACTIONS = 4
         self.state_space = []
         self.NUM_FEATURES = 2
@@ -50,6 +52,12 @@ class FrozenLake(Environment):
                     self.current_state = (row, col)
                 if self.GRID_MAP[row][col] == "G":
                     self.goal_state = (row, col)
+        self.NUM_STATES = len(self.state_space)
+        # Each action on a slippery lake results in moving in one of three directions. The actions are given
+        # by their ids: Left, Up, Right, Down.
+        self.SLIPPERY_ACTION_IDS = [[0, 1, 3], [1, 0, 2], [2, 1, 3], [3, 0, 2]]
+        self._build_transition_table()
+        self._build_feature_tensor()
 
     def execute_action(self, action):
         """
@@ -60,22 +68,63 @@ class FrozenLake(Environment):
         @return: the observation to the agent, including the new state and reward
         """
 
+        _, reward, episode_done = self.execute_action_id(self.action_ids[action])
+        return self.current_state, reward, episode_done
+
+    def execute_action_id(self, action_id):
+        """
+        Integer encoded version of execute_action(), which takes the id of the action and returns the id of the
+        new state. The current state is still updated, so both versions can be used interchangeably.
+
+        @param action_id: the id of the action chosen by the agent
+        @return: the observation to the agent, including the id of the new state and reward
+        """
+
+        if self.is_slippery:
+            action_id = random.choice(self.SLIPPERY_ACTION_IDS[action_id])
         row, col = self.current_state
-        action = self._randomise_action(action) if self.is_slippery else action
+        new_state_id = self.transition_table[row * self.GRID_COLUMNS + col][action_id]
+        self.current_state = self.state_space[new_state_id]
+        return new_state_id, self.state_rewards[new_state_id], self.terminal_states[new_state_id]
 
-        if action == "Up" and not row == 0:
-            self.current_state = (row - 1, col)
-        elif action == "Left" and not col == 0:
-            self.current_state = (row, col - 1)
-        elif action == "Right" and not col == (self.GRID_ROWS - 1):
-            self.current_state = (row, col + 1)
-        elif action == "Down" and not row == (self.GRID_ROWS - 1):
-            self.current_state = (row + 1, col)
+    def encode_state(self, state):
+        """
+        @param state: the given (row, col) state
+        @return: the integer id of the state, which is its index in the state space
+        """
 
-        reward = 200 if self.current_state == self.goal_state else -100 if self._hole_detected() else -1
-        episode_done = True if self.current_state == self.goal_state or self._hole_detected() else False
+        row, col = state
+        return row * self.GRID_COLUMNS + col
 
-        return self.current_state, reward, episode_done
+    def decode_state(self, state_id):
+        """
+        @param state_id: the integer id of a state
+        @return: the (row, col) state with the given id
+        """
+
+        return self.state_space[state_id]
+
+    def get_outcomes(self, state_id, action_id):
+        """
+        Gets every outcome of taking an action from a state, without changing the current state. On a slippery
+        lake there are three outcomes, one for each direction the agent can slip in.
+
+        @param state_id: the id of the origin state
+        @param action_id: the id of the action chosen by the agent
+        @return: list of the equally likely (new state id, reward, episode done) outcomes
+        """
+
+        action_ids = self.SLIPPERY_ACTION_IDS[action_id] if self.is_slippery else [action_id]
+        new_state_ids = [self.transition_table[state_id][slipped_action_id] for slipped_action_id in action_ids]
+        return [(new_state_id, self.state_rewards[new_state_id], self.terminal_states[new_state_id])
+                for new_state_id in new_state_ids]
+
+    def get_start_state_ids(self):
+        """
+        @return: list of the ids of the equally likely start states
+        """
+
+        return [self.encode_state(self.start_state)]
 
     def random_action(self):
         """
@@ -115,8 +164,8 @@ class FrozenLake(Environment):
             if not col == 0:
                 hole_ahead = 1 if self.GRID_MAP[row][col - 1] == "H" else 0
         if action == "Right":
-            wall_ahead = 1 if col == (self.GRID_ROWS - 1) else 0
-            if not col == (self.GRID_ROWS - 1):
+            wall_ahead = 1 if col == (self.GRID_COLUMNS - 1) else 0
+            if not col == (self.GRID_COLUMNS - 1):
                 hole_ahead = 1 if self.GRID_MAP[row][col + 1] == "H" else 0
         if action == "Down":
             wall_ahead = 1 if row == (self.GRID_ROWS - 1) else 0
@@ -126,29 +175,28 @@ class FrozenLake(Environment):
         feature_vector = np.array([wall_ahead, hole_ahead])
         return feature_vector
 
-    def _randomise_action(self, action):
+    def _build_feature_tensor(self):
         """
-        Each action on a slippery lake results in moving in one of three directions
-
-        @param: the action chosen by the agent
-        @return: the actual action to be taken
+        Precomputes the feature vector of every state and action into a single array with shape
+        (states, actions, features), indexed by the integer ids of the states and actions.
         """
 
-        if action == "Up":
-            return random.choice(["Up", "Left", "Right"])
-        elif action == "Left":
-            return random.choice(["Left", "Up", "Down"])
-        elif action == "Right":
-            return random.choice(["Right", "Up", "Down"])
-        elif action == "Down":
-            return random.choice(["Down", "Left", "Right"])
+        self.feature_tensor = np.array([[self.get_feature_vector(state, action) for action in self.action_space]
+                                        for state in self.state_space], dtype=float)
 
-    def _hole_detected(self):
+    def _build_transition_table(self):
         """
-        Detects whether the agent has fallen into a hole in the lake
-
-        @return: true or false whether there is a hole under the agent
+        Precomputes the id of the state reached by each movement action from each state, as well as the reward
+        for entering each state and whether it terminates the episode.
         """
 
-        row, col = self.current_state
-        return self.GRID_MAP[row][col] == "H"
\ No newline at end of file
+        self.transition_table = []
+        self.state_rewards = []
+        self.terminal_states = []
+        for row, col in self.state_space:
+            new_states = [(row, max(col - 1, 0)), (max(row - 1, 0), col),
+                          (row, min(col + 1, self.GRID_COLUMNS - 1)), (min(row + 1, self.GRID_ROWS - 1), col)]
+            self.transition_table.append([self.encode_state(new_state) for new_state in new_states])
+            tile = self.GRID_MAP[row][col]
+            self.state_rewards.append(200 if tile == "G" else -100 if tile == "H" else -1)
+            self.terminal_states.append(tile == "G" or tile == "H")
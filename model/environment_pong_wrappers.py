@@ -2,7 +2,6 @@ import cv2
 import gym
 import gym.spaces
 import numpy as np
-import collections
 
 """
 Code taken from:
@@ -39,28 +38,30 @@ class MaxAndSkipEnv(gym.Wrapper):
     def __init__(self, env=None, skip=4):
         """Return only every `skip`-th frame"""
         super(MaxAndSkipEnv, self).__init__(env)
-        # most recent raw observations (for max pooling across time steps)
-        self._obs_buffer = collections.deque(maxlen=2)
+        # preallocated copy of the previous raw observation (for max pooling across time steps), and the
+        # buffer for the pooled frame, which is overwritten by the next step
+        obs_space = env.observation_space
+        self._previous_obs = np.zeros(obs_space.shape, dtype=obs_space.dtype)
+        self._max_frame = np.zeros(obs_space.shape, dtype=obs_space.dtype)
         self._skip = skip
 
     def step(self, action):
         total_reward = 0.0
-        done = None
-        for _ in range(self._skip):
+        for i in range(self._skip):
             obs, reward, done, info = self.env.step(action)
-            self._obs_buffer.append(obs)
             total_reward += reward
-            if done:
+            if done or i == self._skip - 1:
                 break
-        max_frame = np.max(np.stack(self._obs_buffer), axis=0)
-        return max_frame, total_reward, done, info
+            self._previous_obs[...] = obs
+        if i == 0:
+            # the episode finished on the first frame, so there is no earlier frame to pool it with
+            return obs, total_reward, done, info
+        np.maximum(self._previous_obs, obs, out=self._max_frame)
+        return self._max_frame, total_reward, done, info
 
     def reset(self):
-        """Clear past frame buffer and init. to first obs. from inner env."""
-        self._obs_buffer.clear()
-        obs = self.env.reset()
-        self._obs_buffer.append(obs)
-        return obs
+        """Init. to first obs. from inner env."""
+        return self.env.reset()
 
 
 class ProcessFrame84(gym.ObservationWrapper):
@@ -173,11 +174,62 @@ class BufferWrapper(gym.ObservationWrapper):
         return self.buffer
 
 
+class ProcessFrameStack(gym.Wrapper):
+    """
+    Fused replacement for ProcessFrame84, ImageToPyTorch, BufferWrapper and ScaledFloatFrame. Each frame is
+    converted to greyscale and resized as a uint8 image into preallocated buffers, then cropped into a circular
+    stack of the most recent frames, so the older frames are never shifted in memory. The observations are uint8
+    stacks of frames with shape (n_steps, 84, 84), oldest first, which the network scales to floats itself.
+
+    Each observation is still a new array rather than a view of a preallocated output, since the observations
+    outlive the step: the environment keeps the last one as the next origin state, the replay buffers and actor
+    processes hold on to new states until they are stored, and the recorder buffers both. Reusing one output
+    array would make the origin and new state of every transition the same frames.
+    """
+
+    def __init__(self, env, n_steps=4):
+        super(ProcessFrameStack, self).__init__(env)
+        self.observation_space = gym.spaces.Box(low=0, high=255, shape=(n_steps, 84, 84), dtype=np.uint8)
+        self.frames = np.zeros((n_steps, 84, 84), dtype=np.uint8)
+        self.oldest = 0
+        self.greyscale = None
+        self.resized = np.empty((110, 84), dtype=np.uint8)
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        return self._add_frame(obs), reward, done, info
+
+    def reset(self):
+        self.frames.fill(0)
+        self.oldest = 0
+        return self._add_frame(self.env.reset())
+
+    def _add_frame(self, frame):
+        """
+        Processes a frame into the position of the oldest frame in the stack.
+
+        @param frame: the RGB frame from the environment
+        @return: a new array of the stack of frames, oldest first, which callers may keep
+        """
+
+        if frame.size == 210 * 160 * 3:
+            frame = np.reshape(frame, [210, 160, 3])
+        elif frame.size == 250 * 160 * 3:
+            frame = np.reshape(frame, [250, 160, 3])
+        else:
+            assert False, "Unknown resolution."
+        if self.greyscale is None or self.greyscale.shape != frame.shape[:2]:
+            self.greyscale = np.empty(frame.shape[:2], dtype=np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY, dst=self.greyscale)
+        cv2.resize(self.greyscale, (84, 110), dst=self.resized, interpolation=cv2.INTER_AREA)
+        self.frames[self.oldest] = self.resized[18:102]
+        self.oldest = (self.oldest + 1) % len(self.frames)
+        # a copy is needed, since callers keep earlier observations alongside this one
+        return np.concatenate((self.frames[self.oldest:], self.frames[:self.oldest]))
+
+
 def make_env(env_name):
     env = gym.make(env_name)
     env = MaxAndSkipEnv(env)
     env = FireResetEnv(env)
-    env = ProcessFrame84(env)
-    env = ImageToPyTorch(env)
-    env = BufferWrapper(env, 4)
-    return ScaledFloatFrame(env)
+    return ProcessFrameStack(env, 4)
@@ -25,6 +25,7 @@ class TaxiDriver(Environment):
                          " | : | : "
                          ]
         self.action_space = ["Left", "Up", "Right", "Down", "Pickup", "Dropoff"]
+        self.action_ids = {action: i for i, action in enumerate(self.action_space)}
         self.NUM_ACTIONS = 6
         self.illegal_actions = [(0, 1, "Right"), (0, 2, "Left"), (1, 1, "Right"),
                                 (1, 2, "Left"), (3, 0, "Right"), (3, 1, "Left"),
@@ -40,6 +41,11 @@ class TaxiDriver(Environment):
                 for passenger_location in self.passenger_locations:
                     for destination in self.locations:
                         self.state_space.append(((row, col), passenger_location, destination))
+        self.NUM_STATES = len(self.state_space)
+        self.passenger_location_ids = {location: i for i, location in enumerate(self.passenger_locations)}
+        self.destination_ids = {location: i for i, location in enumerate(self.locations)}
+        self._build_movement_table()
+        self._build_outcome_table()
 
         self.passenger_state = random.choice(self.locations)
         self.passenger_in_taxi = False
@@ -58,28 +64,29 @@ class TaxiDriver(Environment):
         @return: the observation to the agent, including the new stae and reward
         """
 
-        row, col = self.taxi_state
+        _, reward, episode_done = self.execute_action_id(self.action_ids[action])
+        return self.current_state, reward, episode_done
 
-        if action in ["Left", "Up", "Right", "Down"]:
-            if (row, col, action) not in self.illegal_actions:
-                if action == "Up" and not row == 0:
-                    self.taxi_state = (row - 1, col)
-                elif action == "Left" and not col == 0:
-                    self.taxi_state = (row, col - 1)
-                elif action == "Right" and not col == 4:
-                    self.taxi_state = (row, col + 1)
-                elif action == "Down" and not row == 4:
-                    self.taxi_state = (row + 1, col)
+    def execute_action_id(self, action_id):
+        """
+        Integer encoded version of execute_action(), which takes the id of the action and returns the id of the
+        new state. The current state is still updated, so both versions can be used interchangeably.
+
+        @param action_id: the id of the action chosen by the agent
+        @return: the observation to the agent, including the id of the new state and reward
+        """
 
         reward = -1
         episode_done = False
-        if action == "Pickup":
+        if action_id < 4:
+            self.taxi_state = self.movement_table[self.taxi_state][action_id]
+        elif action_id == 4:
             if self.passenger_state == self.taxi_state and not self.passenger_in_taxi:
                 self.passenger_in_taxi = True
                 self.passenger_state = "In Taxi"
             else:
                 reward = -10
-        if action == "Dropoff":
+        else:
             if self.passenger_in_taxi and self.taxi_state == self.destination_state:
                 reward = 20
                 episode_done = True
@@ -90,7 +97,48 @@ class TaxiDriver(Environment):
                 reward = -10
 
         self.current_state = (self.taxi_state, self.passenger_state, self.destination_state)
-        return self.current_state, reward, episode_done
+        return self.encode_state(self.current_state), reward, episode_done
+
+    def encode_state(self, state):
+        """
+        @param state: the given (taxi location, passenger location, destination) state
+        @return: the integer id of the state, which is its index in the state space
+        """
+
+        (row, col), passenger_location, destination = state
+        taxi_id = row * self.GRID_COLUMNS + col
+        passenger_id = taxi_id * len(self.passenger_locations) + self.passenger_location_ids[passenger_location]
+        return passenger_id * len(self.locations) + self.destination_ids[destination]
+
+    def decode_state(self, state_id):
+        """
+        @param state_id: the integer id of a state
+        @return: the (taxi location, passenger location, destination) state with the given id
+        """
+
+        return self.state_space[state_id]
+
+    def get_outcomes(self, state_id, action_id):
+        """
+        Gets the outcome of taking an action from a state, without changing the current state. The outcomes are
+        looked up from the table built by execute_action_id(), so both always agree.
+
+        @param state_id: the id of the origin state
+        @param action_id: the id of the action chosen by the agent
+        @return: list of the equally likely (new state id, reward, episode done) outcomes
+        """
+
+        return [self.outcome_table[state_id][action_id]]
+
+    def get_start_state_ids(self):
+        """
+        @return: list of the ids of the equally likely start states, with the taxi anywhere in the grid and the
+        passenger waiting at one of the four locations
+        """
+
+        return [self.encode_state(((row, col), passenger_location, destination))
+                for row in range(self.GRID_ROWS) for col in range(self.GRID_COLUMNS)
+                for passenger_location in self.locations for destination in self.locations]
 
     def random_action(self):
         """
@@ -101,6 +149,17 @@ class TaxiDriver(Environment):
 
         return random.choice(self.action_space)
 
+    def set_state(self, state):
+        """
+        Sets the current state to the given state, updating the locations of the taxi, passenger and destination.
+
+        @param state: the given (taxi location, passenger location, destination) state
+        """
+
+        self.taxi_state, self.passenger_state, self.destination_state = state
+        self.passenger_in_taxi = self.passenger_state == "In Taxi"
+        self.current_state = state
+
     def restart_environment(self):
         """
         Resets the various environment state variables, by randomly generating a new spawn location
@@ -113,3 +172,33 @@ class TaxiDriver(Environment):
         self.taxi_state = (random.randrange(0, 5), random.randrange(0, 5))
         self.start_state = (self.taxi_state, self.passenger_state, self.destination_state)
         self.current_state = self.start_state
+
+    def _build_movement_table(self):
+        """
+        Precomputes the taxi location reached by each movement action from each location in the grid, taking
+        into account the borders of the grid and the walls given by the illegal actions.
+        """
+
+        self.movement_table = {}
+        for row in range(self.GRID_ROWS):
+            for col in range(self.GRID_COLUMNS):
+                new_locations = [(row, max(col - 1, 0)), (max(row - 1, 0), col),
+                                 (row, min(col + 1, self.GRID_COLUMNS - 1)), (min(row + 1, self.GRID_ROWS - 1), col)]
+                for action_id, action in enumerate(self.action_space[:4]):
+                    if (row, col, action) in self.illegal_actions:
+                        new_locations[action_id] = (row, col)
+                self.movement_table[(row, col)] = new_locations
+
+    def _build_outcome_table(self):
+        """
+        Precomputes the outcome of every action from every state, by executing it from that state with
+        execute_action_id(), so the outcomes given to the planning agents follow the same dynamics as the episodes.
+        """
+
+        self.outcome_table = []
+        for state in self.state_space:
+            outcomes = []
+            for action_id in range(self.NUM_ACTIONS):
+                self.set_state(state)
+                outcomes.append(self.execute_action_id(action_id))
+            self.outcome_table.append(outcomes)
@@ -0,0 +1,280 @@
+from model.environment import Environment
+import multiprocessing
+import types
+import numpy as np
+
+
+class VectorisedEnvironment(Environment):
+    """
+    Runs several copies of a gym backed environment (CartPole, Pong, Lunar Lander or Bipedal Walker) in the same
+    process, and steps them together. The current states of the copies are stacked into one array, so an agent
+    can choose actions for every copy with a single batched forward pass of its neural network.
+
+    A copy whose episode has finished is restarted straight away. The new state returned for it is the final
+    state of the finished episode, while its current state is the start state of the next episode.
+    """
+
+    def __init__(self, make_env, num_envs):
+        self.envs = [make_env() for _ in range(num_envs)]
+        self.NUM_ENVS = num_envs
+        self.name = self.envs[0].name
+        self.gym_env = self.envs[0].gym_env
+        self.MAX_REWARD = self.envs[0].MAX_REWARD
+        self.MIN_REWARD = self.envs[0].MIN_REWARD
+        self.current_state = np.stack([env.current_state for env in self.envs])
+
+    def execute_action(self, actions):
+        """
+        Takes one action in each copy of the environment.
+
+        @param actions: array of the actions for each copy
+        @return: arrays of the original states, rewards received, new states and whether each episode has finished
+        """
+
+        origin_states = self.current_state
+        new_states, rewards, dones = [], [], []
+        for env, action in zip(self.envs, actions):
+            _, reward, new_state, episode_done = env.execute_action(action)
+            if episode_done:
+                env.restart_environment()
+            new_states.append(new_state)
+            rewards.append(reward)
+            dones.append(episode_done)
+        self.current_state = np.stack([env.current_state for env in self.envs])
+        return origin_states, np.array(rewards, dtype=np.float32), np.stack(new_states), np.array(dones)
+
+    def random_action(self):
+        """
+        @return: array of a random action for each copy of the environment
+        """
+
+        return np.array([env.gym_env.action_space.sample() for env in self.envs])
+
+    def restart_environment(self):
+        """
+        Restarts every copy of the environment.
+        """
+
+        for env in self.envs:
+            env.restart_environment()
+        self.current_state = np.stack([env.current_state for env in self.envs])
+
+    def close(self):
+        """
+        Closes the gym environment of every copy.
+        """
+
+        for env in self.envs:
+            env.gym_env.close()
+
+
+def _run_environment_worker(connection, make_env):
+    """
+    Runs in a subprocess, receiving commands for a single copy of an environment from the pipe and sending back
+    the results, until told to close.
+
+    @param connection: the worker's end of the pipe
+    @param make_env: the environment class, or another picklable callable which creates the environment
+    """
+
+    env = make_env()
+    while True:
+        command, data = connection.recv()
+        if command == "step":
+            _, reward, new_state, episode_done = env.execute_action(data)
+            if episode_done:
+                env.restart_environment()
+            connection.send((reward, new_state, episode_done, env.current_state))
+        elif command == "random_action":
+            connection.send(env.gym_env.action_space.sample())
+        elif command == "restart":
+            env.restart_environment()
+            connection.send(env.current_state)
+        elif command == "spaces":
+            connection.send((env.name, env.gym_env.observation_space, env.gym_env.action_space, env.MAX_REWARD,
+                             env.MIN_REWARD, env.current_state))
+        elif command == "close":
+            env.gym_env.close()
+            connection.close()
+            break
+
+
+class SubprocessVectorisedEnvironment(Environment):
+    """
+    Subprocess version of VectorisedEnvironment, which runs each copy of the environment in its own process so
+    the copies are stepped in parallel on a multi-core machine. Only the observation and action spaces of the
+    gym environment are available through gym_env.
+    """
+
+    def __init__(self, make_env, num_envs):
+        self.NUM_ENVS = num_envs
+        self.connections, self.processes = [], []
+        for _ in range(num_envs):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_run_environment_worker, args=(worker_connection, make_env),
+                                              daemon=True)
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+        spaces = self._send_to_all("spaces")
+        self.name, observation_space, action_space, self.MAX_REWARD, self.MIN_REWARD, _ = spaces[0]
+        self.gym_env = types.SimpleNamespace(observation_space=observation_space, action_space=action_space)
+        self.current_state = np.stack([current_state for *_, current_state in spaces])
+
+    def execute_action(self, actions):
+        """
+        Takes one action in each copy of the environment, with the copies stepping in parallel.
+
+        @param actions: array of the actions for each copy
+        @return: arrays of the original states, rewards received, new states and whether each episode has finished
+        """
+
+        origin_states = self.current_state
+        for connection, action in zip(self.connections, actions):
+            connection.send(("step", action))
+        rewards, new_states, dones, current_states = zip(*[connection.recv() for connection in self.connections])
+        self.current_state = np.stack(current_states)
+        return origin_states, np.array(rewards, dtype=np.float32), np.stack(new_states), np.array(dones)
+
+    def random_action(self):
+        """
+        @return: array of a random action for each copy of the environment
+        """
+
+        return np.array(self._send_to_all("random_action"))
+
+    def restart_environment(self):
+        """
+        Restarts every copy of the environment.
+        """
+
+        self.current_state = np.stack(self._send_to_all("restart"))
+
+    def close(self):
+        """
+        Closes every copy of the environment and waits for the subprocesses to finish.
+        """
+
+        for connection in self.connections:
+            connection.send(("close", None))
+        for process in self.processes:
+            process.join()
+
+    def _send_to_all(self, command):
+        """
+        @param command: the command to send to every subprocess
+        @return: list of the results from each subprocess
+        """
+
+        for connection in self.connections:
+            connection.send((command, None))
+        return [connection.recv() for connection in self.connections]
+
+
+class VectorisedGridWorld(Environment):
+    """
+    NumPy version of a tabular grid world (Frozen Lake, Cliff Walking or Taxi Driver), which steps many
+    independent episodes at once. The states and actions of the copies are held as arrays of their integer ids,
+    and every outcome of every state and action is precomputed from the grid world into dense arrays, so a step
+    of all the copies is a few fancy-indexes. Slipping on a slippery lake is sampled with NumPy's random number
+    generator for every copy at once.
+
+    As with VectorisedEnvironment, a copy whose episode has finished is restarted straight away.
+    """
+
+    def __init__(self, env, num_envs, seed=None):
+        self.env = env
+        self.NUM_ENVS = num_envs
+        self.name = env.name
+        self.MAX_REWARD = env.MAX_REWARD
+        self.MIN_REWARD = env.MIN_REWARD
+        self.NUM_STATES = env.NUM_STATES
+        self.NUM_ACTIONS = env.NUM_ACTIONS
+        outcomes = [[env.get_outcomes(state_id, action_id) for action_id in range(env.NUM_ACTIONS)]
+                    for state_id in range(env.NUM_STATES)]
+        self.next_states = np.array([[[new_state_id for new_state_id, _, _ in action_outcomes]
+                                      for action_outcomes in state_outcomes] for state_outcomes in outcomes])
+        self.rewards = np.array([[[reward for _, reward, _ in action_outcomes]
+                                  for action_outcomes in state_outcomes] for state_outcomes in outcomes], dtype=float)
+        self.dones = np.array([[[episode_done for _, _, episode_done in action_outcomes]
+                                for action_outcomes in state_outcomes] for state_outcomes in outcomes], dtype=bool)
+        self.NUM_OUTCOMES = self.next_states.shape[2]
+        self.start_state_ids = np.array(env.get_start_state_ids())
+        self.rng = np.random.default_rng(seed)
+        self.current_state = self.rng.choice(self.start_state_ids, num_envs)
+
+    def execute_action(self, action_ids):
+        """
+        Takes one action in each copy of the environment.
+
+        @param action_ids: array of the ids of the actions for each copy
+        @return: arrays of the ids of the original states, rewards received, ids of the new states and whether
+        each episode has finished
+        """
+
+        origin_states = self.current_state
+        outcomes = self.rng.integers(self.NUM_OUTCOMES, size=self.NUM_ENVS)
+        new_states = self.next_states[origin_states, action_ids, outcomes]
+        rewards = self.rewards[origin_states, action_ids, outcomes]
+        dones = self.dones[origin_states, action_ids, outcomes]
+        self.current_state = np.where(dones, self.rng.choice(self.start_state_ids, self.NUM_ENVS), new_states)
+        return origin_states, rewards, new_states, dones
+
+    def random_action(self):
+        """
+        @return: array of the id of a random action for each copy of the environment
+        """
+
+        return self.rng.integers(self.NUM_ACTIONS, size=self.NUM_ENVS)
+
+    def restart_environment(self):
+        """
+        Restarts every copy of the environment.
+        """
+
+        self.current_state = self.rng.choice(self.start_state_ids, self.NUM_ENVS)
+
+    def run_episodes(self, policy, gamma=1.0, max_steps=None):
+        """
+        Restarts every copy of the environment and runs a single episode in each, following the given policy,
+        which can be used to evaluate a policy or to make Monte Carlo estimates of its value.
+
+        @param policy: array of the id of the action to take in each state, or array with shape (states, actions)
+        of the probability of taking each action in each state
+        @param gamma: the discount factor of the returns
+        @param max_steps: the maximum number of steps in an episode, defaulting to the environment's
+        MAX_EPISODE_STEPS
+        @return: arrays of the discounted return and the number of steps of each episode
+        """
+
+        policy = np.asarray(policy)
+        max_steps = self.env.MAX_EPISODE_STEPS if max_steps is None else max_steps
+        returns = np.zeros(self.NUM_ENVS)
+        episode_steps = np.zeros(self.NUM_ENVS, dtype=np.int64)
+        running = np.ones(self.NUM_ENVS, dtype=bool)
+        discount = 1.0
+        self.restart_environment()
+        for _ in range(max_steps):
+            _, rewards, _, dones = self.execute_action(self._choose_actions(policy))
+            returns[running] += discount * rewards[running]
+            episode_steps += running
+            running &= ~dones
+            discount *= gamma
+            if not running.any():
+                break
+        self.restart_environment()
+        return returns, episode_steps
+
+    def _choose_actions(self, policy):
+        """
+        @param policy: array of the id of the action to take in each state, or of the probability of taking each
+        action in each state
+        @return: array of the ids of the actions chosen for the current state of each copy
+        """
+
+        if policy.ndim == 1:
+            return policy[self.current_state]
+        cumulative_probabilities = np.cumsum(policy[self.current_state], axis=1)
+        samples = self.rng.random(self.NUM_ENVS) * cumulative_probabilities[:, -1]
+        return np.minimum((samples[:, np.newaxis] >= cumulative_probabilities).sum(axis=1), self.NUM_ACTIONS - 1)
@@ -0,0 +1,23 @@
+import torch
+
+
+def flatten_parameters(*networks):
+    """
+    Moves the parameters of the given neural networks into a single contiguous vector, and replaces each
+    parameter's data with a view into it. The networks are used exactly as before, while an operation on the
+    vector, such as a soft update of a target network, updates every parameter at once in a single fused op.
+
+    Must be called before an optimiser is created for the networks, so its state is built for the views.
+
+    @param networks: the neural networks whose parameters are flattened
+    @return: the vector holding every parameter of the networks, in order
+    """
+
+    parameters = [parameter for network in networks for parameter in network.parameters()]
+    vector = torch.cat([parameter.data.reshape(-1) for parameter in parameters])
+    offset = 0
+    for parameter in parameters:
+        size = parameter.numel()
+        parameter.data = vector[offset:offset + size].view_as(parameter)
+        offset += size
+    return vector
@@ -0,0 +1,92 @@
+import numpy as np
+
+
+class QTable:
+    """
+    Dense table of Q-values stored in a NumPy array, with one row per state and one column per action.
+    States and actions are mapped to integer indices, so finding the best action for a state is a single
+    vectorised argmax rather than a loop over the action space.
+
+    The table can be used in place of a dictionary keyed by (state, action) tuples, so the GUI can still
+    draw the values of action from it.
+    """
+
+    def __init__(self, state_space, action_space):
+        self.state_space = state_space
+        self.action_space = action_space
+        self.state_index = {state: i for i, state in enumerate(state_space)}
+        self.action_index = {action: i for i, action in enumerate(action_space)}
+        self.table = np.zeros((len(state_space), len(action_space)))
+
+    def __getitem__(self, key):
+        state, action = key
+        return self.table.item(self.state_index[state], self.action_index[action])
+
+    def __setitem__(self, key, value):
+        state, action = key
+        self.table[self.state_index[state], self.action_index[action]] = value
+
+    def __contains__(self, key):
+        state, action = key
+        return state in self.state_index and action in self.action_index
+
+    def __len__(self):
+        return self.table.size
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys(self):
+        """
+        @return: generator of every (state, action) pair in the table
+        """
+
+        for state in self.state_space:
+            for action in self.action_space:
+                yield state, action
+
+    def items(self):
+        """
+        Lazily produces the same (state, action) to value mapping as a dictionary based Q-table would.
+
+        @return: generator of ((state, action), value) pairs
+        """
+
+        values = self.table.tolist()
+        for i, state in enumerate(self.state_space):
+            for j, action in enumerate(self.action_space):
+                yield (state, action), values[i][j]
+
+    def update(self, state, action, target, alpha):
+        """
+        Moves the value of action for the given state and action towards the target by a step size of alpha.
+
+        @param state: the given state
+        @param action: the given action
+        @param target: the target value, e.g. the TD target
+        @param alpha: the step size
+        """
+
+        i, j = self.state_index[state], self.action_index[action]
+        value = self.table.item(i, j)
+        self.table[i, j] = value + alpha * (target - value)
+
+    def best_action(self, state):
+        """
+        Returns the action with the highest value of action for the given state. Ties are broken in favour
+        of the action which comes first in the action space.
+
+        @param state: the given state
+        @return: action with the highest value of action for the given state
+        """
+
+        return self.action_space[int(self.table[self.state_index[state]].argmax())]
+
+    def best_value(self, state):
+        """
+        @param state: the given state
+        @return: the highest value of action for the given state
+        """
+
+        values = self.table[self.state_index[state]]
+        return values.item(values.argmax())
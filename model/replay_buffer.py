@@ -0,0 +1,485 @@
+import json
+import os.path
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Experience replay buffer used by the deep learning agents. Each field of a transition is stored in its own
+    preallocated NumPy array, which is written to as a circular buffer, so once the buffer is full the oldest
+    transitions are overwritten. Appending a transition is O(1), and a batch is gathered from every array with
+    a single fancy-index.
+
+    If a directory is given, each array is instead a memory-mapped .npy file of fixed-width records in that
+    directory, along with the position and size of the buffer, so buffers far larger than memory can be kept on
+    disk with the operating system's page cache holding the parts in use. A buffer created in a directory which
+    already holds one of the same shapes reopens it, transitions and all, without deserialising anything.
+    """
+
+    def __init__(self, capacity, state_shape, action_shape=(), action_dtype=np.int64, directory=None):
+        self.capacity = capacity
+        self.directory = directory
+        fields = {"states": ((capacity, *state_shape), np.float32),
+                  "actions": ((capacity, *action_shape), action_dtype),
+                  "rewards": ((capacity,), np.float32),
+                  "new_states": ((capacity, *state_shape), np.float32),
+                  "dones": ((capacity,), bool),
+                  "counters": ((2,), np.int64)}
+        arrays = self._create_arrays(fields)
+        self.states = arrays["states"]
+        self.actions = arrays["actions"]
+        self.rewards = arrays["rewards"]
+        self.new_states = arrays["new_states"]
+        self.dones = arrays["dones"]
+        self.counters = arrays["counters"] if directory is not None else None
+        self.rng = np.random.default_rng()
+        self.position, self.size = (int(counter) for counter in arrays["counters"])
+
+    def __len__(self):
+        return self.size
+
+    def append(self, state, action, reward, new_state, done):
+        """
+        Writes a transition to the next position in the buffer, overwriting the oldest transition if the
+        buffer is full.
+
+        @param state: the origin state
+        @param action: the action taken
+        @param reward: the reward received
+        @param new_state: the new state transitioned to
+        @param done: whether the episode finished
+        """
+
+        self.states[self.position] = state
+        self.actions[self.position] = action
+        self.rewards[self.position] = reward
+        self.new_states[self.position] = new_state
+        self.dones[self.position] = done
+        self.position = (self.position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        if self.counters is not None:
+            self.counters[:] = self.position, self.size
+
+    def sample(self, batch_size):
+        """
+        Samples a batch of distinct transitions uniformly at random.
+
+        @param batch_size: the number of transitions to sample
+        @return: arrays of the states, actions, rewards, new states and dones of the sampled transitions
+        """
+
+        samples = self.rng.choice(self.size, batch_size, replace=False)
+        return self.gather(samples)
+
+    def gather(self, samples):
+        """
+        @param samples: the positions of the transitions in the buffer
+        @return: arrays of the states, actions, rewards, new states and dones at the given positions
+        """
+
+        return (self.states[samples], self.actions[samples], self.rewards[samples], self.new_states[samples],
+                self.dones[samples])
+
+    def state_dict(self):
+        """
+        @return: dictionary of NumPy arrays holding the buffer's stored transitions, capacity, position and random
+        number generator state, which can be saved with np.savez
+        """
+
+        size = self.size
+        return {"states": self.states[:size], "actions": self.actions[:size], "rewards": self.rewards[:size],
+                "new_states": self.new_states[:size], "dones": self.dones[:size], "capacity": np.array(self.capacity),
+                "position": np.array(self.position), "rng": _rng_state_to_array(self.rng)}
+
+    def load_state_dict(self, state):
+        """
+        Restores the buffer from a dictionary returned by state_dict, replacing its capacity and transitions.
+
+        @param state: the dictionary of NumPy arrays, or the loaded .npz file
+        """
+
+        self.capacity = int(state["capacity"])
+        self.states = _fill_to_capacity(state["states"], self.capacity)
+        self.actions = _fill_to_capacity(state["actions"], self.capacity)
+        self.rewards = _fill_to_capacity(state["rewards"], self.capacity)
+        self.new_states = _fill_to_capacity(state["new_states"], self.capacity)
+        self.dones = _fill_to_capacity(state["dones"], self.capacity)
+        self.position = int(state["position"])
+        self.size = len(state["dones"])
+        self.counters = None
+        _load_rng_state(self.rng, state["rng"])
+
+    def flush(self):
+        """
+        Writes any changes to a memory-mapped buffer's files to disk. Does nothing for a buffer held in memory.
+        """
+
+        for array in (self.states, self.actions, self.rewards, self.new_states, self.dones, self.counters):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def _create_arrays(self, fields):
+        """
+        Creates the buffer's arrays, as memory-mapped .npy files if the buffer has a directory. If every file
+        already exists with the right shape and type, they are reopened with their contents. Otherwise they are
+        all created afresh, so a buffer is never made of files from different runs.
+
+        @param fields: dictionary of the name of each array to its shape and type
+        @return: dictionary of the name of each array to the array
+        """
+
+        if self.directory is None:
+            return {name: np.zeros(shape, dtype=dtype) for name, (shape, dtype) in fields.items()}
+        os.makedirs(self.directory, exist_ok=True)
+        paths = {name: os.path.join(self.directory, name + ".npy") for name in fields}
+        arrays = {}
+        for name, (shape, dtype) in fields.items():
+            if not os.path.exists(paths[name]):
+                break
+            array = np.load(paths[name], mmap_mode="r+")
+            if array.shape != shape or array.dtype != np.dtype(dtype):
+                break
+            arrays[name] = array
+        if len(arrays) == len(fields):
+            return arrays
+        return {name: np.lib.format.open_memmap(paths[name], mode="w+", dtype=dtype, shape=shape)
+                for name, (shape, dtype) in fields.items()}
+
+
+class FrameReplayBuffer:
+    """
+    Experience replay buffer for environments whose states are stacks of the most recent image frames, such as
+    Pong. Consecutive states in an episode share all but one of their frames, so only the newest frame of each
+    new state is stored, as a uint8 image. The full stacks of states are rebuilt from the stored frames when a
+    batch is sampled, and are returned as uint8 images for the network to scale.
+
+    The origin state of the first transition of an episode is stored in full, as is the origin state of the
+    oldest transition in the buffer once the transition before it has been overwritten.
+    """
+
+    def __init__(self, capacity, state_shape):
+        self.capacity = capacity
+        self.stack_size = state_shape[0]
+        self.frames = np.zeros((capacity, *state_shape[1:]), dtype=np.uint8)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.continues_episode = np.zeros(capacity, dtype=bool)
+        self.start_states = {}
+        self.last_new_state = None
+        self.rng = np.random.default_rng()
+        self.position = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, state, action, reward, new_state, done):
+        """
+        Writes a transition to the next position in the buffer, overwriting the oldest transition if the
+        buffer is full. If the origin state is the new state of the previous transition, only the newest frame
+        of the new state is stored.
+
+        @param state: the origin state, as a stack of uint8 frames or of frames scaled between 0 and 1
+        @param action: the action taken
+        @param reward: the reward received
+        @param new_state: the new state transitioned to, as a stack of uint8 frames or of frames scaled between 0
+        and 1
+        @param done: whether the episode finished
+        """
+
+        previous = (self.position - 1) % self.capacity
+        continues_episode = (self.size > 0 and self.capacity > 1 and not self.dones[previous]
+                             and (state is self.last_new_state or np.array_equal(state, self.last_new_state)))
+        if self.size == self.capacity:
+            oldest = (self.position + 1) % self.capacity
+            if self.continues_episode[oldest]:
+                self.start_states[oldest] = self._rebuild_states(np.array([oldest]))[0]
+                self.continues_episode[oldest] = False
+            self.start_states.pop(self.position, None)
+
+        if not continues_episode:
+            self.start_states[self.position] = np.array(self._to_frames(state))
+        self.continues_episode[self.position] = continues_episode
+        self.frames[self.position] = self._to_frames(new_state[-1])
+        self.actions[self.position] = action
+        self.rewards[self.position] = reward
+        self.dones[self.position] = done
+        self.last_new_state = new_state
+        self.position = (self.position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size):
+        """
+        Samples a batch of distinct transitions uniformly at random.
+
+        @param batch_size: the number of transitions to sample
+        @return: arrays of the states, actions, rewards, new states and dones of the sampled transitions
+        """
+
+        samples = self.rng.choice(self.size, batch_size, replace=False)
+        return self.gather(samples)
+
+    def gather(self, samples):
+        """
+        @param samples: the positions of the transitions in the buffer
+        @return: arrays of the states, actions, rewards, new states and dones at the given positions, with the
+        states as stacks of uint8 frames
+        """
+
+        states = self._rebuild_states(samples)
+        new_states = np.concatenate([states[:, 1:], self.frames[samples][:, np.newaxis]], axis=1)
+        return states, self.actions[samples], self.rewards[samples], new_states, self.dones[samples]
+
+    def state_dict(self):
+        """
+        The stored start states are saved as one array alongside their positions, so the buffer is saved in the
+        same compact form of uint8 frames as it is held in memory.
+
+        @return: dictionary of NumPy arrays holding the buffer's stored transitions, capacity, position and random
+        number generator state, which can be saved with np.savez
+        """
+
+        start_positions = np.array(sorted(self.start_states), dtype=np.int64)
+        start_states = np.zeros((len(start_positions), self.stack_size, *self.frames.shape[1:]), dtype=np.uint8)
+        for i, position in enumerate(start_positions):
+            start_states[i] = self.start_states[position]
+        if self.last_new_state is None:
+            last_new_state = np.zeros((0, *self.frames.shape[1:]), dtype=np.uint8)
+        else:
+            last_new_state = self._to_frames(self.last_new_state)
+        size = self.size
+        return {"frames": self.frames[:size], "actions": self.actions[:size], "rewards": self.rewards[:size],
+                "dones": self.dones[:size], "continues_episode": self.continues_episode[:size],
+                "start_positions": start_positions, "start_states": start_states, "last_new_state": last_new_state,
+                "capacity": np.array(self.capacity), "position": np.array(self.position),
+                "rng": _rng_state_to_array(self.rng)}
+
+    def load_state_dict(self, state):
+        """
+        Restores the buffer from a dictionary returned by state_dict, replacing its capacity and transitions.
+
+        @param state: the dictionary of NumPy arrays, or the loaded .npz file
+        """
+
+        self.capacity = int(state["capacity"])
+        self.frames = _fill_to_capacity(state["frames"], self.capacity)
+        self.actions = _fill_to_capacity(state["actions"], self.capacity)
+        self.rewards = _fill_to_capacity(state["rewards"], self.capacity)
+        self.dones = _fill_to_capacity(state["dones"], self.capacity)
+        self.continues_episode = _fill_to_capacity(state["continues_episode"], self.capacity)
+        self.start_states = dict(zip(state["start_positions"].tolist(), np.array(state["start_states"])))
+        last_new_state = np.array(state["last_new_state"])
+        self.last_new_state = last_new_state if len(last_new_state) > 0 else None
+        self.position = int(state["position"])
+        self.size = len(state["dones"])
+        _load_rng_state(self.rng, state["rng"])
+
+    def _rebuild_states(self, samples):
+        """
+        Rebuilds the origin states of the given transitions. Each frame of a state is taken from the transition
+        which added it, stepping back through the episode until its stored start state is reached.
+
+        @param samples: the positions of the transitions in the buffer
+        @return: the origin states as stacks of uint8 frames
+        """
+
+        states = np.empty((len(samples), self.stack_size, *self.frames.shape[1:]), dtype=np.uint8)
+        depths = np.zeros(len(samples), dtype=np.int64)
+        in_episode = np.ones(len(samples), dtype=bool)
+        for k in range(self.stack_size):
+            in_episode &= self.continues_episode[(samples - k) % self.capacity]
+            depths += in_episode
+            states[in_episode, self.stack_size - 1 - k] = self.frames[(samples[in_episode] - 1 - k) % self.capacity]
+        for i in np.flatnonzero(depths < self.stack_size):
+            depth = depths[i]
+            start_state = self.start_states[(samples[i] - depth) % self.capacity]
+            states[i, :self.stack_size - depth] = start_state[depth:]
+        return states
+
+    def _to_frames(self, state):
+        """
+        @param state: a frame or stack of frames, either as uint8 images or scaled between 0 and 1
+        @return: the frames as uint8 images
+        """
+
+        state = np.asarray(state)
+        if state.dtype == np.uint8:
+            return state
+        return np.rint(state * 255.0).astype(np.uint8)
+
+
+class SumTree:
+    """
+    Binary tree in which every node holds the sum of its children, stored in a flat NumPy array with the root at
+    index 1. The leaves hold the priorities of the transitions in a replay buffer, so the total priority is read
+    from the root, and setting a priority or finding the leaf at a given prefix sum takes O(log n) time.
+    """
+
+    def __init__(self, capacity):
+        self.leaf_start = 1 << max(capacity - 1, 0).bit_length()
+        self.tree = np.zeros(2 * self.leaf_start)
+
+    def total(self):
+        """
+        @return: the sum of every priority in the tree
+        """
+
+        return self.tree[1]
+
+    def update(self, positions, priorities):
+        """
+        Sets the priorities at the given positions, then recalculates the sums of their ancestors one level of
+        the tree at a time.
+
+        @param positions: array of positions in the replay buffer
+        @param priorities: array of the new priorities
+        """
+
+        nodes = positions + self.leaf_start
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            nodes = np.unique(nodes // 2)
+
+    def find(self, prefix_sums):
+        """
+        Descends the tree from the root for every prefix sum at once, to find the leaves where the running total
+        of the priorities reaches each prefix sum.
+
+        @param prefix_sums: array of values between 0 and the total priority
+        @return: array of the positions in the replay buffer of the found leaves
+        """
+
+        nodes = np.ones(len(prefix_sums), dtype=np.int64)
+        while nodes[0] < self.leaf_start:
+            left = 2 * nodes
+            go_right = prefix_sums >= self.tree[left]
+            prefix_sums = np.where(go_right, prefix_sums - self.tree[left], prefix_sums)
+            nodes = left + go_right
+        return nodes - self.leaf_start
+
+
+class PrioritisedReplayBuffer:
+    """
+    Prioritised experience replay, which wraps a ReplayBuffer or FrameReplayBuffer. Transitions are sampled with
+    probability proportional to their priority, (|TD error| + epsilon) ^ alpha, using a sum tree. New transitions
+    are given the highest priority seen so far, so each is likely to be replayed at least once.
+
+    The importance-sampling weights returned with a batch correct for the non-uniform sampling, and are
+    normalised by the largest weight in the batch.
+    """
+
+    def __init__(self, buffer, alpha=0.6, epsilon=1e-6):
+        self.buffer = buffer
+        self.ALPHA = alpha
+        self.EPSILON = epsilon
+        self.sum_tree = SumTree(buffer.capacity)
+        self.max_priority = 1.0
+        self.rng = np.random.default_rng()
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def append(self, state, action, reward, new_state, done):
+        """
+        Appends a transition to the wrapped buffer with the highest priority seen so far.
+
+        @param state: the origin state
+        @param action: the action taken
+        @param reward: the reward received
+        @param new_state: the new state transitioned to
+        @param done: whether the episode finished
+        """
+
+        position = self.buffer.position
+        self.buffer.append(state, action, reward, new_state, done)
+        self.sum_tree.update(np.array([position]), np.array([self.max_priority]))
+
+    def sample(self, batch_size, beta=0.4):
+        """
+        Samples a batch of transitions in proportion to their priorities. The total priority is split into
+        batch_size equal segments, and one transition is sampled from each.
+
+        @param batch_size: the number of transitions to sample
+        @param beta: how strongly the importance-sampling weights correct for the prioritised sampling
+        @return: arrays of the states, actions, rewards, new states and dones of the sampled transitions, followed
+        by their positions in the buffer and their importance-sampling weights
+        """
+
+        total = self.sum_tree.total()
+        segment = total / batch_size
+        prefix_sums = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        samples = np.minimum(self.sum_tree.find(np.minimum(prefix_sums, total * (1 - 1e-12))), len(self) - 1)
+        probabilities = self.sum_tree.tree[samples + self.sum_tree.leaf_start] / total
+        weights = (len(self) * probabilities) ** -beta
+        weights = (weights / weights.max()).astype(np.float32)
+        return (*self.buffer.gather(samples), samples, weights)
+
+    def update_priorities(self, samples, td_errors):
+        """
+        Sets the priorities of the sampled transitions from their new TD errors.
+
+        @param samples: the positions of the transitions in the buffer
+        @param td_errors: array of the TD errors of the transitions
+        """
+
+        priorities = (np.abs(td_errors) + self.EPSILON) ** self.ALPHA
+        self.max_priority = max(self.max_priority, priorities.max())
+        self.sum_tree.update(samples, priorities)
+
+    def state_dict(self):
+        """
+        @return: dictionary of NumPy arrays holding the wrapped buffer's state, followed by the priorities in the
+        sum tree
+        """
+
+        return {**self.buffer.state_dict(), "sum_tree": self.sum_tree.tree,
+                "max_priority": np.array(self.max_priority), "priority_rng": _rng_state_to_array(self.rng)}
+
+    def load_state_dict(self, state):
+        """
+        Restores the wrapped buffer and the priorities from a dictionary returned by state_dict.
+
+        @param state: the dictionary of NumPy arrays, or the loaded .npz file
+        """
+
+        self.buffer.load_state_dict(state)
+        self.sum_tree = SumTree(self.buffer.capacity)
+        self.sum_tree.tree = np.array(state["sum_tree"])
+        self.max_priority = float(state["max_priority"])
+        _load_rng_state(self.rng, state["priority_rng"])
+
+
+def _fill_to_capacity(array, capacity):
+    """
+    @param array: the stored entries of one field of a replay buffer, as saved by its state_dict
+    @param capacity: the capacity of the replay buffer
+    @return: a new array with room for capacity entries, starting with the stored entries
+    """
+
+    filled = np.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+    filled[:len(array)] = array
+    return filled
+
+
+def _rng_state_to_array(rng):
+    """
+    @param rng: a NumPy random number generator
+    @return: the generator's state as a JSON string in a NumPy array, so it can be saved in a .npz file without
+    pickling
+    """
+
+    return np.array(json.dumps(rng.bit_generator.state))
+
+
+def _load_rng_state(rng, array):
+    """
+    Restores the state of a NumPy random number generator from an array returned by _rng_state_to_array.
+
+    @param rng: the random number generator to restore
+    @param array: the array holding the generator's state
+    """
+
+    rng.bit_generator.state = json.loads(str(array))
@@ -0,0 +1,17 @@
+import numpy as np
+
+
+def softmax_probabilities(feature_vectors, theta):
+    """
+    Calculates the softmax probabilities over the last axis of the action preferences of a linear policy, as used
+    by the REINFORCE and Actor-Critic agents. The largest preference is subtracted before exponentiating, so large
+    weights cannot overflow.
+
+    @param feature_vectors: the feature vectors with shape (actions, features), or (states, actions, features)
+    @param theta: the weights of the policy, with one weight for each feature
+    @return: the softmax probabilities with shape (actions,), or (states, actions)
+    """
+
+    preferences = feature_vectors @ theta
+    e = np.exp(preferences - preferences.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
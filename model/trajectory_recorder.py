@@ -0,0 +1,218 @@
+import glob
+import os.path
+import struct
+import zipfile
+import numpy as np
+
+FIELDS = ("states", "actions", "rewards", "new_states", "dones")
+
+
+class TrajectoryRecorder:
+    """
+    Records the transitions of an environment to a directory of .npz shards, for re-training and benchmarking
+    agents offline without running the environment again. Transitions are buffered until a shard's worth have
+    been recorded, then written as one shard with a column for each of the states, actions, rewards, new states
+    and dones. Recording into a directory which already holds shards adds new shards after them.
+
+    Compressed shards take much less disk space, while uncompressed shards can be memory-mapped by the
+    TrajectoryReader.
+    """
+
+    def __init__(self, directory, shard_size=10000, compress=True):
+        self.directory = directory
+        self.SHARD_SIZE = shard_size
+        self.compress = compress
+        os.makedirs(directory, exist_ok=True)
+        self.shard_counter = len(_find_shards(directory))
+        self.columns = {field: [] for field in FIELDS}
+
+    def __len__(self):
+        return len(self.columns["dones"])
+
+    def record(self, state, action, reward, new_state, done):
+        """
+        Buffers a transition, writing out a shard once SHARD_SIZE transitions have been buffered. The states are
+        copied, so the environment may reuse its arrays.
+
+        @param state: the origin state
+        @param action: the action taken
+        @param reward: the reward received
+        @param new_state: the new state transitioned to
+        @param done: whether the episode finished
+        """
+
+        self.columns["states"].append(np.array(state))
+        self.columns["actions"].append(action)
+        self.columns["rewards"].append(reward)
+        self.columns["new_states"].append(np.array(new_state))
+        self.columns["dones"].append(done)
+        if len(self) == self.SHARD_SIZE:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered transitions to a new shard, if there are any. The shard is written under a temporary
+        name and then renamed, so a reader never sees a partly written shard.
+        """
+
+        if len(self) == 0:
+            return
+        shard = {"states": np.stack(self.columns["states"]),
+                 "actions": np.array(self.columns["actions"]),
+                 "rewards": np.array(self.columns["rewards"], dtype=np.float32),
+                 "new_states": np.stack(self.columns["new_states"]),
+                 "dones": np.array(self.columns["dones"], dtype=bool)}
+        path = os.path.join(self.directory, "shard_{0:06d}.npz".format(self.shard_counter))
+        with open(path + ".tmp", "wb") as shard_file:
+            if self.compress:
+                np.savez_compressed(shard_file, **shard)
+            else:
+                np.savez(shard_file, **shard)
+        os.replace(path + ".tmp", path)
+        self.shard_counter += 1
+        self.columns = {field: [] for field in FIELDS}
+
+    def close(self):
+        """
+        Writes any buffered transitions, ready for the recording to be read.
+        """
+
+        self.flush()
+
+
+class RecordingEnvironment:
+    """
+    Wraps an environment, recording every transition taken through its execute_action method with a
+    TrajectoryRecorder, and otherwise behaving exactly as the wrapped environment. Both the grid world
+    environments, which return the new state, reward and whether the episode has finished, and the gym
+    environments, which also return the origin state, are supported. The states and actions of the grid world
+    environments are recorded as their integer ids, since their tuples can nest locations of different shapes.
+
+    Only the steps taken through the wrapper are recorded, so the controllers refuse to record when training with
+    vectorised environments or actor processes, which step their own copies of the environment.
+    """
+
+    def __init__(self, env, recorder):
+        self.env = env
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)
+
+    def execute_action(self, action):
+        """
+        Executes the action in the wrapped environment and records the transition.
+
+        @param action: the action chosen by the agent
+        @return: the wrapped environment's result
+        """
+
+        state = self.env.current_state
+        result = self.env.execute_action(action)
+        action_id = action
+        if len(result) == 4:
+            state, reward, new_state, episode_done = result
+        else:
+            new_state, reward, episode_done = result
+            state, new_state = self.env.encode_state(state), self.env.encode_state(new_state)
+            action_id = self.env.action_ids[action]
+        self.recorder.record(state, action_id, reward, new_state, episode_done)
+        return result
+
+
+class TrajectoryReader:
+    """
+    Reads the transitions recorded by a TrajectoryRecorder, one shard at a time. The columns of uncompressed
+    shards are memory-mapped straight from the .npz files, so only the transitions used are read from disk, while
+    the columns of compressed shards are decompressed when first used.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.shard_paths = _find_shards(directory)
+        self.rng = np.random.default_rng()
+
+    def __len__(self):
+        return sum(len(self.load_shard(path, ("dones",))["dones"]) for path in self.shard_paths)
+
+    def load_shard(self, path, fields=FIELDS):
+        """
+        @param path: the path of the shard
+        @param fields: the names of the columns to load
+        @return: dictionary of the shard's columns, which are memory-mapped if the shard is uncompressed
+        """
+
+        columns = _memory_map_npz(path)
+        if columns is None:
+            with np.load(path) as shard:
+                columns = {field: shard[field] for field in fields}
+        return columns
+
+    def iterate_batches(self, batch_size, shuffle=False):
+        """
+        Iterates over every recorded transition in batches, in the order recorded, or in a random order if
+        shuffle is set. A batch never spans two shards, so the last batch of each shard may be smaller.
+
+        @param batch_size: the largest number of transitions in a batch
+        @param shuffle: whether to visit the shards, and the transitions within each shard, in a random order
+        @return: generator of arrays of the states, actions, rewards, new states and dones of each batch
+        """
+
+        shard_order = self.rng.permutation(len(self.shard_paths)) if shuffle else range(len(self.shard_paths))
+        for shard_index in shard_order:
+            columns = self.load_shard(self.shard_paths[shard_index])
+            size = len(columns["dones"])
+            order = self.rng.permutation(size) if shuffle else np.arange(size)
+            for start in range(0, size, batch_size):
+                samples = np.sort(order[start:start + batch_size])
+                yield tuple(np.asarray(columns[field][samples]) for field in FIELDS)
+
+    def fill_replay_buffer(self, replay_buffer):
+        """
+        Appends every recorded transition, in the order recorded, to the given replay buffer, so an agent can be
+        trained from the recording.
+
+        @param replay_buffer: the replay buffer of the agent
+        """
+
+        for states, actions, rewards, new_states, dones in self.iterate_batches(10000):
+            for transition in zip(states, actions, rewards, new_states, dones):
+                replay_buffer.append(*transition)
+
+
+def _find_shards(directory):
+    """
+    @param directory: the directory of a recording
+    @return: sorted list of the paths of the recording's shards
+    """
+
+    return sorted(glob.glob(os.path.join(directory, "shard_*.npz")))
+
+
+def _memory_map_npz(path):
+    """
+    Memory-maps every array of an uncompressed .npz file, by locating the .npy data of each member of the zip
+    archive within the file.
+
+    @param path: the path of the .npz file
+    @return: dictionary of the name of each array to its memory map, or None if the file is compressed
+    """
+
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as npz_file:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                return None
+            # the local file header is 30 bytes, ending with the lengths of the file name and extra field
+            npz_file.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", npz_file.read(4))
+            npz_file.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(npz_file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(npz_file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(npz_file)
+            order = "F" if fortran_order else "C"
+            arrays[info.filename[:-len(".npy")]] = np.memmap(npz_file, dtype=dtype, mode="r", offset=npz_file.tell(),
+                                                             shape=shape, order=order)
+    return arrays
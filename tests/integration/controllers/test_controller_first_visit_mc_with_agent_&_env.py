@@ -24,9 +24,9 @@ def test_stop_and_reset(controller):
     pytest.gui.animation.update_animation = False
     pytest.controller.stop_and_reset()
     env_current_state = pytest.env.current_state
-    agent_returns = pytest.agent.returns
+    agent_visit_counts = pytest.agent.visit_counts
     agent_sample_value_of_action = pytest.agent.Q[((0, 0), "Right")]
-    assert (env_current_state, agent_returns, agent_sample_value_of_action) == ((0, 0), {}, 0)
+    assert (env_current_state, agent_visit_counts, agent_sample_value_of_action) == ((0, 0), {}, 0)
 
 
 def test_episode(controller):
@@ -0,0 +1,17 @@
+import pytest
+import sys
+sys.path.extend([".", "..", "../..", "../../.."])
+from headless import HeadlessDriver
+
+
+@pytest.fixture(scope="module")
+def driver():
+    pytest.driver = HeadlessDriver("Frozen Lake 4x4", "Q-Learning")
+    return pytest.driver
+
+
+def test_run(driver):
+    pytest.driver.run()
+    controller = pytest.driver.controller
+    assert controller.episode_counter == controller.no_of_episodes
+    assert len(controller.total_reward_history) == controller.no_of_episodes // 100
@@ -0,0 +1,46 @@
+import pytest
+import sys
+import time
+import torch
+sys.path.extend([".", "..", "../..", "../../.."])
+from model.actor_learner import ActorLearner
+from model.agent_dqn_cartpole import AgentDQNCartPole
+from model.environment_cartpole import CartPole
+
+
+@pytest.fixture(scope="module")
+def actor_learner():
+    pytest.agent = AgentDQNCartPole(CartPole(), batch_size=8)
+    pytest.actor_learner = ActorLearner(pytest.agent, CartPole, 2, chunk_size=4)
+    yield pytest.actor_learner
+    pytest.actor_learner.close()
+
+
+def test_collect(actor_learner):
+    episode_rewards, frames = [], 0
+    deadline = time.time() + 60
+    while not episode_rewards and time.time() < deadline:
+        new_episode_rewards, new_frames = pytest.actor_learner.collect()
+        episode_rewards += new_episode_rewards
+        frames += new_frames
+    assert (len(episode_rewards) > 0, len(pytest.agent.replay_buffer)) == (True, frames)
+
+
+def test_collect_keeps_episodes_consecutive(actor_learner):
+    replay_buffer = pytest.agent.replay_buffer
+    states = replay_buffer.states[:len(replay_buffer)]
+    new_states = replay_buffer.new_states[:len(replay_buffer)]
+    dones = replay_buffer.dones[:len(replay_buffer)]
+    continues = (states[1:] == new_states[:-1]).all(axis=1)
+    assert continues[~dones[:-1]].mean() > 0.5
+
+
+def test_publish_weights(actor_learner):
+    pytest.agent.net[0].weight.data.fill_(0.5)
+    pytest.actor_learner.publish_weights()
+    assert torch.all(pytest.actor_learner.shared_net[0].weight == 0.5)
+
+
+def test_close(actor_learner):
+    pytest.actor_learner.close()
+    assert any(actor.is_alive() for actor in pytest.actor_learner.actors) is False
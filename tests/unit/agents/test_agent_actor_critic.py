@@ -70,3 +70,9 @@ def test_update_weights(agent):
 def test_get_all_softmax_probabilities(agent):
     all_softmax_probs = pytest.agent.get_all_softmax_probabilities()
     assert len(all_softmax_probs) == 16
+
+
+def test_get_all_softmax_probabilities_matches_policy(agent):
+    pytest.agent.theta = np.array([800.0, -3.0])
+    all_softmax_probs = pytest.agent.get_all_softmax_probabilities()
+    assert np.allclose(all_softmax_probs[(1, 2)], pytest.agent.policy((1, 2)))
@@ -0,0 +1,64 @@
+import pytest
+import sys
+import types
+import gym
+import numpy as np
+import torch
+sys.path.extend([".", "..", "../..", "../../.."])
+from model.agent_ddpg import AgentDDPG
+
+
+@pytest.fixture(scope="module")
+def agent():
+    env = types.SimpleNamespace(gym_env=gym.make("Pendulum-v0"))
+    pytest.agent = AgentDDPG(env, (16, 8), gamma=0.99, alpha_actor=0.01, alpha_critic=0.01, tau=0.5, batch_size=4,
+                             policy_delay=2)
+    for i in range(8):
+        pytest.agent.replay_buffer.append(np.full(3, i / 8), np.full(1, 0.5), 1.0, np.full(3, (i + 1) / 8), i == 7)
+    return pytest.agent
+
+
+def test_correct_initialisation(agent):
+    layers = [layer.out_features for layer in pytest.agent.actor.net if hasattr(layer, "out_features")]
+    assert (layers, pytest.agent.POLICY_DELAY, len(pytest.agent.replay_buffer)) == ([16, 8, 1], 2, 8)
+
+
+def test_backwards_pass_delays_actor_update(agent):
+    actor_vector = torch.cat([param.data.reshape(-1) for param in pytest.agent.actor.parameters()])
+    critic_vector = torch.cat([param.data.reshape(-1) for param in pytest.agent.critic.parameters()])
+    pytest.agent._backwards_pass()
+    actor_changed = not torch.equal(actor_vector, torch.cat([param.reshape(-1) for param in
+                                                             pytest.agent.actor.parameters()]))
+    critic_changed = not torch.equal(critic_vector, torch.cat([param.reshape(-1) for param in
+                                                               pytest.agent.critic.parameters()]))
+    assert (actor_changed, critic_changed) == (False, True)
+
+
+def test_backwards_pass_updates_actor_with_frozen_critic(agent):
+    actor_vector = torch.cat([param.data.reshape(-1) for param in pytest.agent.actor.parameters()])
+    pytest.agent._backwards_pass()
+    actor_changed = not torch.equal(actor_vector, torch.cat([param.reshape(-1) for param in
+                                                             pytest.agent.actor.parameters()]))
+    critic_requires_grad = all(param.requires_grad for param in pytest.agent.critic.parameters())
+    assert (actor_changed, critic_requires_grad) == (True, True)
+
+
+def test_soft_update(agent):
+    expected = pytest.agent.target_parameter_vector * 0.5 + pytest.agent.parameter_vector * 0.5
+    pytest.agent._soft_update()
+    assert torch.allclose(pytest.agent.target_parameter_vector, expected)
+
+
+def test_best_action(agent):
+    pytest.agent.env.current_state = np.array([0.1, 0.2, 0.3])
+    action = pytest.agent.actor(torch.FloatTensor([pytest.agent.env.current_state]))[0]
+    assert np.allclose(pytest.agent._best_action(), action.detach().numpy())
+
+
+def test_memory_mapped_replay_buffer(tmp_path):
+    env = types.SimpleNamespace(gym_env=gym.make("Pendulum-v0"))
+    mapped_agent = AgentDDPG(env, (16, 8), 0.99, 0.01, 0.01, 0.5, 4, replay_size=100, replay_directory=tmp_path)
+    mapped_agent.replay_buffer.append(np.zeros(3), np.full(1, 0.5), 1.0, np.ones(3), False)
+    mapped_agent.restart_matrices()
+    buffer = mapped_agent.replay_buffer
+    assert (isinstance(buffer.states, np.memmap), buffer.capacity, len(buffer)) == (True, 100, 1)
@@ -1,8 +1,11 @@
 import pytest
+import torch
 import sys
+from unittest import mock
 sys.path.extend([".", "..", "../..", "../../.."])
 from model.agent_dqn_cartpole import AgentDQNCartPole
 from model.environment_cartpole import CartPole
+from model.environment_vectorised import VectorisedEnvironment
 
 
 @pytest.fixture(scope="module")
@@ -25,3 +28,49 @@ def test_restart_matrices(agent):
     pytest.agent.restart_matrices()
     buffer_size = len(pytest.agent.replay_buffer)
     assert buffer_size == 0
+
+
+def test_random_step_with_prioritised_replay(agent):
+    pytest.agent.prioritised_replay = True
+    pytest.agent.restart_matrices()
+    for _ in range(10):
+        pytest.agent.random_step()
+    pytest.agent.prioritised_replay = False
+    sum_tree = pytest.agent.replay_buffer.sum_tree
+    assert (len(pytest.agent.replay_buffer), sum_tree.total() > 0) == (10, True)
+
+
+def test_vectorised_step(agent):
+    pytest.agent.restart_matrices()
+    vector_env = VectorisedEnvironment(CartPole, 4)
+    rewards, dones = pytest.agent.vectorised_step(vector_env, epsilon=0.5)
+    assert (rewards.tolist(), len(dones), len(pytest.agent.replay_buffer)) == ([1, 1, 1, 1], 4, 4)
+
+
+def test_vectorised_step_samples_random_actions_locally(agent):
+    pytest.agent.restart_matrices()
+    vector_env = VectorisedEnvironment(CartPole, 4)
+    with mock.patch.object(vector_env, "random_action") as random_action:
+        pytest.agent.vectorised_step(vector_env, epsilon=1.0)
+    actions = pytest.agent.replay_buffer.actions[:4].tolist()
+    assert (random_action.call_count, all(action in (0, 1) for action in actions)) == (0, True)
+
+
+def test_train_frequency(agent):
+    pytest.agent.restart_matrices()
+    pytest.agent.TRAIN_FREQ, pytest.agent.GRADIENT_STEPS, pytest.agent.LEARNING_STARTS = 4, 2, 12
+    backwards_passes = []
+    pytest.agent._backwards_pass = lambda: backwards_passes.append(pytest.agent.step_counter)
+    for _ in range(20):
+        _, _, episode_done = pytest.agent.random_step()
+        if episode_done:
+            pytest.agent.env.restart_environment()
+    del pytest.agent._backwards_pass
+    pytest.agent.TRAIN_FREQ, pytest.agent.GRADIENT_STEPS, pytest.agent.LEARNING_STARTS = 1, 1, 0
+    assert backwards_passes == [16, 16, 20, 20]
+
+
+def test_best_action(agent):
+    pytest.agent.env.restart_environment()
+    q_vals = pytest.agent.net(torch.FloatTensor([pytest.agent.env.current_state]))
+    assert pytest.agent._best_action() == q_vals.argmax().item()
@@ -1,10 +1,33 @@
 import pytest
 import sys
+import numpy as np
+import gym
+from types import SimpleNamespace
 sys.path.extend([".", "..", "../..", "../../.."])
 from model.agent_dqn_pong import AgentDQNPong
 from model.environment_pong import Pong
 
 
+class StubPong:
+    """
+    Stands in for Pong without the Atari ROMs, returning random stacks of frames of the same shape.
+    """
+
+    def __init__(self):
+        self.name = "Pong"
+        self.gym_env = SimpleNamespace(observation_space=gym.spaces.Box(0, 255, (4, 84, 84), np.uint8),
+                                       action_space=gym.spaces.Discrete(6))
+        self.current_state = np.random.randint(0, 256, (4, 84, 84), dtype=np.uint8)
+
+    def execute_action(self, action):
+        origin_state = self.current_state
+        self.current_state = np.random.randint(0, 256, (4, 84, 84), dtype=np.uint8)
+        return origin_state, 1.0, self.current_state, False
+
+    def random_action(self):
+        return self.gym_env.action_space.sample()
+
+
 @pytest.fixture(scope="module")
 def agent():
     env = Pong()
@@ -25,3 +48,20 @@ def test_restart_matrices(agent):
     pytest.agent.restart_matrices()
     buffer_size = len(pytest.agent.replay_buffer)
     assert buffer_size == 0
+
+
+def test_checkpoint(tmp_path):
+    saved_agent = AgentDQNPong(StubPong(), gamma=0.99, alpha=0.001, batch_size=4, prioritised_replay=True)
+    for _ in range(5):
+        saved_agent.random_step()
+    saved_agent.save_checkpoint(tmp_path)
+    loaded_agent = AgentDQNPong(StubPong(), gamma=0.99, alpha=0.001, batch_size=4)
+    loaded_agent.load_checkpoint(tmp_path)
+    weights_equal = all((a == b).all() for a, b in zip(saved_agent.net.parameters(), loaded_agent.net.parameters()))
+    loaded_buffer = loaded_agent.replay_buffer.state_dict()
+    buffers_equal = all(np.array_equal(array, loaded_buffer[name])
+                        for name, array in saved_agent.replay_buffer.state_dict().items())
+    counters = (loaded_agent.step_counter, len(loaded_agent.replay_buffer))
+    assert (weights_equal, buffers_equal, counters) == (True, True, (5, 5))
+    buffer_types = (type(saved_agent.replay_buffer), type(loaded_agent.replay_buffer))
+    assert (loaded_agent.prioritised_replay, buffer_types[0] == buffer_types[1]) == (True, True)
@@ -15,24 +15,25 @@ def agent():
 def test_correct_initialisation(agent):
     Q_values_size = len(pytest.agent.Q)
     policy_size = len(pytest.agent.policy)
-    returns_size = len(pytest.agent.returns)
-    assert (Q_values_size, policy_size, returns_size) == (64, 16, 0)
+    visit_counts_size = len(pytest.agent.visit_counts)
+    assert (Q_values_size, policy_size, visit_counts_size) == (64, 16, 0)
 
 
 def test_restart_matrices(agent):
     pytest.agent.restart_matrices()
     Q_values_size = len(pytest.agent.Q)
     policy_size = len(pytest.agent.policy)
-    returns_size = len(pytest.agent.returns)
-    assert (Q_values_size, policy_size, returns_size) == (64, 16, 0)
+    visit_counts_size = len(pytest.agent.visit_counts)
+    assert (Q_values_size, policy_size, visit_counts_size) == (64, 16, 0)
 
 
-def test_appears_in_sequence(agent):
+def test_first_visits(agent):
     state = (0, 0)
-    episode_sequence = [{"state": state, "action": "Right", "reward": 1}]
-    test_1 = pytest.agent._appears_in_sequence(state, "Right", episode_sequence)
-    test_2 = pytest.agent._appears_in_sequence(state, "Left", episode_sequence)
-    assert (test_1, test_2) == (True, False)
+    episode_sequence = [{"state": state, "action": "Right", "reward": 0},
+                        {"state": (0, 1), "action": "Left", "reward": 0},
+                        {"state": state, "action": "Right", "reward": 1}]
+    first_visits = pytest.agent._first_visits(episode_sequence)
+    assert first_visits == {(state, "Right"): 0, ((0, 1), "Left"): 1}
 
 
 def test_update_policy(agent):
@@ -48,3 +49,23 @@ def test_best_action(agent):
     state = (0, 0)
     best_action = pytest.agent._best_action(state)
     assert best_action == "Right"
+
+
+def test_update_policy_running_mean(agent):
+    state = (0, 0)
+    episode_sequence = [{"state": state, "action": "Right", "reward": 0},
+                        {"state": state, "action": "Right", "reward": 0}]
+    pytest.agent.update_policy(episode_sequence)
+    assert (pytest.agent.Q[(state, "Right")], pytest.agent.visit_counts[(state, "Right")]) == (0.5, 2)
+
+
+def test_update_policy_with_array_Q(agent):
+    pytest.agent.use_array_Q = True
+    pytest.agent.restart_matrices()
+    state = (0, 0)
+    episode_sequence = [{"state": state, "action": "Right", "reward": 1}]
+    policy_before = pytest.agent.policy[state]
+    pytest.agent.update_policy(episode_sequence)
+    policy_after = pytest.agent.policy[state]
+    pytest.agent.use_array_Q = False
+    assert (policy_before, policy_after, pytest.agent.Q[(state, "Right")]) == ("Left", "Right", 1)
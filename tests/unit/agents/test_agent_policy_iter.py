@@ -31,9 +31,7 @@ def test_calculate_value_of_action(agent):
     state = (0, 0)
     action = "Right"
     new_state = (0, 1)
-    pytest.agent.rewards[(state, action, new_state)] = 1
-    pytest.agent.transitions_counter[(state, action)] = {}
-    pytest.agent.transitions_counter[(state, action)][(new_state)] = 1
+    pytest.agent._increment_transitions_counter(state, action, new_state, 1)
     value_of_action = pytest.agent._calculate_value_of_action(state, action)
     assert value_of_action == 1
 
@@ -43,12 +41,12 @@ def test_increment_transitions_counter(agent):
     state = (0, 0)
     action = "Right"
     new_state = (0, 1)
-    pytest.agent._increment_transitions_counter(state, action, new_state)
+    pytest.agent._increment_transitions_counter(state, action, new_state, 0)
     counter1 = pytest.agent.transitions_counter[(state, action)][(new_state)]
-    pytest.agent._increment_transitions_counter(state, action, new_state)
+    pytest.agent._increment_transitions_counter(state, action, new_state, 0)
     counter2 = pytest.agent.transitions_counter[(state, action)][(new_state)]
     new_state = (0, 0)
-    pytest.agent._increment_transitions_counter(state, action, new_state)
+    pytest.agent._increment_transitions_counter(state, action, new_state, 0)
     counter3 = pytest.agent.transitions_counter[(state, action)][(new_state)]
     assert (counter1, counter2, counter3) == (1, 2, 1)
 
@@ -67,8 +65,7 @@ def test_evaluate_policy(agent):
     state = (0, 0)
     action = "Right"
     new_state = (0, 1)
-    pytest.agent.rewards[(state, action, new_state)] = 1
-    pytest.agent._increment_transitions_counter(state, action, new_state)
+    pytest.agent._increment_transitions_counter(state, action, new_state, 1)
     pytest.agent.policy[state] = "Right"
     value_before = pytest.agent.values_of_state[state]
     pytest.agent.evaluate_policy()
@@ -83,3 +80,19 @@ def test_improve_policy(agent):
     pytest.agent.improve_policy()
     policy_after = pytest.agent.policy[state]
     assert (policy_before, policy_after) == ("Left", "Right")
+
+
+@pytest.mark.parametrize("evaluation_mode", ["linear_solve", "vectorised"])
+def test_evaluate_policy_with_arrays(agent, evaluation_mode):
+    pytest.agent.restart_matrices()
+    pytest.agent.evaluation_mode = evaluation_mode
+    state = (0, 0)
+    new_state = (0, 1)
+    pytest.agent._increment_transitions_counter(state, "Right", new_state, 1)
+    pytest.agent._increment_transitions_counter(new_state, "Left", state, 0)
+    pytest.agent.policy[state] = "Left"
+    pytest.agent.evaluate_policy()
+    pytest.agent.evaluation_mode = "sweep"
+    # Moving right then left forever gives a value of 1 + 0.9^2 + 0.9^4 + ... = 1 / 0.19
+    assert pytest.agent.values_of_state[state] == pytest.approx(1 / 0.19, abs=0.01)
+    assert (pytest.agent.policy[state], pytest.agent.policy[new_state]) == ("Right", "Left")
@@ -53,3 +53,26 @@ def test_update_weights(agent):
 def test_get_all_softmax_probabilities(agent):
     all_softmax_probs = pytest.agent.get_all_softmax_probabilities()
     assert len(all_softmax_probs) == 16
+
+
+def test_policy_with_large_weights(agent):
+    pytest.agent.theta = np.array([1000.0, -1000.0])
+    softmax_probabilities = pytest.agent.policy((0, 0))
+    assert (np.isfinite(softmax_probabilities).all(), softmax_probabilities.sum()) == (True, pytest.approx(1))
+
+
+def test_compute_gradient_matches_feature_vectors(agent):
+    pytest.agent.theta = np.array([0.5, -0.5])
+    state = (0, 1)
+    softmax_probs = pytest.agent.policy(state)
+    expected = pytest.env.get_feature_vector(state, "Up") - sum(
+        p * pytest.env.get_feature_vector(state, action) for p, action in zip(softmax_probs, pytest.env.action_space))
+    assert np.allclose(pytest.agent.compute_gradient(state, "Up", softmax_probs), expected)
+
+
+def test_update_weights_discounted_returns(agent):
+    pytest.agent.theta = np.zeros(2)
+    rewards = [0, 0, 1]
+    gradients = np.array([[1, 0], [0, 1], [1, 1]])
+    pytest.agent.update_weights(gradients, rewards)
+    assert np.allclose(pytest.agent.theta, 0.1 * np.array([0.81 + 1, 0.9 + 1]))
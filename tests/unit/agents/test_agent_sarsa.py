@@ -44,3 +44,18 @@ def test_best_action(agent):
     state = (0, 0)
     best_action = pytest.agent._best_action(state)
     assert best_action == "Right"
+
+
+def test_update_Q_with_array_Q(agent):
+    pytest.agent.use_array_Q = True
+    pytest.agent.restart_matrices()
+    state = (0, 0)
+    action = "Right"
+    new_state = (0, 1)
+    reward = 1
+    new_action = pytest.agent.policy[new_state]
+    pytest.agent.update_Q(state, action, new_state, reward, new_action)
+    q_value = pytest.agent.Q[(state, action)]
+    policy = pytest.agent.policy[state]
+    pytest.agent.use_array_Q = False
+    assert (len(pytest.agent.Q), q_value, policy) == (64, 0.2, "Right")
@@ -1,5 +1,7 @@
 import pytest
 import sys
+import numpy as np
+from unittest import mock
 sys.path.extend([".", "..", "../..", "../../.."])
 from model.agent_value_iter import AgentValueIter
 from model.environment_frozenlake import FrozenLake
@@ -31,9 +33,7 @@ def test_calculate_value_of_action(agent):
     state = (0, 0)
     action = "Right"
     new_state = (0, 1)
-    pytest.agent.rewards[(state, action, new_state)] = 1
-    pytest.agent.transitions_counter[(state, action)] = {}
-    pytest.agent.transitions_counter[(state, action)][(new_state)] = 1
+    pytest.agent._increment_transitions_counter(state, action, new_state, 1)
     value_of_action = pytest.agent._calculate_value_of_action(state, action)
     assert value_of_action == 1
 
@@ -43,12 +43,12 @@ def test_increment_transitions_counter(agent):
     state = (0, 0)
     action = "Right"
     new_state = (0, 1)
-    pytest.agent._increment_transitions_counter(state, action, new_state)
+    pytest.agent._increment_transitions_counter(state, action, new_state, 0)
     counter1 = pytest.agent.transitions_counter[(state, action)][(new_state)]
-    pytest.agent._increment_transitions_counter(state, action, new_state)
+    pytest.agent._increment_transitions_counter(state, action, new_state, 0)
     counter2 = pytest.agent.transitions_counter[(state, action)][(new_state)]
     new_state = (0, 0)
-    pytest.agent._increment_transitions_counter(state, action, new_state)
+    pytest.agent._increment_transitions_counter(state, action, new_state, 0)
     counter3 = pytest.agent.transitions_counter[(state, action)][(new_state)]
     assert (counter1, counter2, counter3) == (1, 2, 1)
 
@@ -58,8 +58,7 @@ def test_update_values(agent):
     state = (0, 0)
     action = "Right"
     new_state = (0, 1)
-    pytest.agent.rewards[(state, action, new_state)] = 1
-    pytest.agent._increment_transitions_counter(state, action, new_state)
+    pytest.agent._increment_transitions_counter(state, action, new_state, 1)
     value_before = pytest.agent.values_of_state[state]
     pytest.agent.update_values()
     value_after = pytest.agent.values_of_state[state]
@@ -73,3 +72,67 @@ def test_update_policy(agent):
     pytest.agent.update_policy()
     policy_after = pytest.agent.policy[state]
     assert (policy_before, policy_after) == ("Left", "Right")
+
+
+def test_compile_model(agent):
+    pytest.agent.restart_matrices()
+    state = (0, 0)
+    action = "Right"
+    pytest.agent._increment_transitions_counter(state, action, (0, 1), 1)
+    pytest.agent._increment_transitions_counter(state, action, (0, 1), 1)
+    pytest.agent._increment_transitions_counter(state, action, (1, 0), 0)
+    probabilities, expected_rewards, explored = pytest.agent.model.compile()
+    assert probabilities.shape == (16, 4, 16)
+    assert np.allclose(probabilities[0, 2, [1, 4]], [2 / 3, 1 / 3])
+    assert (expected_rewards[0, 2], explored.sum()) == (pytest.approx(2 / 3), 1)
+
+
+def test_update_values_vectorised(agent):
+    pytest.agent.restart_matrices()
+    pytest.agent.planning_mode = "vectorised"
+    state = (0, 0)
+    action = "Right"
+    new_state = (0, 1)
+    pytest.agent._increment_transitions_counter(state, action, new_state, 1)
+    pytest.agent.policy[state] = "Left"
+    pytest.agent.update_values()
+    pytest.agent.planning_mode = "sweep"
+    assert (pytest.agent.values_of_state[state], pytest.agent.values_of_state[new_state]) == (1, 0)
+    assert pytest.agent.policy[state] == "Right"
+
+
+def test_update_values_prioritised(agent):
+    pytest.agent.restart_matrices()
+    pytest.agent.planning_mode = "prioritised"
+    pytest.agent._increment_transitions_counter((0, 1), "Right", (0, 2), 1)
+    pytest.agent.update_values()
+    pytest.agent._increment_transitions_counter((0, 0), "Right", (0, 1), 0)
+    pytest.agent.policy[(0, 0)] = "Left"
+    pytest.agent.update_values()
+    pytest.agent.planning_mode = "sweep"
+    values = (pytest.agent.values_of_state[(0, 0)], pytest.agent.values_of_state[(0, 1)])
+    assert (values, pytest.agent.policy[(0, 0)], len(pytest.agent.model.updated_states)) == ((0.9, 1), "Right", 0)
+
+
+def test_update_values_prioritised_large_map():
+    grid_map = ["S" + "F" * 63] + ["F" * 64] * 62 + ["F" * 63 + "G"]
+    env = FrozenLake(False, grid_map=grid_map)
+    sweep_agent = AgentValueIter(env, gamma=0.9)
+    prioritised_agent = AgentValueIter(env, gamma=0.9, planning_mode="prioritised")
+    for agent in (sweep_agent, prioritised_agent):
+        for state_id, state in enumerate(env.state_space):
+            for action_id, action in enumerate(env.action_space):
+                new_state_id, reward, _ = env.get_outcomes(state_id, action_id)[0]
+                agent._increment_transitions_counter(state, action, env.decode_state(new_state_id), reward)
+        agent.update_values()
+        agent._increment_transitions_counter((0, 63), "Down", (1, 63), -20)
+    with mock.patch.object(sweep_agent, "_calculate_value_of_state",
+                           wraps=sweep_agent._calculate_value_of_state) as sweep_backups:
+        sweep_agent.update_values()
+    with mock.patch.object(prioritised_agent, "_calculate_value_of_state",
+                           wraps=prioritised_agent._calculate_value_of_state) as prioritised_backups:
+        prioritised_agent.update_values()
+    differences = [abs(sweep_agent.values_of_state[state] - prioritised_agent.values_of_state[state])
+                   for state in env.state_space]
+    assert (sweep_backups.call_count >= env.NUM_STATES, prioritised_backups.call_count < 20) == (True, True)
+    assert (max(differences) < 0.01, prioritised_agent.model.probabilities) == (True, None)
@@ -0,0 +1,53 @@
+import pytest
+import sys
+import numpy as np
+sys.path.extend([".", "..", "../..", "../../.."])
+from model.empirical_model import EmpiricalModel
+from model.environment_frozenlake import FrozenLake
+
+
+@pytest.fixture(scope="module")
+def model():
+    env = FrozenLake(False)
+    pytest.model = EmpiricalModel(env)
+    return pytest.model
+
+
+def test_correct_initialisation(model):
+    dense_arrays = (pytest.model.probabilities, pytest.model.expected_rewards, pytest.model.explored)
+    assert (dense_arrays, len(pytest.model.transitions_counter), len(pytest.model.changed)) == ((None,) * 3, 0, 0)
+
+
+def test_add_transition(model):
+    pytest.model.add_transition((0, 0), "Right", (0, 1), 1)
+    pytest.model.add_transition((0, 0), "Right", (0, 1), 0)
+    pytest.model.add_transition((0, 0), "Right", (1, 0), 0)
+    counter = pytest.model.transitions_counter[((0, 0), "Right")][(0, 1)]
+    total_counts = pytest.model.total_counts[((0, 0), "Right")]
+    mean_reward = pytest.model.rewards[((0, 0), "Right", (0, 1))]
+    assert (counter, total_counts, mean_reward, pytest.model.probabilities) == (2, 3, 0.5, None)
+
+
+def test_value_of_action(model):
+    values_of_state = {state: 0.0 for state in pytest.model.env.state_space}
+    assert pytest.model.value_of_action((0, 0), "Right", values_of_state, 0.9) == pytest.approx(1 / 3)
+
+
+def test_compile(model):
+    probabilities, expected_rewards, explored = pytest.model.compile()
+    assert probabilities.shape == (16, 4, 16) and np.allclose(probabilities[0, 2, [1, 4]], [2 / 3, 1 / 3])
+    assert (expected_rewards[0, 2], explored.sum(), len(pytest.model.changed)) == (pytest.approx(1 / 3), 1, 0)
+
+
+def test_compile_only_changed_rows(model):
+    pytest.model.probabilities[0, 2] = 0
+    pytest.model.add_transition((0, 1), "Down", (1, 1), -1)
+    assert pytest.model.changed == {((0, 1), "Down")}
+    probabilities, expected_rewards, explored = pytest.model.compile()
+    assert (probabilities[0, 2].sum(), probabilities[1, 3, 5], expected_rewards[1, 3], explored.sum()) == (0, 1, -1, 2)
+
+
+def test_predecessors_and_updated_states(model):
+    updated_states = pytest.model.pop_updated_states()
+    predecessors = pytest.model.predecessors[(0, 1)]
+    assert (predecessors, updated_states, pytest.model.updated_states) == ({(0, 0)}, {(0, 0), (0, 1)}, set())
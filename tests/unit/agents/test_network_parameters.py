@@ -0,0 +1,38 @@
+import pytest
+import sys
+import torch
+import torch.nn as nn
+sys.path.extend([".", "..", "../..", "../../.."])
+from model.network_parameters import flatten_parameters
+
+
+@pytest.fixture(scope="module")
+def networks():
+    pytest.net = nn.Sequential(nn.Linear(3, 4), nn.ReLU(), nn.Linear(4, 2))
+    pytest.target_net = nn.Sequential(nn.Linear(3, 4), nn.ReLU(), nn.Linear(4, 2))
+    pytest.expected_target_parameters = [target_param.data * 0.9 + param.data * 0.1 for target_param, param in
+                                         zip(pytest.target_net.parameters(), pytest.net.parameters())]
+    pytest.outputs = pytest.net(torch.ones(1, 3))
+    pytest.vector = flatten_parameters(pytest.net)
+    pytest.target_vector = flatten_parameters(pytest.target_net)
+    return pytest.net
+
+
+def test_flatten_parameters(networks):
+    outputs = pytest.net(torch.ones(1, 3))
+    assert (pytest.vector.shape, torch.allclose(outputs, pytest.outputs)) == ((3 * 4 + 4 + 4 * 2 + 2,), True)
+
+
+def test_soft_update_of_flattened_parameters(networks):
+    pytest.target_vector.lerp_(pytest.vector, 0.1)
+    target_parameters = list(pytest.target_net.parameters())
+    assert all(torch.allclose(target_param, expected_param) for target_param, expected_param in
+               zip(target_parameters, pytest.expected_target_parameters))
+
+
+def test_optimiser_updates_flattened_parameters(networks):
+    optimiser = torch.optim.SGD(pytest.net.parameters(), lr=0.1)
+    vector = pytest.vector.clone()
+    pytest.net(torch.ones(1, 3)).sum().backward()
+    optimiser.step()
+    assert not torch.allclose(pytest.vector, vector)
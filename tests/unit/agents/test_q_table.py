@@ -0,0 +1,41 @@
+import pytest
+import sys
+sys.path.extend([".", "..", "../..", "../../.."])
+from model.q_table import QTable
+from model.environment_frozenlake import FrozenLake
+
+
+@pytest.fixture(scope="module")
+def q_table():
+    env = FrozenLake(False)
+    pytest.q_table = QTable(env.state_space, env.action_space)
+    return pytest.q_table
+
+
+def test_correct_initialisation(q_table):
+    assert (len(pytest.q_table), pytest.q_table.table.shape, pytest.q_table[((0, 0), "Left")]) == (64, (16, 4), 0)
+
+
+def test_set_and_get_item(q_table):
+    pytest.q_table[((1, 2), "Down")] = 0.5
+    assert (pytest.q_table[((1, 2), "Down")], pytest.q_table.table[6, 3]) == (0.5, 0.5)
+
+
+def test_items_matches_dictionary(q_table):
+    values = dict(pytest.q_table.items())
+    assert (len(values), values[((1, 2), "Down")], values[((1, 2), "Up")]) == (64, 0.5, 0)
+
+
+def test_best_action_ties(q_table):
+    assert pytest.q_table.best_action((0, 0)) == "Left"
+
+
+def test_best_action_and_value(q_table):
+    pytest.q_table[((0, 0), "Right")] = 2
+    assert (pytest.q_table.best_action((0, 0)), pytest.q_table.best_value((0, 0))) == ("Right", 2)
+
+
+def test_update(q_table):
+    pytest.q_table[((0, 1), "Up")] = 1
+    pytest.q_table.update((0, 1), "Up", 3, 0.5)
+    assert pytest.q_table[((0, 1), "Up")] == 2
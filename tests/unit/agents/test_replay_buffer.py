@@ -0,0 +1,143 @@
+import pytest
+import sys
+import numpy as np
+sys.path.extend([".", "..", "../..", "../../.."])
+from model.replay_buffer import ReplayBuffer, FrameReplayBuffer, SumTree, PrioritisedReplayBuffer
+
+
+@pytest.fixture(scope="module")
+def replay_buffer():
+    pytest.replay_buffer = ReplayBuffer(3, (2,))
+    return pytest.replay_buffer
+
+
+def test_correct_initialisation(replay_buffer):
+    shapes = (pytest.replay_buffer.states.shape, pytest.replay_buffer.actions.shape)
+    assert (len(pytest.replay_buffer), shapes) == (0, ((3, 2), (3,)))
+
+
+def test_append(replay_buffer):
+    pytest.replay_buffer.append([0.1, 0.2], 1, 1.0, [0.3, 0.4], False)
+    pytest.replay_buffer.append([0.3, 0.4], 0, 0.0, [0.5, 0.6], True)
+    assert (len(pytest.replay_buffer), pytest.replay_buffer.position) == (2, 2)
+
+
+def test_append_when_full(replay_buffer):
+    pytest.replay_buffer.append([0.5, 0.6], 1, 2.0, [0.7, 0.8], False)
+    pytest.replay_buffer.append([0.7, 0.8], 0, 3.0, [0.9, 1.0], True)
+    rewards = pytest.replay_buffer.rewards.tolist()
+    assert (len(pytest.replay_buffer), pytest.replay_buffer.position, rewards) == (3, 1, [3, 0, 2])
+
+
+def test_sample(replay_buffer):
+    states, actions, rewards, new_states, dones = pytest.replay_buffer.sample(3)
+    order = np.argsort(rewards)
+    assert np.allclose(states[order], [[0.3, 0.4], [0.5, 0.6], [0.7, 0.8]])
+    assert (actions[order].tolist(), dones[order].tolist()) == ([0, 1, 0], [True, False, True])
+
+
+@pytest.fixture(scope="module")
+def frame_replay_buffer():
+    pytest.frame_replay_buffer = FrameReplayBuffer(3, (2, 1, 1))
+    return pytest.frame_replay_buffer
+
+
+def test_frame_append(frame_replay_buffer):
+    frame_buffer = pytest.frame_replay_buffer
+    frame_buffer.append(np.array([[[0.0]], [[0.2]]]), 1, 0.0, np.array([[[0.2]], [[0.4]]]), False)
+    frame_buffer.append(frame_buffer.last_new_state, 0, 1.0, np.array([[[0.4]], [[0.6]]]), True)
+    assert (frame_buffer.frames.dtype, list(frame_buffer.start_states), len(frame_buffer)) == (np.uint8, [0], 2)
+
+
+def test_frame_gather(frame_replay_buffer):
+    states, actions, rewards, new_states, dones = pytest.frame_replay_buffer.gather(np.array([1, 0]))
+    assert np.allclose(states.ravel() / 255.0, [0.2, 0.4, 0.0, 0.2])
+    assert np.allclose(new_states.ravel() / 255.0, [0.4, 0.6, 0.2, 0.4])
+    assert (states.dtype, actions.tolist(), dones.tolist()) == (np.uint8, [0, 1], [True, False])
+
+
+def test_frame_append_when_full(frame_replay_buffer):
+    frame_buffer = pytest.frame_replay_buffer
+    frame_buffer.append(np.array([[[0.0]], [[0.8]]]), 1, 0.0, np.array([[[0.8]], [[1.0]]]), False)
+    frame_buffer.append(frame_buffer.last_new_state, 1, 0.0, np.array([[[1.0]], [[0.0]]]), False)
+    states, _, _, new_states, _ = frame_buffer.gather(np.array([0, 1, 2]))
+    assert np.allclose(states[:, :, 0, 0] / 255.0, [[0.8, 1.0], [0.2, 0.4], [0.0, 0.8]])
+    assert np.allclose(new_states[:, :, 0, 0] / 255.0, [[1.0, 0.0], [0.4, 0.6], [0.8, 1.0]])
+
+
+def test_sum_tree():
+    sum_tree = SumTree(5)
+    sum_tree.update(np.array([0, 1, 2, 4]), np.array([1.0, 2.0, 3.0, 4.0]))
+    sum_tree.update(np.array([2]), np.array([0.5]))
+    found = sum_tree.find(np.array([0.0, 0.99, 1.0, 3.4, 3.6, 7.4])).tolist()
+    assert (sum_tree.total(), found) == (7.5, [0, 0, 1, 2, 4, 4])
+
+
+def test_prioritised_sample():
+    prioritised_buffer = PrioritisedReplayBuffer(ReplayBuffer(4, (1,)), alpha=1.0, epsilon=0.0)
+    for i in range(4):
+        prioritised_buffer.append([i], i, i, [i + 1], False)
+    prioritised_buffer.update_priorities(np.array([0, 1, 2, 3]), np.array([0.0, 0.0, 1.0, -3.0]))
+    states, actions, _, _, _, samples, weights = prioritised_buffer.sample(4, beta=1.0)
+    assert (sorted(samples.tolist()), actions[np.argsort(samples)].tolist()) == ([2, 3, 3, 3], [2, 3, 3, 3])
+    assert np.allclose(weights[np.argsort(samples)], [1.0, 1 / 3, 1 / 3, 1 / 3])
+
+
+def test_frame_append_uint8_states():
+    frame_buffer = FrameReplayBuffer(2, (2, 1, 1))
+    state = np.array([[[0]], [[51]]], dtype=np.uint8)
+    frame_buffer.append(state, 1, 0.0, np.array([[[51]], [[102]]], dtype=np.uint8), False)
+    state[1] = 0
+    states, _, _, new_states, _ = frame_buffer.gather(np.array([0]))
+    assert (states.ravel().tolist(), new_states.ravel().tolist()) == ([0, 51], [51, 102])
+
+
+def test_frame_state_dict(tmp_path):
+    frame_buffer = FrameReplayBuffer(3, (2, 1, 1))
+    new_state = np.array([[[0]], [[51]]], dtype=np.uint8)
+    for i in range(4):
+        state, new_state = new_state, np.array([new_state[1], [[51 * (i + 2)]]], dtype=np.uint8)
+        frame_buffer.append(state, i, float(i), new_state, i == 1)
+    with open(tmp_path / "buffer.npz", "wb") as buffer_file:
+        np.savez(buffer_file, **frame_buffer.state_dict())
+    loaded_buffer = FrameReplayBuffer(1, (2, 1, 1))
+    with np.load(tmp_path / "buffer.npz") as buffer_state:
+        loaded_buffer.load_state_dict(buffer_state)
+    expected = frame_buffer.gather(np.array([0, 1, 2]))
+    loaded = loaded_buffer.gather(np.array([0, 1, 2]))
+    assert all(np.array_equal(a, b) for a, b in zip(expected, loaded))
+    assert (len(loaded_buffer), loaded_buffer.position, loaded_buffer.sample(2)[1].tolist()) == (
+        3, 1, frame_buffer.sample(2)[1].tolist())
+
+
+def test_prioritised_state_dict():
+    prioritised_buffer = PrioritisedReplayBuffer(ReplayBuffer(4, (1,)))
+    for i in range(3):
+        prioritised_buffer.append([i], i, i, [i + 1], False)
+    prioritised_buffer.update_priorities(np.array([0, 1, 2]), np.array([0.5, 2.0, 1.0]))
+    loaded_buffer = PrioritisedReplayBuffer(ReplayBuffer(4, (1,)))
+    loaded_buffer.load_state_dict(prioritised_buffer.state_dict())
+    samples = prioritised_buffer.sample(3)[5]
+    loaded_samples = loaded_buffer.sample(3)[5]
+    assert (len(loaded_buffer), loaded_buffer.max_priority, loaded_samples.tolist()) == (
+        3, prioritised_buffer.max_priority, samples.tolist())
+
+
+def test_memory_mapped_buffer(tmp_path):
+    mapped_buffer = ReplayBuffer(3, (2,), (1,), np.float32, directory=tmp_path)
+    for i in range(4):
+        mapped_buffer.append([i, i], [i / 10], i, [i + 1, i + 1], i == 3)
+    mapped_buffer.flush()
+    reopened_buffer = ReplayBuffer(3, (2,), (1,), np.float32, directory=tmp_path)
+    states, actions, rewards, _, dones = reopened_buffer.gather(np.array([0, 1, 2]))
+    assert isinstance(reopened_buffer.states, np.memmap)
+    assert (len(reopened_buffer), reopened_buffer.position, rewards.tolist(), dones.tolist()) == (
+        3, 1, [3, 1, 2], [True, False, False])
+    assert np.allclose(states[:, 0], [3, 1, 2]) and np.allclose(actions[:, 0], [0.3, 0.1, 0.2])
+
+
+def test_memory_mapped_buffer_with_new_shape(tmp_path):
+    mapped_buffer = ReplayBuffer(3, (2,), directory=tmp_path)
+    mapped_buffer.append([0, 0], 0, 1.0, [1, 1], False)
+    resized_buffer = ReplayBuffer(5, (2,), directory=tmp_path)
+    assert (len(resized_buffer), resized_buffer.position, resized_buffer.states.shape) == (0, 0, (5, 2))
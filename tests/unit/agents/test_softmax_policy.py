@@ -0,0 +1,17 @@
+import pytest
+import sys
+import numpy as np
+sys.path.extend([".", "..", "../..", "../../.."])
+from model.softmax_policy import softmax_probabilities
+
+
+def test_softmax_probabilities():
+    feature_vectors = np.array([[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]])
+    probabilities = softmax_probabilities(feature_vectors, np.array([np.log(2.0), 0.0]))
+    assert probabilities.tolist() == pytest.approx([0.5, 0.25, 0.25])
+
+
+def test_softmax_probabilities_large_weights():
+    feature_tensor = np.array([[[1.0], [0.0]], [[0.0], [1.0]]])
+    probabilities = softmax_probabilities(feature_tensor, np.array([1000.0]))
+    assert (probabilities.shape, probabilities.tolist()) == ((2, 2), [[1.0, 0.0], [0.0, 1.0]])
@@ -0,0 +1,73 @@
+import pytest
+import sys
+import numpy as np
+from unittest import mock
+sys.path.extend([".", "..", "../..", "../../.."])
+from model.trajectory_recorder import TrajectoryRecorder, TrajectoryReader, RecordingEnvironment
+from model.environment_frozenlake import FrozenLake
+from model.replay_buffer import ReplayBuffer
+from headless import HeadlessDriver
+
+
+@pytest.fixture(scope="module")
+def recording(tmp_path_factory):
+    pytest.recording_directory = tmp_path_factory.mktemp("recording")
+    recorder = TrajectoryRecorder(pytest.recording_directory, shard_size=4, compress=False)
+    for i in range(10):
+        recorder.record(np.full(2, i), i % 2, float(i), np.full(2, i + 1), i == 9)
+    recorder.close()
+    return pytest.recording_directory
+
+
+def test_shards(recording):
+    reader = TrajectoryReader(pytest.recording_directory)
+    columns = reader.load_shard(reader.shard_paths[1])
+    assert (len(reader.shard_paths), len(reader), isinstance(columns["states"], np.memmap)) == (3, 10, True)
+    assert (columns["rewards"].tolist(), columns["states"][:, 0].tolist()) == ([4, 5, 6, 7], [4, 5, 6, 7])
+
+
+def test_iterate_batches(recording):
+    reader = TrajectoryReader(pytest.recording_directory)
+    batches = list(reader.iterate_batches(3))
+    sizes = [len(batch[2]) for batch in batches]
+    rewards = np.concatenate([batch[2] for batch in batches]).tolist()
+    assert (sizes, rewards, batches[-1][4].tolist()) == ([3, 1, 3, 1, 2], list(range(10)), [False, True])
+
+
+def test_iterate_shuffled_batches(recording):
+    reader = TrajectoryReader(pytest.recording_directory)
+    batches = list(reader.iterate_batches(4, shuffle=True))
+    states, _, rewards, new_states, _ = (np.concatenate(column) for column in zip(*batches))
+    assert sorted(rewards.tolist()) == list(range(10))
+    assert np.array_equal(states[:, 0], rewards) and np.array_equal(new_states[:, 0], rewards + 1)
+
+
+def test_compressed_recording(tmp_path):
+    recorder = TrajectoryRecorder(tmp_path, shard_size=4)
+    for i in range(5):
+        recorder.record(np.full(2, i), i, float(i), np.full(2, i + 1), False)
+    recorder.close()
+    reader = TrajectoryReader(tmp_path)
+    replay_buffer = ReplayBuffer(10, (2,))
+    reader.fill_replay_buffer(replay_buffer)
+    assert (len(reader), len(replay_buffer), replay_buffer.actions[:5].tolist()) == (5, 5, [0, 1, 2, 3, 4])
+
+
+def test_recording_environment(tmp_path):
+    recorder = TrajectoryRecorder(tmp_path)
+    env = RecordingEnvironment(FrozenLake(False, grid_size=4), recorder)
+    env.restart_environment()
+    env.execute_action("Down")
+    new_state, _, _ = env.execute_action("Right")
+    recorder.close()
+    states, actions, _, new_states, _ = next(TrajectoryReader(tmp_path).iterate_batches(2))
+    assert (states.tolist(), actions.tolist(), new_states.tolist()) == ([0, 4], [3, 2], [4, 5])
+    assert env.current_state == new_state == (1, 1)
+
+
+def test_recording_rejects_vectorised_environments(tmp_path):
+    driver = HeadlessDriver("CartPole", record_directory=tmp_path)
+    driver.controller.num_envs = 2
+    with mock.patch.object(driver.controller, "read_config_file"), pytest.raises(ValueError, match="num_envs"):
+        driver.controller.start()
+    assert driver.controller.vector_env is None
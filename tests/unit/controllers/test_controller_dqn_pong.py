@@ -1,9 +1,17 @@
 import pytest
 import sys
+import os
+import random
+import numpy
+import torch
+import gym
+from types import SimpleNamespace
 sys.path.extend([".", "..", "../..", "../../.."])
 from model.environment_pong import Pong
+from model.agent_dqn_pong import AgentDQNPong
 from controller.controller_dqn_pong import ControllerDQNPong
 from view.gui import GUI
+from view.headless_gui import HeadlessGUI, HeadlessRoot
 from tkinter import Tk
 
 
@@ -23,3 +31,43 @@ def test_update_timescale(controller):
 def test_toggle_animation(controller):
     pytest.gui.animation_toggle.set(0)
     assert pytest.controller.timescale == 0
+
+
+def test_checkpoint_restores_random_states(tmp_path):
+    gym_env = SimpleNamespace(observation_space=gym.spaces.Box(0, 255, (4, 84, 84), numpy.uint8),
+                              action_space=gym.spaces.Discrete(6))
+    env = SimpleNamespace(name="Pong", gym_env=gym_env, current_state=numpy.zeros((4, 84, 84), dtype=numpy.uint8))
+    agent = AgentDQNPong(env, batch_size=4)
+    checkpoint_controller = ControllerDQNPong(env, agent, HeadlessGUI(HeadlessRoot()))
+    checkpoint_controller.checkpoint_directory = str(tmp_path / "checkpoint")
+    checkpoint_controller.episode_counter, checkpoint_controller.frame_counter = 3, 40
+    checkpoint_controller.save_checkpoint()
+    draws = [(random.random(), numpy.random.random(), torch.rand(1).item(), gym_env.action_space.sample())
+             for _ in range(5)]
+    checkpoint_controller.episode_counter = checkpoint_controller.frame_counter = 0
+    checkpoint_controller.load_checkpoint()
+    resumed_draws = [(random.random(), numpy.random.random(), torch.rand(1).item(), gym_env.action_space.sample())
+                     for _ in range(5)]
+    counters = (checkpoint_controller.episode_counter, checkpoint_controller.frame_counter)
+    assert (resumed_draws == draws, counters) == (True, (3, 40))
+
+
+def test_checkpoint_replaced_as_one_directory(tmp_path):
+    gym_env = SimpleNamespace(observation_space=gym.spaces.Box(0, 255, (4, 84, 84), numpy.uint8),
+                              action_space=gym.spaces.Discrete(6))
+    env = SimpleNamespace(name="Pong", gym_env=gym_env, current_state=numpy.zeros((4, 84, 84), dtype=numpy.uint8))
+    agent = AgentDQNPong(env, batch_size=4)
+    checkpoint_controller = ControllerDQNPong(env, agent, HeadlessGUI(HeadlessRoot()))
+    checkpoint_controller.checkpoint_directory = str(tmp_path / "checkpoint")
+    checkpoint_controller.episode_counter, checkpoint_controller.frame_counter = 3, 40
+    checkpoint_controller.save_checkpoint()
+    agent.step_counter = 80
+    checkpoint_controller.episode_counter, checkpoint_controller.frame_counter = 5, 80
+    checkpoint_controller.save_checkpoint()
+    saved_files = (sorted(os.listdir(tmp_path)), sorted(os.listdir(tmp_path / "checkpoint")))
+    # a crash after the previous checkpoint is moved aside, but before the new one is renamed into place
+    os.rename(tmp_path / "checkpoint", tmp_path / "checkpoint.old")
+    checkpoint_controller.load_checkpoint()
+    counters = (checkpoint_controller.episode_counter, checkpoint_controller.frame_counter, agent.step_counter)
+    assert saved_files == (["checkpoint"], ["agent.pth", "controller.pth", "replay_buffer.npz"])
+    assert counters == (5, 80, 80)
@@ -58,3 +58,20 @@ def test_restart_environment(env):
     pytest.env.current_state = (2, 3)
     pytest.env.restart_environment()
     assert pytest.env.current_state == (0, 0)
+
+
+def test_encode_and_decode_state(env):
+    state_ids = [pytest.env.encode_state(state) for state in pytest.env.state_space]
+    decoded_states = [pytest.env.decode_state(state_id) for state_id in state_ids]
+    assert (state_ids, decoded_states) == (list(range(15)), pytest.env.state_space)
+
+
+def test_execute_action_id(env):
+    pytest.env.current_state = (1, 1)
+    new_state_id, reward, episode_done = pytest.env.execute_action_id(pytest.env.action_ids["Up"])
+    assert (new_state_id, reward, episode_done, pytest.env.current_state) == (1, -100, True, (0, 1))
+
+
+def test_get_outcomes(env):
+    outcomes = pytest.env.get_outcomes(6, pytest.env.action_ids["Up"])
+    assert (outcomes, pytest.env.get_start_state_ids()) == ([(1, -100, True)], [0])
@@ -78,3 +78,35 @@ def test_get_feature_vector(env):
     action = "Left"
     feature_vector = pytest.env.get_feature_vector(state, action)
     assert np.allclose(feature_vector, np.array([1, 0]))
+
+
+def test_feature_tensor(env):
+    state = (0, 2)
+    feature_tensor = pytest.env.feature_tensor
+    feature_vector = feature_tensor[pytest.env.encode_state(state), pytest.env.action_ids["Down"]]
+    assert (feature_tensor.shape, feature_vector.tolist()) == ((16, 4, 2), [0, 0])
+
+
+def test_encode_and_decode_state(env):
+    state_ids = [pytest.env.encode_state(state) for state in pytest.env.state_space]
+    decoded_states = [pytest.env.decode_state(state_id) for state_id in state_ids]
+    assert (state_ids, decoded_states) == (list(range(16)), pytest.env.state_space)
+
+
+def test_execute_action_id(env):
+    pytest.env.current_state = (3, 2)
+    new_state_id, reward, episode_done = pytest.env.execute_action_id(pytest.env.action_ids["Right"])
+    assert (new_state_id, reward, episode_done, pytest.env.current_state) == (15, 200, True, (3, 3))
+
+
+def test_get_outcomes(env):
+    outcomes = pytest.env.get_outcomes(14, pytest.env.action_ids["Right"])
+    assert (outcomes, pytest.env.get_start_state_ids(), pytest.env.current_state) == ([(15, 200, True)], [0], (3, 3))
+
+
+def test_custom_grid_map():
+    custom_env = FrozenLake(False, grid_map=["SFH", "FFG"])
+    outcomes = custom_env.get_outcomes(custom_env.encode_state((0, 1)), custom_env.action_ids["Right"])
+    right_features = custom_env.get_feature_vector((1, 1), "Right").tolist()
+    assert (custom_env.NUM_STATES, custom_env.goal_state, outcomes, right_features) == (6, (1, 2), [(2, -100, True)],
+                                                                                        [0, 0])
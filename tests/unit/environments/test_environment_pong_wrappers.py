@@ -0,0 +1,84 @@
+import gym
+import gym.spaces
+import numpy as np
+import pytest
+import sys
+sys.path.extend([".", "..", "../..", "../../.."])
+from model.environment_pong_wrappers import MaxAndSkipEnv, ProcessFrameStack
+
+
+class FakeAtariEnv(gym.Env):
+    """
+    Environment with Atari sized RGB frames, whose pixels all equal the number of steps taken.
+    """
+
+    observation_space = gym.spaces.Box(low=0, high=255, shape=(210, 160, 3), dtype=np.uint8)
+    action_space = gym.spaces.Discrete(2)
+
+    def reset(self):
+        self.steps = 0
+        return np.zeros((210, 160, 3), dtype=np.uint8)
+
+    def step(self, action):
+        self.steps += 1
+        return np.full((210, 160, 3), self.steps, dtype=np.uint8), 0.0, False, {}
+
+
+class FlickeringEnv(FakeAtariEnv):
+    """
+    Environment whose frames are bright on odd steps and dark on even steps, and which finishes after the
+    given number of steps.
+    """
+
+    def __init__(self, episode_steps):
+        self.episode_steps = episode_steps
+
+    def step(self, action):
+        self.steps += 1
+        value = 100 + self.steps if self.steps % 2 == 1 else self.steps
+        return np.full((210, 160, 3), value, dtype=np.uint8), 1.0, self.steps == self.episode_steps, {}
+
+
+@pytest.fixture(scope="module")
+def env():
+    pytest.env = ProcessFrameStack(FakeAtariEnv(), 3)
+    return pytest.env
+
+
+def test_reset(env):
+    obs = pytest.env.reset()
+    assert (obs.shape, obs.dtype, int(obs.max())) == ((3, 84, 84), np.uint8, 0)
+
+
+def test_step_orders_frames_oldest_first(env):
+    pytest.env.reset()
+    for action in range(4):
+        obs, _, _, _ = pytest.env.step(action % 2)
+    assert obs[:, 0, 0].tolist() == [2, 3, 4]
+    assert (obs == obs[:, :1, :1]).all()
+
+
+def test_step_returns_new_array(env):
+    pytest.env.reset()
+    obs, _, _, _ = pytest.env.step(0)
+    pytest.env.step(0)
+    assert obs[:, 0, 0].tolist() == [0, 0, 1]
+
+
+def test_max_and_skip_pools_last_two_frames():
+    env = MaxAndSkipEnv(FlickeringEnv(10), 4)
+    env.reset()
+    obs, reward, done, _ = env.step(0)
+    assert (int(obs.min()), int(obs.max()), reward, done) == (103, 103, 4.0, False)
+    obs, reward, done, _ = env.step(0)
+    assert (int(obs.min()), int(obs.max()), reward, done) == (107, 107, 4.0, False)
+
+
+def test_max_and_skip_finishes_early():
+    env = MaxAndSkipEnv(FlickeringEnv(9), 4)
+    env.reset()
+    env.step(0)
+    obs, reward, done, _ = env.step(0)
+    assert (int(obs.max()), reward, done) == (107, 4.0, False)
+    obs, reward, done, _ = env.step(0)
+    assert (int(obs.max()), reward, done) == (109, 1.0, True)
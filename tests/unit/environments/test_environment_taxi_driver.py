@@ -108,3 +108,50 @@ def test_restart_environment(env):
     passenger_in_taxi = pytest.env.passenger_in_taxi
     destination_valid = True if pytest.env.destination_state in [(0, 0), (0, 4), (4, 0), (4, 3)] else False
     assert (taxi_valid, passenger_valid, passenger_in_taxi, destination_valid) == (True, True, False, True)
+
+
+def test_encode_and_decode_state(env):
+    state_ids = [pytest.env.encode_state(state) for state in pytest.env.state_space]
+    decoded_states = [pytest.env.decode_state(state_id) for state_id in state_ids]
+    assert (state_ids, decoded_states) == (list(range(500)), pytest.env.state_space)
+
+
+def test_execute_action_id(env):
+    pytest.env.passenger_in_taxi = False
+    pytest.env.taxi_state = (0, 1)
+    pytest.env.passenger_state = (0, 0)
+    pytest.env.destination_state = (4, 3)
+    new_state_id, reward, episode_done = pytest.env.execute_action_id(pytest.env.action_ids["Left"])
+    expected_state = ((0, 0), (0, 0), (4, 3))
+    assert (new_state_id, reward, episode_done) == (pytest.env.encode_state(expected_state), -1, False)
+    assert pytest.env.current_state == expected_state
+
+
+@pytest.mark.parametrize("state, action, expected_outcome",
+                         [(((0, 0), (0, 0), (4, 3)), "Pickup", (((0, 0), "In Taxi", (4, 3)), -1, False)),
+                          (((0, 1), (0, 0), (4, 3)), "Pickup", (((0, 1), (0, 0), (4, 3)), -10, False)),
+                          (((4, 3), "In Taxi", (4, 3)), "Dropoff", (((4, 3), "In Taxi", (4, 3)), 20, True)),
+                          (((0, 4), "In Taxi", (4, 3)), "Dropoff", (((0, 4), (0, 4), (4, 3)), -1, False)),
+                          (((0, 1), (0, 0), (4, 3)), "Right", (((0, 1), (0, 0), (4, 3)), -1, False))])
+def test_get_outcomes(env, state, action, expected_outcome):
+    expected_state, reward, episode_done = expected_outcome
+    outcomes = pytest.env.get_outcomes(pytest.env.encode_state(state), pytest.env.action_ids[action])
+    assert outcomes == [(pytest.env.encode_state(expected_state), reward, episode_done)]
+
+
+def test_get_start_state_ids(env):
+    start_states = [pytest.env.decode_state(state_id) for state_id in pytest.env.get_start_state_ids()]
+    assert (len(start_states), any(passenger == "In Taxi" for _, passenger, _ in start_states)) == (400, False)
+
+
+def test_get_outcomes_agree_with_execute_action():
+    taxi_env = TaxiDriver()
+    disagreements = []
+    for state_id, state in enumerate(taxi_env.state_space):
+        for action_id, action in enumerate(taxi_env.action_space):
+            taxi_env.set_state(state)
+            new_state, reward, episode_done = taxi_env.execute_action(action)
+            outcome = (taxi_env.encode_state(new_state), reward, episode_done)
+            if taxi_env.get_outcomes(state_id, action_id) != [outcome]:
+                disagreements.append((state, action))
+    assert (disagreements, taxi_env.current_state) == ([], new_state)
@@ -0,0 +1,97 @@
+import pytest
+import sys
+import numpy as np
+sys.path.extend([".", "..", "../..", "../../.."])
+from model.environment_vectorised import VectorisedEnvironment, SubprocessVectorisedEnvironment, VectorisedGridWorld
+from model.environment_cartpole import CartPole
+from model.environment_frozenlake import FrozenLake
+from model.environment_taxi_driver import TaxiDriver
+
+
+@pytest.fixture(scope="module")
+def vector_env():
+    pytest.vector_env = VectorisedEnvironment(CartPole, 3)
+    return pytest.vector_env
+
+
+def test_correct_initialisation(vector_env):
+    assert (pytest.vector_env.name, pytest.vector_env.current_state.shape) == ("CartPole", (3, 4))
+
+
+def test_execute_action(vector_env):
+    origin_states, rewards, new_states, dones = pytest.vector_env.execute_action(np.array([0, 1, 0]))
+    assert (origin_states.shape, rewards.tolist(), new_states.shape, dones.tolist()) == \
+           ((3, 4), [1, 1, 1], (3, 4), [False, False, False])
+
+
+def test_execute_action_restarts_finished_copies(vector_env):
+    dones = np.zeros(3, dtype=bool)
+    while not dones.any():
+        _, _, new_states, dones = pytest.vector_env.execute_action(np.zeros(3, dtype=np.int64))
+    finished = np.flatnonzero(dones)
+    assert not np.allclose(pytest.vector_env.current_state[finished], new_states[finished])
+
+
+def test_random_action(vector_env):
+    actions = pytest.vector_env.random_action()
+    assert (len(actions), set(actions.tolist()) <= {0, 1}) == (3, True)
+
+
+def test_restart_environment(vector_env):
+    pytest.vector_env.restart_environment()
+    assert pytest.vector_env.current_state.shape == (3, 4)
+
+
+def test_subprocess_execute_action():
+    vector_env = SubprocessVectorisedEnvironment(CartPole, 2)
+    _, rewards, new_states, dones = vector_env.execute_action(vector_env.random_action())
+    vector_env.close()
+    assert (rewards.tolist(), new_states.shape, dones.tolist()) == ([1, 1], (2, 4), [False, False])
+
+
+@pytest.fixture(scope="module")
+def grid_world():
+    pytest.grid_world = VectorisedGridWorld(FrozenLake(is_slippery=False), 3, seed=0)
+    return pytest.grid_world
+
+
+def test_grid_world_initialisation(grid_world):
+    shapes = (pytest.grid_world.next_states.shape, pytest.grid_world.current_state.tolist())
+    assert shapes == ((16, 4, 1), [0, 0, 0])
+
+
+def test_grid_world_execute_action(grid_world):
+    origin_states, rewards, new_states, dones = pytest.grid_world.execute_action(np.array([2, 3, 0]))
+    assert (origin_states.tolist(), rewards.tolist(), new_states.tolist(), dones.tolist()) == \
+           ([0, 0, 0], [-1, -1, -1], [1, 4, 0], [False, False, False])
+
+
+def test_grid_world_execute_action_restarts_finished_copies(grid_world):
+    _, rewards, new_states, dones = pytest.grid_world.execute_action(np.array([3, 2, 3]))
+    assert (rewards.tolist(), new_states.tolist(), dones.tolist()) == ([-100, -100, -1], [5, 5, 4], [True, True, False])
+    assert pytest.grid_world.current_state.tolist() == [0, 0, 4]
+
+
+def test_grid_world_slippery_outcomes():
+    grid_world = VectorisedGridWorld(FrozenLake(is_slippery=True), 3000, seed=0)
+    _, _, new_states, _ = grid_world.execute_action(np.full(3000, 2))
+    assert sorted(set(new_states.tolist())) == [0, 1, 4]
+
+
+def test_grid_world_run_episodes():
+    env = FrozenLake(is_slippery=False)
+    grid_world = VectorisedGridWorld(env, 5, seed=0)
+    policy = np.zeros(env.NUM_STATES, dtype=np.int64)
+    for state_id, action in [(0, "Down"), (4, "Down"), (8, "Right"), (9, "Right"), (10, "Down"), (14, "Right")]:
+        policy[state_id] = env.action_ids[action]
+    returns, episode_steps = grid_world.run_episodes(policy)
+    assert (returns.tolist(), episode_steps.tolist()) == ([195] * 5, [6] * 5)
+
+
+def test_grid_world_run_episodes_with_probabilities():
+    env = TaxiDriver()
+    grid_world = VectorisedGridWorld(env, 10, seed=0)
+    policy = np.zeros((env.NUM_STATES, env.NUM_ACTIONS))
+    policy[:, env.action_ids["Pickup"]] = 1
+    returns, episode_steps = grid_world.run_episodes(policy, gamma=0.5, max_steps=3)
+    assert np.allclose(returns, -10 - 5 - 2.5) and episode_steps.tolist() == [3] * 10
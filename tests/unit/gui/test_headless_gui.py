@@ -0,0 +1,44 @@
+import pytest
+import sys
+sys.path.extend([".", "..", "../..", "../../.."])
+from view.headless_gui import HeadlessGUI, HeadlessRoot
+
+
+@pytest.fixture(scope="module")
+def gui():
+    pytest.root = HeadlessRoot()
+    pytest.gui = HeadlessGUI(pytest.root)
+    return pytest.gui
+
+
+def test_animation_disabled(gui):
+    assert (pytest.gui.animation_toggle.get(), pytest.gui.animation.update_animation) == (0, False)
+
+
+def test_trace_callback(gui):
+    calls = []
+    pytest.gui.load_best_model.trace("w", lambda *args: calls.append(pytest.gui.load_best_model.get()))
+    pytest.gui.load_best_model.set(1)
+    pytest.gui.load_best_model.set(0)
+    assert calls == [1, 0]
+
+
+def test_mainloop_runs_scheduled_callbacks(gui):
+    calls = []
+
+    def callback():
+        calls.append(len(calls))
+        if len(calls) < 5:
+            pytest.gui.animation.canvas.after(100, callback)
+
+    pytest.gui.animation.canvas.after(100, callback)
+    pytest.root.mainloop()
+    assert calls == [0, 1, 2, 3, 4]
+
+
+def test_after_cancel(gui):
+    calls = []
+    callback_id = pytest.gui.animation.canvas.after(100, lambda: calls.append(1))
+    pytest.gui.animation.canvas.after_cancel(callback_id)
+    pytest.root.mainloop()
+    assert calls == []
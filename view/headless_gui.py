@@ -0,0 +1,199 @@
+from view.animation import Animation
+import collections
+import itertools
+
+
+class HeadlessVariable:
+    """
+    Stand-in for the Tkinter variables (IntVar, StringVar) used by the GUI. Stores a single value and
+    calls any registered trace callbacks whenever the value is set.
+    """
+
+    def __init__(self, value=None):
+        self.value = value
+        self.callbacks = []
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+        for callback in self.callbacks:
+            callback()
+
+    def trace(self, mode, callback):
+        self.callbacks.append(callback)
+
+
+class HeadlessWidget:
+    """
+    Stand-in for the Tkinter widgets (Scale, Button, Checkbutton) used by the GUI. Configuration calls
+    are accepted and ignored, apart from the value held by a Scale.
+    """
+
+    def __init__(self, value=0):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+    def configure(self, **kwargs):
+        pass
+
+    def grid(self):
+        pass
+
+    def grid_remove(self):
+        pass
+
+
+class HeadlessRoot:
+    """
+    Stand-in for the Tk root window. Callbacks scheduled through the canvas are held in a queue, which
+    mainloop() drains in a tight loop, ignoring the requested delay.
+    """
+
+    def __init__(self):
+        self.scheduled_callbacks = collections.OrderedDict()
+        self.callback_ids = itertools.count()
+
+    def after(self, ms, callback):
+        """
+        Schedules the given callback to be run by the main loop.
+
+        @param ms: the requested delay in milliseconds, which is ignored
+        @param callback: the callback to be run
+        @return: an identifier which can be passed to after_cancel()
+        """
+
+        callback_id = next(self.callback_ids)
+        self.scheduled_callbacks[callback_id] = callback
+        return callback_id
+
+    def after_cancel(self, callback_id):
+        self.scheduled_callbacks.pop(callback_id, None)
+
+    def mainloop(self):
+        """
+        Runs scheduled callbacks in order until there are none left, i.e. once the controller has finished
+        running all of its episodes.
+        """
+
+        while self.scheduled_callbacks:
+            _, callback = self.scheduled_callbacks.popitem(last=False)
+            callback()
+
+    def update(self):
+        pass
+
+    def update_idletasks(self):
+        pass
+
+
+class HeadlessCanvas:
+    """
+    Stand-in for the Tkinter canvas used by the animations. Scheduling is delegated to the headless root,
+    while all drawing calls are ignored.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def after(self, ms, callback):
+        return self.root.after(ms, callback)
+
+    def after_cancel(self, callback_id):
+        self.root.after_cancel(callback_id)
+
+    def delete(self, *args):
+        pass
+
+    def destroy(self):
+        pass
+
+    def tag_raise(self, *args):
+        pass
+
+
+class HeadlessAnimation(Animation):
+    """
+    Animation implementation which draws nothing, used when running the program without a display.
+    """
+
+    def __init__(self, root):
+        self.canvas = HeadlessCanvas(root)
+        self.agent = None
+        self.update_animation = False
+
+    def update(self, *args):
+        pass
+
+    def restart_environment(self, *args):
+        pass
+
+    def draw_values_of_states(self, values):
+        pass
+
+    def draw_values_of_action(self, values):
+        pass
+
+    def draw_policy(self, policy):
+        pass
+
+    def draw_softmax_probabilities(self, values):
+        pass
+
+    def close_animation(self):
+        pass
+
+
+class HeadlessGUI:
+    """
+    Replacement for the GUI which needs no Tk root or display. It exposes the same controls and methods
+    that the controllers use, with the animation toggled off. Statistical information which would be
+    added to the listbox is printed to standard output instead.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.animation = HeadlessAnimation(root)
+        self.selected_environment = HeadlessVariable()
+        self.selected_algorithm = HeadlessVariable()
+        self.scale = HeadlessWidget(0)
+        self.start_button = HeadlessWidget()
+        self.animation_toggle = HeadlessVariable(0)
+        self.load_best_model = HeadlessVariable(0)
+        self.load_best_model_chkbtn = HeadlessWidget()
+
+    def add_to_listbox(self, str):
+        """
+        Prints the string which would have been added to the listbox on screen.
+
+        @param str: the string to be printed
+        """
+
+        print(str, flush=True)
+
+    def update_episode_labels(self, episode_no, epsilon=None, alpha=None, beta=None, frame=None):
+        pass
+
+    def update(self, new_state):
+        pass
+
+    def restart_environment(self, start_state):
+        pass
+
+    def draw_values_of_states(self, values):
+        pass
+
+    def draw_values_of_action(self, values):
+        pass
+
+    def draw_policy(self, policy):
+        pass
+
+    def draw_softmax_probabilities(self, values):
+        pass